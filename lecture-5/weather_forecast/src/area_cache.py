@@ -0,0 +1,151 @@
+# ---------------------------------------------
+# area.json のディスクキャッシュ（TTL + 内容バージョン）
+# ---------------------------------------------
+# 起動時はディスク上の地域一覧をそのまま返し、サイドバーをすぐ描画できるようにする。
+# 保存から TTL を過ぎていたら、バックグラウンドで条件付き GET による再検証を行い、
+# 内容（地域一覧のハッシュ）が変わっていたときだけ保存し直して on_change を呼ぶ。
+# 条件付き GET は HttpClient に任せる（保存しておいた ETag / Last-Modified を remember() で渡し、
+# 304 は NotModified で受け取る）。接続プールと通信の統計も共有される。
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from http_client import NotModified
+
+# キャッシュファイルの形式を変えたら上げる（古い形式のファイルは読まない）
+CACHE_FORMAT = 1
+AREA_CACHE_TTL = 24 * 60 * 60  # 秒
+
+
+def default_cache_path(filename: str = "area_cache.json") -> str:
+    """Flet のアプリ用データディレクトリ（なければ src/storage/data）"""
+    base = os.getenv("FLET_APP_STORAGE_DATA") or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "storage", "data")
+    return os.path.join(base, filename)
+
+
+def content_version(areas: list) -> str:
+    raw = json.dumps(areas, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+class AreaListCache:
+    def __init__(self, url: str, parse, http, path: str = None, ttl: float = AREA_CACHE_TTL):
+        """
+        url  : area.json の URL
+        parse: area.json（dict）→ 地域一覧（list）に変換する関数
+        http : HttpClient（接続プールを共有する）
+        """
+        self.url = url
+        self.parse = parse
+        self.http = http
+        self.path = path or default_cache_path()
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._revalidating = False
+
+    # --- ファイル入出力 ---
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("format") != CACHE_FORMAT or not entry.get("areas"):
+            return None
+        if entry.get("version") != content_version(entry["areas"]):
+            # 途中で書き込みが壊れたファイルなど
+            return None
+        return entry
+
+    def _write(self, entry: dict) -> bool:
+        """entry をファイルに書く。書けなければ False（キャッシュなしで動き続ける）"""
+        tmp = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+            return True
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return False
+
+    def _entry(self, areas: list) -> dict:
+        """地域一覧と、HttpClient が直前に受け取った検証子から entry を作る"""
+        validators = self.http.validators(self.url)
+        return {
+            "format": CACHE_FORMAT,
+            "version": content_version(areas),
+            "saved_at": time.time(),
+            "etag": validators.get("etag"),
+            "last_modified": validators.get("last_modified"),
+            "areas": areas,
+        }
+
+    def _download(self, entry: dict = None, timeout: int = 10):
+        """
+        area.json を取得する。entry があれば条件付き GET にする。
+        戻り値: 新しい entry（304 のときは None）
+        """
+        if entry:
+            self.http.remember(self.url, entry.get("etag"), entry.get("last_modified"))
+        try:
+            raw = self.http.get_bytes(self.url, timeout=timeout)
+        except NotModified:
+            if entry:
+                return None
+            raise
+        return self._entry(self.parse(json.loads(raw)))
+
+    # --- 公開 API ---
+    def is_stale(self, entry: dict) -> bool:
+        return time.time() - entry.get("saved_at", 0) >= self.ttl
+
+    def load_cached(self):
+        """ディスク上の地域一覧を返す（なければ None）。TTL 切れでもそのまま返す"""
+        entry = self._read()
+        return entry["areas"] if entry else None
+
+    def store(self, areas: list) -> bool:
+        """
+        HttpClient で取得したばかりの地域一覧を、そのときの検証子と一緒に保存する
+        書けなかったときは False（次回の起動でまた取得するだけ）
+        """
+        return self._write(self._entry(areas))
+
+    def revalidate_in_background(self, on_change=None, force: bool = False):
+        """TTL 切れ（または force）ならバックグラウンドで再検証する"""
+        entry = self._read()
+        if entry and not force and not self.is_stale(entry):
+            return
+        with self._lock:
+            if self._revalidating:
+                return
+            self._revalidating = True
+        threading.Thread(target=self._revalidate, args=(entry, on_change), daemon=True).start()
+
+    def _revalidate(self, entry, on_change):
+        try:
+            fresh = self._download(entry)
+            if fresh is None:
+                # 304: 内容は同じなので保存時刻だけ更新する
+                entry["saved_at"] = time.time()
+                self._write(entry)
+                return
+            changed = not entry or fresh["version"] != entry["version"]
+            self._write(fresh)
+            if changed and on_change:
+                on_change(fresh["areas"])
+        except Exception:
+            # 再検証の失敗は手元のキャッシュを使い続けるだけ
+            pass
+        finally:
+            with self._lock:
+                self._revalidating = False
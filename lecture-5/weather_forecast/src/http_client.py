@@ -0,0 +1,109 @@
+# ---------------------------------------------
+# HTTP クライアント（接続プール + 条件付き GET）
+# ---------------------------------------------
+# requests.Session を使い回して keep-alive 接続を再利用する。
+# URL ごとに ETag / Last-Modified と本文を覚えておき、次回は
+# If-None-Match / If-Modified-Since を付けて問い合わせる。
+# 304 が返ったときは手元の本文をそのまま使う。
+# ディスクに保存しておいた検証子は remember() で登録でき、本文を持っていない URL に
+# 304 が返ったときは NotModified を送出する（呼び出し側が手元のデータを使い続ける）。
+
+import json
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+
+class NotModified(requests.HTTPError):
+    """304 が返ったが、返せる本文を手元に持っていない"""
+
+
+class HttpClient:
+    def __init__(self, pool_maxsize: int = 16, timeout: int = 10):
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # url -> {"etag":..., "last_modified":..., "body": bytes}
+        self._validators: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "not_modified": 0, "bytes": 0}
+
+    def _conditional_headers(self, url: str) -> dict:
+        with self._lock:
+            entry = self._validators.get(url)
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def get_bytes(self, url: str, timeout: int = None) -> bytes:
+        """URL の本文を取得する（304 なら保存済みの本文を返す）"""
+        r = self.session.get(url, headers=self._conditional_headers(url),
+                             timeout=timeout or self.timeout)
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["bytes"] += len(r.content)
+
+        if r.status_code == 304:
+            with self._lock:
+                entry = self._validators.get(url)
+                self.stats["not_modified"] += 1
+            if entry is not None and entry["body"] is not None:
+                return entry["body"]
+            # remember() で本文なしの検証子を登録した場合か、検証子を送っていないのに 304 が来た場合
+            raise NotModified(f"HTTP 304 without cached body for {url}", response=r)
+
+        if r.status_code in RETRYABLE_STATUS:
+            raise requests.HTTPError(f"HTTP {r.status_code} for {url}", response=r)
+        r.raise_for_status()
+
+        etag = r.headers.get("ETag")
+        last_modified = r.headers.get("Last-Modified")
+        if etag or last_modified:
+            with self._lock:
+                self._validators[url] = {"etag": etag, "last_modified": last_modified, "body": r.content}
+        return r.content
+
+    def get_json(self, url: str, timeout: int = None):
+        return json.loads(self.get_bytes(url, timeout=timeout))
+
+    def validators(self, url: str) -> dict:
+        """保存済みの {"etag", "last_modified"}（なければ空の dict）"""
+        with self._lock:
+            entry = self._validators.get(url)
+            if entry is None:
+                return {}
+            return {"etag": entry["etag"], "last_modified": entry["last_modified"]}
+
+    def remember(self, url: str, etag: str = None, last_modified: str = None, body: bytes = None):
+        """
+        別の場所に保存しておいた検証子を登録する（次回から条件付き GET にする）
+        body を渡さなければ、304 のときは NotModified になる
+        """
+        if not etag and not last_modified:
+            return
+        with self._lock:
+            entry = self._validators.get(url)
+            if entry and entry["etag"] == etag and entry["last_modified"] == last_modified:
+                # 同じ検証子なら、すでに持っている本文を捨てない
+                return
+            self._validators[url] = {"etag": etag, "last_modified": last_modified, "body": body}
+
+    def forget(self, url: str = None):
+        """保存済みの検証子を破棄する（url 省略時は全件）"""
+        with self._lock:
+            if url is None:
+                self._validators.clear()
+            else:
+                self._validators.pop(url, None)
+
+    def close(self):
+        self.session.close()
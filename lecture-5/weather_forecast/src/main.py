@@ -1,17 +1,23 @@
 import flet as ft
-import requests
 import time
 import re as _re
 from datetime import datetime
 from functools import lru_cache
 from collections import defaultdict
 
+from area_cache import AreaListCache
+from http_client import HttpClient
+from sidebar import RegionTile
+
 # ---------------------------------------------
 # 気象庁 JSON
 # ---------------------------------------------
 AREA_JSON_URL = "https://www.jma.go.jp/bosai/common/const/area.json"
 FORECAST_BASE = "https://www.jma.go.jp/bosai/forecast/data/forecast/"  # {code}.json
 
+# 接続プールと ETag / Last-Modified を共有するクライアント
+HTTP = HttpClient()
+
 # ---------------------------------------------
 # リトライ（指数バックオフ）
 # ---------------------------------------------
@@ -19,11 +25,7 @@ def get_json(url: str, tries: int = 3, timeout: int = 10):
     last_err = None
     for i in range(tries):
         try:
-            r = requests.get(url, timeout=timeout)
-            if r.status_code in (429, 500, 502, 503, 504):
-                raise requests.HTTPError(f"HTTP {r.status_code} for {url}")
-            r.raise_for_status()
-            return r.json()
+            return HTTP.get_json(url, timeout=timeout)
         except Exception as e:
             last_err = e
             if i < tries - 1:
@@ -85,44 +87,59 @@ def keyword_to_emoji(word: str) -> str:
     if "霧" in w: return "🌫️"
     return "☁️"
 
-def stack_center_with_corner(primary_word: str, secondary_word: str, corner: str = "top_right") -> ft.Control:
-    e_pri = keyword_to_emoji(primary_word)
-    e_sec = keyword_to_emoji(secondary_word)
-    if e_pri == e_sec:
+# テロップの形 → アイコンの並べ方（上から順に試す）
+#   single       : 絵文字1つ
+#   top_right    : 大きい絵文字の右上に小さい絵文字（〇時々△）
+#   bottom_right : 大きい絵文字の右下に小さい絵文字（〇一時△）
+#   row          : 2つを横に並べる（〇後△）
+_TELOP_PATTERNS = [
+    (_re.compile(r"(.+?)で(.+?)を伴う"), "single", 2),
+    (_re.compile(r"(.+?)時々(.+)"), "top_right", None),
+    (_re.compile(r"(.+?)一時(.+)"), "bottom_right", None),
+    (_re.compile(r"(.+?)後(.+)"), "row", None),
+    (_re.compile(r"(.+?)か(.+)"), "single", 1),
+]
+
+@lru_cache(maxsize=256)
+def icon_spec_for_telop(telop: str) -> tuple:
+    """テロップから (並べ方, 主な絵文字, 添える絵文字 or None) を求める"""
+    if not telop:
+        return ("single", "⛅", None)
+    for pattern, layout, group in _TELOP_PATTERNS:
+        m = pattern.search(telop)
+        if not m:
+            continue
+        if group is not None:
+            return ("single", keyword_to_emoji(m.group(group)), None)
+        e_pri = keyword_to_emoji(m.group(1))
+        e_sec = keyword_to_emoji(m.group(2))
+        if e_pri == e_sec:
+            return ("single", e_pri, None)
+        return (layout, e_pri, e_sec)
+    return ("single", keyword_to_emoji(telop), None)
+
+# 天気コード → アイコンの形（TELOPS は決まった集合なので起動時に1回だけ求める）
+ICON_SPECS: dict[int, tuple] = {code: icon_spec_for_telop(telop) for code, telop in TELOPS.items()}
+
+def icon_spec(weather_code, telop: str = "") -> tuple:
+    """天気コードの表を引く（表にないコードはテロップから求める）"""
+    spec = ICON_SPECS.get(weather_code)
+    return spec if spec is not None else icon_spec_for_telop(telop)
+
+def icon_from_spec(spec: tuple) -> ft.Control:
+    layout, e_pri, e_sec = spec
+    if layout == "single":
         return ft.Text(e_pri, size=28, text_align=ft.TextAlign.CENTER)
+    if layout == "row":
+        return ft.Row(controls=[ft.Text(e_pri, size=26), ft.Text(e_sec, size=26)],
+                      alignment=ft.MainAxisAlignment.CENTER, spacing=8)
     big = ft.Container(content=ft.Text(e_pri, size=30), alignment=ft.alignment.center, expand=True)
-    small_align = {"top_right": ft.alignment.top_right, "bottom_right": ft.alignment.bottom_right,
-                   "top_left": ft.alignment.top_left, "bottom_left": ft.alignment.bottom_left}.get(corner, ft.alignment.top_right)
+    small_align = ft.alignment.bottom_right if layout == "bottom_right" else ft.alignment.top_right
     small = ft.Container(content=ft.Text(e_sec, size=18), alignment=small_align, padding=4, expand=True)
     return ft.Stack(controls=[big, small], width=80, height=50)
 
-def row_left_right(primary_word: str, secondary_word: str) -> ft.Control:
-    e_pri = keyword_to_emoji(primary_word)
-    e_sec = keyword_to_emoji(secondary_word)
-    if e_pri == e_sec:
-        return ft.Text(e_pri, size=28, text_align=ft.TextAlign.CENTER)
-    return ft.Row(controls=[ft.Text(e_pri, size=26), ft.Text(e_sec, size=26)],
-                  alignment=ft.MainAxisAlignment.CENTER, spacing=8)
-
 def compose_icon_from_telop(telop: str) -> ft.Control:
-    if not telop:
-        return ft.Text("⛅", size=28, text_align=ft.TextAlign.CENTER)
-    m伴う = _re.search(r"(.+?)で(.+?)を伴う", telop)
-    if m伴う:
-        return ft.Text(keyword_to_emoji(m伴う.group(2)), size=28, text_align=ft.TextAlign.CENTER)
-    m時々 = _re.search(r"(.+?)時々(.+)", telop)
-    if m時々:
-        return stack_center_with_corner(m時々.group(1), m時々.group(2), corner="top_right")
-    m一時 = _re.search(r"(.+?)一時(.+)", telop)
-    if m一時:
-        return stack_center_with_corner(m一時.group(1), m一時.group(2), corner="bottom_right")
-    m後 = _re.search(r"(.+?)後(.+)", telop)
-    if m後:
-        return row_left_right(m後.group(1), m後.group(2))
-    mか = _re.search(r"(.+?)か(.+)", telop)
-    if mか:
-        return ft.Text(keyword_to_emoji(mか.group(1)), size=28, text_align=ft.TextAlign.CENTER)
-    return ft.Text(keyword_to_emoji(telop), size=28, text_align=ft.TextAlign.CENTER)
+    return icon_from_spec(icon_spec_for_telop(telop))
 
 def to_date_label_with_weekday(iso: str) -> str:
     try:
@@ -134,14 +151,24 @@ def to_date_label_with_weekday(iso: str) -> str:
 # ---------------------------------------------
 # 取得
 # ---------------------------------------------
-@lru_cache(maxsize=1)
-def fetch_area_list():
-    data = get_json(AREA_JSON_URL)
+def areas_from_area_json(data: dict) -> list:
     offices = data.get("offices", {})
     arr = [{"code": c, "name": info.get("name")} for c, info in offices.items()]
     arr.sort(key=lambda x: x["code"])
     return arr
 
+# 地域一覧はディスクにも保存し、次回の起動ではそれを即座に使う
+AREA_CACHE = AreaListCache(AREA_JSON_URL, areas_from_area_json, HTTP)
+
+@lru_cache(maxsize=1)
+def fetch_area_list():
+    arr = AREA_CACHE.load_cached()
+    if arr is not None:
+        return arr
+    arr = areas_from_area_json(get_json(AREA_JSON_URL))
+    AREA_CACHE.store(arr)
+    return arr
+
 def fetch_forecast(code: str):
     payload = get_json(f"{FORECAST_BASE}{code}.json")
     result = {"publishingOffice": None, "reportDatetime": None, "weekly": [], "weekly_temps": []}
@@ -306,12 +333,13 @@ def main(page: ft.Page):
         for d in data["weekly"]:
             date_label = to_date_label_with_weekday(d["dateTime"])
             telop = ""
+            n = None
             try:
                 n = int(d["weatherCode"])
                 telop = TELOPS.get(n, "")
             except Exception:
                 telop = ""
-            icon_ctrl = compose_icon_from_telop(telop)
+            icon_ctrl = icon_from_spec(icon_spec(n, telop))
             mn, mx = temp_map.get(d["dateTime"], (None, None))
             min_txt = f"{mn}°C" if mn is not None else ""
             max_txt = f"{mx}°C" if mx is not None else ""
@@ -331,6 +359,20 @@ def main(page: ft.Page):
             page.update()
             return
 
+        build_sidebar(areas)
+        hide_loading(page)
+
+        # 保存済みの一覧が古ければ裏で再検証し、変わっていたら描き直す
+        AREA_CACHE.revalidate_in_background(on_change=on_areas_changed)
+
+        # 初期表示は東京都（130000）
+        render_week("130000", "東京都")
+
+    def on_areas_changed(areas):
+        fetch_area_list.cache_clear()
+        build_sidebar(areas)
+
+    def build_sidebar(areas):
         # --- 〇〇地方でまとめる ---
         by_region: dict[str, list[dict]] = defaultdict(list)
         for a in areas:
@@ -343,28 +385,12 @@ def main(page: ft.Page):
             items = sorted(by_region.get(region, []), key=lambda x: x["code"])
             if not items:
                 continue
-            buttons = [
-                ft.TextButton(
-                    text=f"{a['name']}  {a['code']}",
-                    on_click=lambda e, c=a['code'], n=a['name']: render_week(c, n),
-                    style=ft.ButtonStyle(color=ft.Colors.WHITE),
-                )
-                for a in items
-            ]
-            tiles.append(
-                ft.ExpansionTile(
-                    title=ft.Text(region, color=ft.Colors.WHITE),
-                    subtitle=ft.Text("タップで展開", color=ft.Colors.BLUE_GREY_200),
-                    controls=buttons
-                )
-            )
+            # 中の地域ボタンは地方を開いたときに作る
+            tiles.append(RegionTile(region, items, on_select=render_week))
 
+        area_list_view.controls.clear()
         area_list_view.controls.extend(tiles)
         page.update()
-        hide_loading(page)
-
-        # 初期表示は東京都（130000）
-        render_week("130000", "東京都")
 
     load_areas()
 
@@ -0,0 +1,50 @@
+# AreaListCache: 検証子の保存と、HttpClient を通した再検証
+
+import json
+import os
+
+from area_cache import AreaListCache
+from conftest import ETAG, LAST_MODIFIED
+from http_client import HttpClient
+
+
+def make_cache(server, client, tmp_path, path="/validated"):
+    return AreaListCache(server.url(path), lambda data: [data], client, path=str(tmp_path / "area_cache.json"))
+
+
+def saved(cache) -> dict:
+    with open(cache.path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_store_keeps_validators_from_download(server, client, tmp_path):
+    cache = make_cache(server, client, tmp_path)
+    areas = cache.parse(client.get_json(cache.url))
+    assert cache.store(areas)
+    entry = saved(cache)
+    assert (entry["etag"], entry["last_modified"]) == (ETAG, LAST_MODIFIED)
+    assert cache.load_cached() == [{"value": 1}]
+
+
+def test_revalidate_sends_saved_validators_through_client(server, tmp_path):
+    # 前回の起動で保存したキャッシュを、新しい HttpClient（本文を持っていない）で再検証する
+    first = HttpClient(timeout=5)
+    cache = make_cache(server, first, tmp_path)
+    cache.store(cache.parse(first.get_json(cache.url)))
+    first.close()
+
+    fresh_client = HttpClient(timeout=5)
+    cache = make_cache(server, fresh_client, tmp_path)
+    assert cache._download(cache._read()) is None  # 304
+    assert server.requests[-1]["headers"]["If-None-Match"] == ETAG
+    assert fresh_client.stats == {"requests": 1, "not_modified": 1, "bytes": 0}
+    fresh_client.close()
+
+
+def test_store_ignores_unwritable_path(server, client, tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    cache = AreaListCache(server.url("/validated"), lambda data: [data], client,
+                          path=os.path.join(str(blocker), "area_cache.json"))
+    assert cache.store([{"value": 1}]) is False
+    assert cache.load_cached() is None
@@ -0,0 +1,64 @@
+# HttpClient をローカルのスタブ HTTP サーバーに対して確かめる（サーバーは conftest.py）
+
+import pytest
+import requests
+
+from conftest import BODY, ETAG, LAST_MODIFIED
+from http_client import NotModified
+
+
+def test_200_stores_validators(server, client):
+    assert client.get_json(server.url("/validated")) == {"value": 1}
+    assert client.validators(server.url("/validated")) == {"etag": ETAG, "last_modified": LAST_MODIFIED}
+    # 2回目は保存した ETag / Last-Modified を付けて問い合わせる
+    client.get_bytes(server.url("/validated"))
+    headers = server.requests[-1]["headers"]
+    assert headers["If-None-Match"] == ETAG
+    assert headers["If-Modified-Since"] == LAST_MODIFIED
+
+
+def test_304_returns_stored_body(server, client):
+    first = client.get_bytes(server.url("/validated"))
+    second = client.get_bytes(server.url("/validated"))
+    assert second == first == BODY
+    assert client.stats["requests"] == 2
+    assert client.stats["not_modified"] == 1
+
+
+def test_304_without_stored_body_raises(server, client):
+    with pytest.raises(requests.HTTPError, match="304"):
+        client.get_bytes(server.url("/always-304"))
+
+
+def test_remembered_validators_without_body_raise_not_modified(server, client):
+    client.remember(server.url("/validated"), etag=ETAG)
+    with pytest.raises(NotModified):
+        client.get_bytes(server.url("/validated"))
+    assert server.requests[-1]["headers"]["If-None-Match"] == ETAG
+    assert client.stats["not_modified"] == 1
+
+
+def test_remember_keeps_body_for_same_validators(server, client):
+    client.get_bytes(server.url("/validated"))
+    client.remember(server.url("/validated"), ETAG, LAST_MODIFIED)
+    assert client.get_bytes(server.url("/validated")) == BODY
+
+
+def test_retryable_5xx_raises_http_error(server, client):
+    with pytest.raises(requests.HTTPError) as excinfo:
+        client.get_bytes(server.url("/unavailable"))
+    assert excinfo.value.response.status_code == 503
+
+
+def test_without_validators_nothing_is_stored(server, client):
+    client.get_bytes(server.url("/plain"))
+    client.get_bytes(server.url("/plain"))
+    assert "If-None-Match" not in server.requests[-1]["headers"]
+    assert client.validators(server.url("/plain")) == {}
+
+
+def test_connection_is_reused(server, client):
+    for _ in range(5):
+        client.get_bytes(server.url("/plain"))
+    # keep-alive なら同じ接続（同じ送信元ポート）から届く
+    assert len({r["client"] for r in server.requests}) == 1
@@ -0,0 +1,96 @@
+# ---------------------------------------------
+# ベンチマーク: 予報のブレ集計（analytics.py）を1年分・全オフィスで
+# ---------------------------------------------
+# 使い方:
+#   python bench/bench_analytics.py [地域数=58] [日数=365] [1日の発表回数=3]
+#
+# 一時ディレクトリの DB に合成履歴を入れ、load_history（配列への読み込み）と
+# forecast_drift + drift_by_lead（集計）の時間を測る。
+# columnar.py で列ファイルに書き出し、メモリマップから読んだ場合の時間も表示する。
+# 比較用に、同じ集計を行ごとの Python ループで行った場合の時間も表示する。
+
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import analytics
+import columnar
+import weather_data
+from fixtures import synthetic_forecast
+
+WEATHER_CODES = ("100", "101", "200", "300")
+
+
+def build_db(codes: list, days: int, per_day: int):
+    weather_data.DB_PATH = os.path.join(tempfile.mkdtemp(), "history.db")
+    weather_data.init_database()
+    start = datetime(2025, 1, 1)
+    hours = (5, 11, 17)[:per_day]
+    rng = random.Random(0)
+    for d in range(days):
+        weather_data.save_forecasts_to_db([(code, synthetic_forecast(start + timedelta(days=d, hours=h),
+                                                                     rng, WEATHER_CODES))
+                                           for h in hours for code in codes])
+
+
+def row_loop_drift() -> dict:
+    """同じ集計を1行ずつ行う版（比較用）"""
+    rows = weather_data.get_connection().execute(
+        "SELECT area_code, forecast_day, report_date, temp_max, weather_code FROM forecasts "
+        "ORDER BY area_code, forecast_day, report_epoch").fetchall()
+    sums = defaultdict(lambda: [0, 0.0, 0])
+    prev = None
+    for row in rows:
+        if prev and prev[0] == row[0] and prev[1] == row[1]:
+            lead = (datetime.strptime(str(row[1]), "%Y%m%d") - datetime.strptime(str(row[2]), "%Y%m%d")).days
+            s = sums[(row[0], lead)]
+            s[0] += 1
+            s[1] += abs(row[3] - prev[3])
+            s[2] += row[4] != prev[4]
+        prev = row
+    return sums
+
+
+def main(argv: list):
+    n_areas = int(argv[0]) if argv else 58
+    days = int(argv[1]) if len(argv) > 1 else 365
+    per_day = int(argv[2]) if len(argv) > 2 else 3
+    codes = [f"{i:02d}0000" for i in range(1, n_areas + 1)]
+    build_db(codes, days, per_day)
+
+    t = time.perf_counter()
+    history = analytics.load_history()
+    load_s = time.perf_counter() - t
+    t = time.perf_counter()
+    drift = analytics.forecast_drift(history)
+    by_lead = analytics.drift_by_lead(drift)
+    numpy_s = time.perf_counter() - t
+    t = time.perf_counter()
+    row_loop_drift()
+    loop_s = time.perf_counter() - t
+
+    out = tempfile.mkdtemp()
+    t = time.perf_counter()
+    columnar.export_forecasts(out)
+    export_s = time.perf_counter() - t
+    t = time.perf_counter()
+    analytics.history_from_columns(*columnar.open_columns(out))
+    columns_s = time.perf_counter() - t
+
+    print(f"areas={n_areas} days={days} reports/day={per_day} rows={len(history)} groups={len(drift['pairs'])}")
+    print(f"load       {load_s:8.3f} s")
+    print(f"columns    {columns_s:8.3f} s（書き出し {export_s:.3f} s）")
+    print(f"numpy      {numpy_s:8.3f} s")
+    print(f"row loop   {loop_s:8.3f} s（読み込み込み）")
+    print("\n".join(analytics.format_table(by_lead)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,166 @@
+# ---------------------------------------------
+# ベンチマーク: 予報カードの作り直し（従来）vs 日付の枠ごとの使い回し（WeekCard）
+# ---------------------------------------------
+# 使い方:
+#   python bench/bench_cards.py [描画回数=300]
+#
+# 画面は開かず、page.update() と同じ手順（build_update_commands → JSON）で
+# 1回の描画で Flet クライアントへ送る更新の大きさと、組み立てにかかる時間を比べる。
+#   switch  : 毎回ちがう地域の予報に切り替える
+#   refresh : 同じ地域を描き直す（1日分の気温だけが変わる）
+#   same    : 同じ地域を同じ内容で描き直す
+
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import flet as ft
+from flet.core.protocol import CommandEncoder
+
+from cards import WeekCard, compose_icon_from_telop, to_date_label_with_weekday
+from fixtures import synthetic_record
+from forecast_record import Forecast
+from weather_data import TELOPS
+
+
+def make_week_card(date_text, icon_control, telop, min_temp="", max_temp=""):
+    """変更前の main.make_week_card と同じカード"""
+    temp_row = ft.Row(controls=[ft.Text(min_temp, color=ft.Colors.BLUE, weight=ft.FontWeight.BOLD),
+                                ft.Text(" / "),
+                                ft.Text(max_temp, color=ft.Colors.RED, weight=ft.FontWeight.BOLD)],
+                      alignment=ft.MainAxisAlignment.CENTER)
+    return ft.Container(
+        bgcolor=ft.Colors.WHITE, border_radius=12, padding=12, margin=4,
+        shadow=ft.BoxShadow(blur_radius=6, spread_radius=0, color=ft.Colors.with_opacity(0.20, ft.Colors.BLACK)),
+        content=ft.Column(controls=[ft.Text(date_text, weight=ft.FontWeight.BOLD),
+                                    ft.Container(content=icon_control, alignment=ft.alignment.center),
+                                    ft.Text(telop, text_align=ft.TextAlign.CENTER),
+                                    temp_row],
+                         horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=6),
+        width=220, height=180
+    )
+
+
+def card_values(data: Forecast):
+    for date_time, weather_code, mn, mx in data.iter_days():
+        telop = TELOPS.get(weather_code, "") if weather_code is not None else ""
+        yield (to_date_label_with_weekday(date_time), telop,
+               f"{mn}°C" if mn is not None else "", f"{mx}°C" if mx is not None else "")
+
+
+class FakePage:
+    """page.update() の送信部分だけをまねる（uid の割り当てと index の管理）"""
+
+    def __init__(self, root: ft.Control):
+        self.root = root
+        root._Control__uid = "_0"
+        self.index = {"page": self, "_0": root}
+        self.next_id = 0
+        # 最初の送信（画面を作るときの量）
+        self.first_bytes = self.update()
+
+    def update(self) -> int:
+        """送る更新を JSON にして、そのバイト数を返す"""
+        commands, added, removed = [], [], []
+        self.root.build_update_commands(self.index, commands, added, removed)
+        payload = json.dumps(commands, cls=CommandEncoder, separators=(",", ":")).encode("utf-8")
+        for ctrl in added:
+            self.next_id += 1
+            ctrl._Control__uid = f"_{self.next_id}"
+            self.index[ctrl.uid] = ctrl
+        for ctrl in removed:
+            self.index.pop(ctrl.uid, None)
+        return len(payload)
+
+
+class RebuildView:
+    """変更前の update_forecast_cards（毎回カードと見出しを作り直す）"""
+
+    def __init__(self):
+        self.subtitle = ft.Text("")
+        self.grid = ft.GridView(runs_count=4, spacing=16, run_spacing=16, expand=True)
+        self.column = ft.Column(controls=[ft.Text("週間予報", size=18, weight=ft.FontWeight.BOLD), self.subtitle, self.grid])
+        self.page = FakePage(self.column)
+
+    def render(self, data: Forecast, name: str, code: str) -> int:
+        self.grid.controls.clear()
+        self.column.controls[0] = ft.Text(f"{name}（{code}）の週間予報", size=18, weight=ft.FontWeight.BOLD)
+        self.subtitle.value = data.report_datetime
+        for date_label, telop, min_txt, max_txt in card_values(data):
+            self.grid.controls.append(make_week_card(date_label, compose_icon_from_telop(telop), telop, min_txt, max_txt))
+        return self.page.update()
+
+
+class KeyedView:
+    """変更後の update_forecast_cards（WeekCard を使い回す）"""
+
+    def __init__(self):
+        self.title = ft.Text("週間予報", size=18, weight=ft.FontWeight.BOLD)
+        self.subtitle = ft.Text("")
+        self.grid = ft.GridView(runs_count=4, spacing=16, run_spacing=16, expand=True)
+        self.page = FakePage(ft.Column(controls=[self.title, self.subtitle, self.grid]))
+
+    def render(self, data: Forecast, name: str, code: str) -> int:
+        self.title.value = f"{name}（{code}）の週間予報"
+        self.subtitle.value = data.report_datetime
+        cards = self.grid.controls
+        while len(cards) < len(data):
+            cards.append(WeekCard())
+        del cards[len(data):]
+        for card, values in zip(cards, card_values(data)):
+            card.set(*values)
+        return self.page.update()
+
+
+def with_one_change(data: Forecast, rng: random.Random) -> Forecast:
+    temps_max = data.temps_max.tolist()
+    temps_max[rng.randrange(1, len(temps_max))] += 1
+    return Forecast.build(data.publishing_office, data.report_datetime, data.days,
+                          data.weather_codes.tolist(), data.temps_min.tolist(), temps_max)
+
+
+def run(view_class, sequence: list) -> tuple:
+    view = view_class()
+    sizes, times = [], []
+    for data, name, code in sequence:
+        t = time.perf_counter()
+        sizes.append(view.render(data, name, code))
+        times.append(time.perf_counter() - t)
+    return sizes, times
+
+
+def main(argv: list):
+    n = int(argv[0]) if argv else 300
+    rng = random.Random(0)
+    codes = sorted(TELOPS)
+    report = datetime(2025, 1, 1, 11)
+
+    areas = [(synthetic_record(report, rng, codes, first_day=0), f"地域{i}", f"{i:06d}") for i in range(n)]
+    base = areas[0]
+    scenarios = {
+        "switch": areas,
+        "refresh": [(with_one_change(base[0], rng), base[1], base[2]) for _ in range(n)],
+        "same": [base] * n,
+    }
+
+    print(f"{'':8s} {'方式':8s} {'送信量(平均)':>14s} {'組み立て p50':>14s} {'p95':>10s}")
+    for scenario, sequence in scenarios.items():
+        # 最初の1回（どちらもカードを作る）は除いて比べる
+        sequence = [base] + sequence
+        for label, view_class in (("rebuild", RebuildView), ("keyed", KeyedView)):
+            sizes, times = run(view_class, sequence)
+            sizes, times = sizes[1:], sorted(times[1:])
+            p95 = times[int(len(times) * 0.95) - 1]
+            print(f"{scenario:8s} {label:8s} {statistics.mean(sizes):12.0f} B "
+                  f"{statistics.median(times) * 1000:11.3f} ms {p95 * 1000:7.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,87 @@
+# ---------------------------------------------
+# ベンチマーク: 描画経路の DB 所要時間（接続を毎回開く vs 使い回す）
+# ---------------------------------------------
+# 使い方:
+#   python bench/bench_db.py [地域数=58] [発表回数=60]
+#
+# 一時ディレクトリに合成データの DB を作り、1地域の描画で行う DB 処理
+#   get_forecast_from_db → get_forecast_dates_for_area
+# を全地域について繰り返したときの1地域あたりの時間を比べる。
+#   per-call : 呼び出しごとに sqlite3.connect する（従来の方式、journal_mode=DELETE）
+#   managed  : db.ConnectionManager（WAL + PRAGMA + 文キャッシュ、接続は使い回し）
+#   cached   : managed に加えて予報の LRU キャッシュを通す（2回目以降の訪問に相当）
+# per-call / managed はキャッシュを通さない read_forecast_from_db で測る。
+
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import weather_data
+from db import PRAGMAS, ConnectionManager
+from fixtures import synthetic_forecast
+
+
+class PerCallConnections:
+    """従来どおり呼び出しのたびに新しい接続を開く（参照が切れた時点で閉じられる）"""
+
+    def connection(self, path: str):
+        return sqlite3.connect(path)
+
+
+def build_db(path: str, codes: list, reports: int):
+    weather_data.DB_PATH = path
+    weather_data.init_database()
+    start = datetime(2026, 1, 1, 5)
+    for r in range(reports):
+        report = start + timedelta(hours=6 * r)
+        weather_data.save_forecasts_to_db({code: synthetic_forecast(report) for code in codes})
+
+
+def render_path(codes: list, repeat: int = 5, read=None) -> float:
+    read = read or weather_data.read_forecast_from_db
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        for code in codes:
+            read(code)
+            weather_data.get_forecast_dates_for_area(code)
+        samples.append((time.perf_counter() - t) / len(codes))
+    return statistics.median(samples)
+
+
+def main(argv: list):
+    n_areas = int(argv[0]) if argv else 58
+    n_reports = int(argv[1]) if len(argv) > 1 else 60
+    codes = [f"{i:02d}0000" for i in range(1, n_areas + 1)]
+    tmp = tempfile.mkdtemp()
+
+    results = {}
+    for name, manager, build_pragmas in (("per-call", PerCallConnections(), ("PRAGMA journal_mode=DELETE",)),
+                                         ("managed", ConnectionManager(), PRAGMAS)):
+        path = os.path.join(tmp, f"{name}.db")
+        weather_data.CONNECTIONS = ConnectionManager(pragmas=build_pragmas)
+        build_db(path, codes, n_reports)
+        weather_data.CONNECTIONS = manager
+        render_path(codes, repeat=1)  # ウォームアップ
+        results[name] = render_path(codes)
+
+    render_path(codes, repeat=1, read=weather_data.get_forecast_from_db)  # キャッシュを埋める
+    results["cached"] = render_path(codes, read=weather_data.get_forecast_from_db)
+
+    print(f"areas={n_areas} reports/area={n_reports} rows={n_areas * n_reports * 7}")
+    for name, sec in results.items():
+        print(f"{name:10s} {sec * 1000:8.3f} ms / 地域")
+    print(f"speedup    {results['per-call'] / results['managed']:8.2f}x (managed)  "
+          f"{results['per-call'] / results['cached']:8.2f}x (cached)")
+    print(f"cache      {weather_data.FORECAST_CACHE.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
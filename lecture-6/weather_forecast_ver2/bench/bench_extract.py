@@ -0,0 +1,152 @@
+# ---------------------------------------------
+# ベンチマーク: 予報 JSON の全読み込み vs 必要項目だけの抽出
+# ---------------------------------------------
+# 使い方:
+#   python bench/bench_extract.py 保存済みJSONのディレクトリ or ファイル...
+#   python bench/bench_extract.py --record DIR   # 全オフィスの現在の予報を DIR に保存してから計測
+#   python bench/bench_extract.py --synthetic [件数=58]   # 合成したオフィスの予報 JSON で計測（通信しない）
+#
+# 比較するのは
+#   full      : json.loads で文書全体を読み、parse_forecast で取り出す（extract_forecast と同じ）
+#   selective : 先頭の publishingOffice / reportDatetime と週間予報（payload[1]）の始まりを
+#               正規表現で探し、週間予報だけを丸ごとデコードする（天気文・風・波を含む短期予報は
+#               オブジェクトにしない）。速さの差は 2 割ほどで、読み飛ばした部分が壊れていても
+#               気付けないため、アプリでは使っていない。比較のためにここに残している。
+# 合成データ（fixtures.synthetic_office_payload）は実物と同じ項目をそろえた 1件 4KiB ほどの JSON で、
+# 同じ種から作るので何度実行しても同じ入力になる。
+# CPU 時間は全ファイル1周あたりの中央値、メモリは1文書あたりの tracemalloc ピークの最大値と
+# 結果として残る量の合計。
+
+import glob
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from fixtures import synthetic_office_payload
+from weather_data import AREA_JSON_URL, FORECAST_BASE, HTTP, parse_forecast
+
+_JSON_STR = r'"(?:[^"\\]|\\.)*"'
+_HEAD_RE = re.compile(r'\s*\[\s*\{\s*"publishingOffice"\s*:\s*(' + _JSON_STR +
+                      r')\s*,\s*"reportDatetime"\s*:\s*(' + _JSON_STR + r')')
+_NEXT_ELEMENT_RE = re.compile(r'\}\s*,\s*(?=\{\s*"publishingOffice")')
+_DECODER = json.JSONDecoder()
+
+
+def record(directory: str):
+    os.makedirs(directory, exist_ok=True)
+    offices = HTTP.get_json(AREA_JSON_URL).get("offices", {})
+    for code in sorted(offices):
+        with open(os.path.join(directory, f"{code}.json"), "wb") as f:
+            f.write(HTTP.get_bytes(f"{FORECAST_BASE}{code}.json"))
+    print(f"{len(offices)} 件を {directory} に保存しました")
+
+
+def load_payloads(paths: list) -> list:
+    files = []
+    for p in paths:
+        if os.path.isdir(p):
+            files.extend(sorted(glob.glob(os.path.join(p, "*.json"))))
+        else:
+            files.append(p)
+    payloads = []
+    for path in files:
+        with open(path, "rb") as f:
+            payloads.append(f.read())
+    return payloads
+
+
+def synthetic_payloads(n: int) -> list:
+    """n オフィス分の合成の予報 JSON（bytes。気象庁と同じく非 ASCII はエスケープしない）"""
+    rng = random.Random(0)
+    start = datetime(2026, 1, 1, 11)
+    return [json.dumps(synthetic_office_payload(start + timedelta(days=i % 7), rng, n_areas=1 + i % 4),
+                       ensure_ascii=False).encode("utf-8")
+            for i in range(n)]
+
+
+def full_path(raw: bytes):
+    return parse_forecast(json.loads(raw))
+
+
+def selective_path(raw: bytes):
+    """週間予報だけをデコードする（以前の extract_forecast と同じ処理）"""
+    if isinstance(raw, (bytes, bytearray)):
+        raw = raw.decode("utf-8")
+    head = _HEAD_RE.match(raw)
+    nxt = _NEXT_ELEMENT_RE.search(raw, head.end()) if head else None
+    if nxt:
+        try:
+            weekly, end = _DECODER.raw_decode(raw, nxt.end())
+            if isinstance(weekly, dict) and raw[end:end + 1] in ("]", ","):
+                first = {"publishingOffice": json.loads(head.group(1)),
+                         "reportDatetime": json.loads(head.group(2))}
+                return parse_forecast([first, weekly])
+        except ValueError:
+            pass
+    # 想定と違う形のときは全体を読む
+    return full_path(raw)
+
+
+def measure(fn, payloads: list, repeat: int = 5):
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        for raw in payloads:
+            fn(raw)
+        times.append(time.perf_counter() - t)
+
+    # 1文書を処理する間のピークと、処理後に残る結果の大きさ
+    peaks = []
+    retained = 0
+    tracemalloc.start()
+    for raw in payloads:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        result = fn(raw)
+        current, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+        retained += current - before
+        del result
+    tracemalloc.stop()
+    return statistics.median(times), max(peaks), retained
+
+
+def main(argv: list):
+    if len(argv) >= 2 and argv[0] == "--record":
+        record(argv[1])
+        argv = argv[1:]
+    if not argv:
+        print("使い方: bench_extract.py [--record DIR] DIR|FILE ... | --synthetic [件数]")
+        return 1
+
+    if argv[0] == "--synthetic":
+        payloads = synthetic_payloads(int(argv[1]) if len(argv) > 1 else 58)
+    else:
+        payloads = load_payloads(argv)
+    if not payloads:
+        print("JSON ファイルが見つかりません")
+        return 1
+
+    # 結果が一致することを先に確認する
+    for raw in payloads:
+        assert full_path(raw) == selective_path(raw)
+
+    total_kb = sum(len(p) for p in payloads) / 1024
+    print(f"payloads: {len(payloads)} 件 / {total_kb:.0f} KiB")
+    print(f"{'':10s} {'cpu(ms)':>10s} {'peak(KiB)':>10s} {'kept(KiB)':>10s}")
+    for name, fn in (("full", full_path), ("selective", selective_path)):
+        cpu, peak, kept = measure(fn, payloads)
+        print(f"{name:10s} {cpu * 1000:10.2f} {peak / 1024:10.1f} {kept / 1024:10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,94 @@
+# ---------------------------------------------
+# ベンチマーク: テロップ → アイコン（正規表現で毎回解析 vs 天気コードの表を引く）
+# ---------------------------------------------
+# 使い方:
+#   python bench/bench_icons.py [カード数=100000]
+#
+#   spec    : アイコンの形を決めるところまで（コントロールは作らない）
+#   control : カードに入れるコントロールを作るところまで（変更前の compose_icon_from_telop と同じ結果）
+
+import os
+import random
+import re as _re
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from cards import icon_from_spec, icon_spec, icon_spec_for_telop, keyword_to_emoji
+from weather_data import TELOPS
+
+
+def legacy_icon_spec(telop: str) -> tuple:
+    """変更前の compose_icon_from_telop と同じ順の解析（正規表現は毎回 re.search）"""
+    if not telop:
+        return ("single", "⛅", None)
+    m = _re.search(r"(.+?)で(.+?)を伴う", telop)
+    if m:
+        return ("single", keyword_to_emoji(m.group(2)), None)
+    for pattern, layout in ((r"(.+?)時々(.+)", "top_right"), (r"(.+?)一時(.+)", "bottom_right"),
+                            (r"(.+?)後(.+)", "row")):
+        m = _re.search(pattern, telop)
+        if m:
+            e_pri, e_sec = keyword_to_emoji(m.group(1)), keyword_to_emoji(m.group(2))
+            return ("single", e_pri, None) if e_pri == e_sec else (layout, e_pri, e_sec)
+    m = _re.search(r"(.+?)か(.+)", telop)
+    if m:
+        return ("single", keyword_to_emoji(m.group(1)), None)
+    return ("single", keyword_to_emoji(telop), None)
+
+
+def best(fn, number: int) -> float:
+    """1回あたりの秒（5回測って一番速い値）"""
+    return min(timeit.repeat(fn, number=1, repeat=5)) / number
+
+
+def main(argv: list):
+    n = int(argv[0]) if argv else 100_000
+    rng = random.Random(0)
+    codes = [rng.choice(list(TELOPS)) for _ in range(n)]
+    telops = [TELOPS[c] for c in codes]
+    assert all(legacy_icon_spec(t) == icon_spec(c, t) for c, t in zip(codes, telops))
+
+    def spec_legacy():
+        for t in telops:
+            legacy_icon_spec(t)
+
+    def spec_table():
+        for c, t in zip(codes, telops):
+            icon_spec(c, t)
+
+    def spec_fallback():
+        for t in telops:
+            icon_spec_for_telop.__wrapped__(t)
+
+    m = min(n, 10_000)
+
+    def control_legacy():
+        for t in telops[:m]:
+            icon_from_spec(legacy_icon_spec(t))
+
+    def control_table():
+        for c, t in zip(codes[:m], telops[:m]):
+            icon_from_spec(icon_spec(c, t))
+
+    t = time.perf_counter()
+    for code, telop in TELOPS.items():
+        icon_spec_for_telop.__wrapped__(telop)
+    print(f"表の作成（{len(TELOPS)} コード）: {(time.perf_counter() - t) * 1000:.2f} ms")
+
+    rows = [
+        ("spec", "regex（変更前）", best(spec_legacy, n)),
+        ("spec", "regex（コンパイル済み・キャッシュなし）", best(spec_fallback, n)),
+        ("spec", "表を引く", best(spec_table, n)),
+        ("control", "regex（変更前）", best(control_legacy, m)),
+        ("control", "表を引く", best(control_table, m)),
+    ]
+    for stage, label, seconds in rows:
+        print(f"{stage:8s} {label:40s} {seconds * 1e6:8.3f} µs/カード")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
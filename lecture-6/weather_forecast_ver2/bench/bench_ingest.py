@@ -0,0 +1,122 @@
+# ---------------------------------------------
+# ベンチマーク: 予報の保存スループット（1行ずつ vs 一括）
+# ---------------------------------------------
+# 使い方:
+#   python bench/bench_ingest.py [地域数=58] [発表回数=20]
+#
+#   row-by-row : 従来の save_forecast_to_db（1日ごとに INSERT、気温は毎回線形探索、地域ごとにコミット）
+#   per-row    : 今のスキーマに forecast_rows の行を1行ずつ INSERT し、地域ごとにコミット（ハッシュの照合なし）
+#   per-area   : 今の save_forecast_to_db を地域ごとに呼ぶ（今のスキーマ、地域ごとにコミット）
+#   batched    : save_forecasts_to_db（発表1回分の全地域を executemany で1トランザクションに）
+# どれも同じ行を空の DB に書き込み、1秒あたりの行数を表示する。
+# row-by-row は変更前のスキーマ（TEXT のみ・UNIQUE 以外のインデックスなし）、ほかは今のスキーマ
+# （型付きの列・複合インデックス・内容ハッシュの表）に書くので、1行あたりの SQLite の仕事が多い。
+# 一括にした効果は、同じスキーマに書く per-row / per-area と batched の差で見る。
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import weather_data
+from fixtures import synthetic_forecast
+from forecast_record import Forecast
+from weather_data import TELOPS, get_connection
+
+# 変更前のスキーマ（すべて TEXT）。row-by-row はこの形の DB に書く
+LEGACY_DDL = """
+CREATE TABLE IF NOT EXISTS forecasts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    area_code TEXT NOT NULL,
+    forecast_date TEXT NOT NULL,
+    report_datetime TEXT NOT NULL,
+    weather_code TEXT,
+    telop TEXT,
+    temp_min TEXT,
+    temp_max TEXT,
+    publishing_office TEXT,
+    UNIQUE(area_code, forecast_date, report_datetime)
+)
+"""
+
+
+def legacy_save_forecast_to_db(area_code: str, forecast_data: dict):
+    """変更前の save_forecast_to_db と同じ処理"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    publishing_office = forecast_data.get("publishingOffice", "")
+    report_datetime = forecast_data.get("reportDatetime", "")
+    for forecast in forecast_data.get("weekly", []):
+        date_time = forecast.get("dateTime", "")
+        weather_code = forecast.get("weatherCode", "")
+        telop = ""
+        try:
+            telop = TELOPS.get(int(weather_code), "")
+        except Exception:
+            pass
+        temp_min = ""
+        temp_max = ""
+        for temp_data in forecast_data.get("weekly_temps", []):
+            if temp_data.get("dateTime") == date_time:
+                temp_min = temp_data.get("min", "")
+                temp_max = temp_data.get("max", "")
+                break
+        cursor.execute(
+            """
+            INSERT OR REPLACE INTO forecasts
+            (area_code, forecast_date, report_datetime, weather_code, telop, temp_min, temp_max, publishing_office)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (area_code, date_time, report_datetime, weather_code, telop, temp_min, temp_max, publishing_office)
+        )
+    conn.commit()
+
+
+def main(argv: list):
+    n_areas = int(argv[0]) if argv else 58
+    n_reports = int(argv[1]) if len(argv) > 1 else 20
+    codes = [f"{i:02d}0000" for i in range(1, n_areas + 1)]
+    start = datetime(2026, 1, 1, 5)
+    batches = [{code: synthetic_forecast(start + timedelta(hours=6 * r), codes=("201",)) for code in codes}
+               for r in range(n_reports)]
+    # 取得結果は Forecast で届くので、batched にはそれを渡す
+    record_batches = [{code: Forecast.from_dict(data) for code, data in batch.items()} for batch in batches]
+    n_rows = n_areas * n_reports * 7
+    tmp = tempfile.mkdtemp()
+
+    def legacy(batch):
+        for code, data in batch.items():
+            legacy_save_forecast_to_db(code, data)
+
+    def per_row(batch):
+        conn = get_connection()
+        for code, forecast in batch.items():
+            for row in weather_data.forecast_rows(code, forecast):
+                conn.execute(weather_data._UPSERT_FORECAST_SQL, row)
+            conn.commit()
+
+    def per_area(batch):
+        for code, forecast in batch.items():
+            weather_data.save_forecast_to_db(code, forecast)
+
+    print(f"areas={n_areas} reports={n_reports} rows={n_rows}")
+    for name, save in (("row-by-row", legacy), ("per-row", per_row), ("per-area", per_area),
+                       ("batched", weather_data.save_forecasts_to_db)):
+        weather_data.DB_PATH = os.path.join(tmp, f"{name}.db")
+        if save is legacy:
+            get_connection().execute(LEGACY_DDL)
+        else:
+            weather_data.init_database()
+        t = time.perf_counter()
+        for batch in (batches if save is legacy else record_batches):
+            save(batch)
+        elapsed = time.perf_counter() - t
+        print(f"{name:12s} {elapsed * 1000:9.1f} ms  {n_rows / elapsed:10.0f} rows/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
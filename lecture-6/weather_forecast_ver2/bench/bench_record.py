@@ -0,0 +1,201 @@
+# ---------------------------------------------
+# ベンチマーク: 予報の dict（従来）vs Forecast（__slots__ + array）
+# ---------------------------------------------
+# 使い方:
+#   python bench/bench_record.py [地域数=58] [1地域あたりの発表数=1]
+#
+# 全オフィス分の予報をメモリに持ったときの大きさと、次の変換にかかる時間を比べる。
+#   parse  : 気象庁 JSON（読み込み済みの list）→ 予報
+#   save   : 気象庁 JSON → 予報 → DB に書く行（取得して保存するまで）
+#   db     : DB の行 → 予報
+#   render : 予報 → カードに出す値（日付, 天気, 最低, 最高）
+#            dict は描画のたびに気温の対応表を作り直す（変更前の update_forecast_cards と同じ）
+
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from fixtures import synthetic_payload
+from forecast_record import Forecast
+from weather_data import TELOPS, datetime_to_epoch, date_to_int, forecast_rows, parse_forecast
+
+
+def legacy_parse_forecast(payload) -> dict:
+    """変更前の parse_forecast と同じ処理"""
+    result = {"publishingOffice": None, "reportDatetime": None, "weekly": [], "weekly_temps": []}
+    if len(payload) > 0:
+        result["publishingOffice"] = payload[0].get("publishingOffice")
+        result["reportDatetime"] = payload[0].get("reportDatetime")
+    if len(payload) > 1:
+        tsw = payload[1].get("timeSeries", [])
+        if len(tsw) > 0:
+            tdefs = tsw[0].get("timeDefines", [])
+            areas = tsw[0].get("areas", [])
+            if areas:
+                wcodes = areas[0].get("weatherCodes", [])
+                for i, dt in enumerate(tdefs):
+                    result["weekly"].append({"dateTime": dt, "weatherCode": wcodes[i] if i < len(wcodes) else ""})
+        if len(tsw) > 1:
+            tdefs = tsw[1].get("timeDefines", [])
+            areas = tsw[1].get("areas", [])
+            if areas:
+                mins = areas[0].get("tempsMin", [])
+                maxs = areas[0].get("tempsMax", [])
+                for i, dt in enumerate(tdefs):
+                    result["weekly_temps"].append({"dateTime": dt,
+                                                   "min": mins[i] if i < len(mins) else None,
+                                                   "max": maxs[i] if i < len(maxs) else None})
+    return result
+
+
+def telop_for_code(weather_code) -> str:
+    """変更前の forecast_rows が使っていた天気コード → 天気名"""
+    try:
+        return TELOPS.get(int(weather_code), "")
+    except (TypeError, ValueError):
+        return ""
+
+
+def legacy_forecast_rows(area_code: str, forecast_data: dict) -> list:
+    """変更前の forecast_rows と同じ処理（文字列の気温・天気コードをここで数値にする）"""
+    def to_number(value):
+        if value is None or value == "":
+            return None
+        try:
+            n = float(value)
+        except (TypeError, ValueError):
+            return None
+        return int(n) if n.is_integer() else n
+
+    def to_weather_code(value):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    publishing_office = forecast_data.get("publishingOffice", "")
+    report_datetime = forecast_data.get("reportDatetime", "")
+    temps = {}
+    for temp_data in forecast_data.get("weekly_temps", []):
+        temps.setdefault(temp_data.get("dateTime"), (temp_data.get("min", ""), temp_data.get("max", "")))
+    report_date = date_to_int(report_datetime)
+    report_epoch = datetime_to_epoch(report_datetime)
+    rows = []
+    for forecast in forecast_data.get("weekly", []):
+        date_time = forecast.get("dateTime", "")
+        weather_code = forecast.get("weatherCode", "")
+        temp_min, temp_max = temps.get(date_time, ("", ""))
+        rows.append((area_code, date_time, report_datetime, date_to_int(date_time), report_date, report_epoch,
+                     to_weather_code(weather_code), telop_for_code(weather_code),
+                     to_number(temp_min), to_number(temp_max), publishing_office))
+    return rows
+
+
+def legacy_from_rows(publishing_office, report_datetime, rows) -> dict:
+    """変更前の get_forecast_from_db と同じ形の組み立て"""
+    result = {"publishingOffice": publishing_office, "reportDatetime": report_datetime,
+              "weekly": [], "weekly_temps": []}
+    for forecast_date, weather_code, telop, temp_min, temp_max in rows:
+        result["weekly"].append({"dateTime": forecast_date,
+                                 "weatherCode": "" if weather_code is None else str(weather_code),
+                                 "telop": telop})
+        result["weekly_temps"].append({"dateTime": forecast_date, "min": temp_min, "max": temp_max})
+    return result
+
+
+def legacy_render_values(data: dict) -> list:
+    """変更前の update_forecast_cards がカードを作る前に行っていた処理"""
+    temp_map = {t["dateTime"]: (t["min"], t["max"]) for t in data["weekly_temps"]}
+    values = []
+    for d in data["weekly"]:
+        telop = d.get("telop", "")
+        if not telop and "weatherCode" in d:
+            try:
+                telop = TELOPS.get(int(d["weatherCode"]), "")
+            except Exception:
+                telop = ""
+        mn, mx = temp_map.get(d["dateTime"], (None, None))
+        values.append((d["dateTime"], telop,
+                       f"{mn}°C" if mn is not None and mn != "" else "",
+                       f"{mx}°C" if mx is not None and mx != "" else ""))
+    return values
+
+
+def render_values(forecast: Forecast) -> list:
+    """update_forecast_cards がカードを作る前に行う処理"""
+    return [(date_time, TELOPS.get(code, "") if code is not None else "",
+             f"{mn}°C" if mn is not None else "", f"{mx}°C" if mx is not None else "")
+            for date_time, code, mn, mx in forecast.iter_days()]
+
+
+def record_from_rows(publishing_office, report_datetime, rows) -> Forecast:
+    days, codes, _, mins, maxs = zip(*rows)
+    return Forecast.build(publishing_office, report_datetime, days, codes, mins, maxs)
+
+
+def timed(fn, items: list, repeat: int = 5) -> float:
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        for item in items:
+            fn(item)
+        samples.append(time.perf_counter() - t)
+    return statistics.median(samples) * 1000
+
+
+def retained_bytes(build) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def main(argv: list):
+    n_areas = int(argv[0]) if argv else 58
+    n_reports = int(argv[1]) if len(argv) > 1 else 1
+    start = datetime(2026, 1, 1, 5)
+    payloads = [synthetic_payload(start + timedelta(hours=6 * (i % n_reports))) for i in range(n_areas * n_reports)]
+    db_rows = [("気象庁", "2026-01-01T05:00:00+09:00",
+                [(f"2026-01-0{d + 2}T00:00:00+09:00", 101, "晴時々曇", 8, 18) for d in range(7)])] * len(payloads)
+
+    # 結果が一致することを先に確認する
+    for payload in payloads[:5]:
+        assert Forecast.from_dict(legacy_parse_forecast(payload)) == parse_forecast(payload)
+        assert legacy_forecast_rows("130000", legacy_parse_forecast(payload)) == forecast_rows("130000", parse_forecast(payload))
+        assert legacy_render_values(legacy_parse_forecast(payload)) == render_values(parse_forecast(payload))
+
+    dicts = [legacy_parse_forecast(p) for p in payloads]
+    records = [parse_forecast(p) for p in payloads]
+    mem = {
+        "dict": retained_bytes(lambda: [legacy_parse_forecast(p) for p in payloads]),
+        "Forecast": retained_bytes(lambda: [parse_forecast(p) for p in payloads]),
+    }
+    times = {
+        "dict": (timed(legacy_parse_forecast, payloads),
+                 timed(lambda p: legacy_forecast_rows("130000", legacy_parse_forecast(p)), payloads),
+                 timed(lambda r: legacy_from_rows(*r), db_rows),
+                 timed(legacy_render_values, dicts)),
+        "Forecast": (timed(parse_forecast, payloads),
+                     timed(lambda p: forecast_rows("130000", parse_forecast(p)), payloads),
+                     timed(lambda r: record_from_rows(*r), db_rows),
+                     timed(render_values, records)),
+    }
+
+    print(f"forecasts={len(payloads)}（{n_areas} 地域 × {n_reports} 発表）")
+    print(f"{'':10s} {'memory(KiB)':>12s} {'parse(ms)':>10s} {'save(ms)':>10s} {'db(ms)':>10s} {'render(ms)':>11s}")
+    for name in mem:
+        parse_ms, save_ms, db_ms, render_ms = times[name]
+        print(f"{name:10s} {mem[name] / 1024:12.1f} {parse_ms:10.2f} {save_ms:10.2f} {db_ms:10.2f} {render_ms:11.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
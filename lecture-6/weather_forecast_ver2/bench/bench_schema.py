@@ -0,0 +1,129 @@
+# ---------------------------------------------
+# ベンチマーク: 旧スキーマ（TEXT のみ・インデックスなし）vs 新スキーマ（数値列 + 複合インデックス）
+# ---------------------------------------------
+# 使い方:
+#   python bench/bench_schema.py [地域数=58] [日数=365] [1日の発表回数=2]
+#
+# 旧スキーマの DB に「全オフィス × 1年分」の合成履歴を入れ、次の3つのクエリを比べる。
+#   latest : read_forecast_from_db(code)         最新の発表
+#   by-day : read_forecast_from_db(code, 日付)   指定日の発表（旧: LIKE、 新: report_date = ?）
+#   dates  : get_forecast_dates_for_area(code)   発表日の一覧（旧: DISTINCT substr(...)）
+# 続けて init_database() による移行にかかった時間も表示する。
+
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import weather_data
+from fixtures import synthetic_forecast
+
+LEGACY_DDL = """
+CREATE TABLE forecasts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    area_code TEXT NOT NULL,
+    forecast_date TEXT NOT NULL,
+    report_datetime TEXT NOT NULL,
+    weather_code TEXT,
+    telop TEXT,
+    temp_min TEXT,
+    temp_max TEXT,
+    publishing_office TEXT,
+    UNIQUE(area_code, forecast_date, report_datetime)
+)
+"""
+
+
+def legacy_latest(conn, code, report_date=None):
+    if report_date:
+        row = conn.execute("SELECT report_datetime FROM forecasts WHERE area_code = ? AND report_datetime LIKE ? "
+                           "ORDER BY report_datetime DESC LIMIT 1", (code, f"{report_date}%")).fetchone()
+    else:
+        row = conn.execute("SELECT report_datetime FROM forecasts WHERE area_code = ? "
+                           "ORDER BY report_datetime DESC LIMIT 1", (code,)).fetchone()
+    if row:
+        conn.execute("SELECT forecast_date, weather_code, telop, temp_min, temp_max FROM forecasts "
+                     "WHERE area_code = ? AND report_datetime = ? ORDER BY forecast_date", (code, row[0])).fetchall()
+
+
+def legacy_dates(conn, code):
+    conn.execute("SELECT DISTINCT substr(report_datetime, 1, 10) AS report_date FROM forecasts "
+                 "WHERE area_code = ? ORDER BY report_date DESC", (code,)).fetchall()
+
+
+def build_legacy(path: str, codes: list, days: int, per_day: int):
+    conn = sqlite3.connect(path)
+    conn.execute(LEGACY_DDL)
+    hours = (11, 17, 5)[:per_day]
+    start = datetime(2025, 10, 1)
+    rng = random.Random(0)
+    rows = []
+    for d in range(days):
+        for h in hours:
+            report = start + timedelta(days=d, hours=h)
+            for code in codes:
+                data = synthetic_forecast(report, rng)
+                rows.extend((code, w["dateTime"], data["reportDatetime"], w["weatherCode"], "晴", t["min"], t["max"],
+                             data["publishingOffice"]) for w, t in zip(data["weekly"], data["weekly_temps"]))
+    with conn:
+        conn.executemany("INSERT INTO forecasts (area_code, forecast_date, report_datetime, weather_code, telop, "
+                         "temp_min, temp_max, publishing_office) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.close()
+    return len(rows), start
+
+
+def timed(fn, codes: list, repeat: int = 3) -> float:
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        for code in codes:
+            fn(code)
+        samples.append((time.perf_counter() - t) / len(codes))
+    return statistics.median(samples) * 1000
+
+
+def main(argv: list):
+    n_areas = int(argv[0]) if argv else 58
+    days = int(argv[1]) if len(argv) > 1 else 365
+    per_day = int(argv[2]) if len(argv) > 2 else 2
+    codes = [f"{i:02d}0000" for i in range(1, n_areas + 1)]
+    path = os.path.join(tempfile.mkdtemp(), "history.db")
+
+    n_rows, start = build_legacy(path, codes, days, per_day)
+    probe_day = (start + timedelta(days=days // 2)).strftime("%Y-%m-%d")
+    print(f"areas={n_areas} days={days} reports/day={per_day} rows={n_rows}")
+
+    legacy = sqlite3.connect(path)
+    before = {
+        "latest": timed(lambda c: legacy_latest(legacy, c), codes),
+        "by-day": timed(lambda c: legacy_latest(legacy, c, probe_day), codes),
+        "dates": timed(lambda c: legacy_dates(legacy, c), codes),
+    }
+    legacy.close()
+
+    weather_data.DB_PATH = path
+    t = time.perf_counter()
+    weather_data.init_database()
+    migrate_s = time.perf_counter() - t
+
+    after = {
+        "latest": timed(lambda c: weather_data.read_forecast_from_db(c), codes),
+        "by-day": timed(lambda c: weather_data.read_forecast_from_db(c, probe_day), codes),
+        "dates": timed(lambda c: weather_data.get_forecast_dates_for_area(c), codes),
+    }
+
+    print(f"migration: {migrate_s:.2f} s")
+    print(f"{'query':8s} {'old(ms)':>10s} {'new(ms)':>10s} {'speedup':>8s}")
+    for q in before:
+        print(f"{q:8s} {before[q]:10.3f} {after[q]:10.3f} {before[q] / after[q]:7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
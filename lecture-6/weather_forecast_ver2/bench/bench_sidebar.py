@@ -0,0 +1,102 @@
+# ---------------------------------------------
+# ベンチマーク: 地域サイドバーを全部作る（従来）vs 開いた地方だけ作る（RegionTile）
+# ---------------------------------------------
+# 使い方:
+#   python bench/bench_sidebar.py [地域数=58] [繰り返し=20]
+#
+# 画面は開かず、地域一覧から最初の page.update() で送る JSON ができるまで
+# （Python 側の初回描画にかかる時間）と、その大きさを比べる。
+# 地域数の既定値は気象庁の area.json の offices（アプリが使う一覧）と同じ件数。
+# 大きい値を渡すと、地方ごとの件数が増えたときの様子（と ListView への切り替え）を見られる。
+
+import os
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import flet as ft
+
+from bench_cards import FakePage
+from sidebar import RegionTile
+from weather_data import REGION_ORDER, region_name_for_prefix
+
+PREFIXES = [f"{i:02d}" for i in range(1, 48)]
+
+
+def synthetic_areas(n: int) -> list:
+    """都道府県の先頭2桁に順に割り振った n 件の地域"""
+    return [{"code": f"{PREFIXES[i % len(PREFIXES)]}{i // len(PREFIXES):04d}", "name": f"地域{i}"}
+            for i in range(n)]
+
+
+def group_areas(areas: list) -> list:
+    """main.build_area_tiles と同じ地方ごとのまとめ方"""
+    by_region = defaultdict(list)
+    for a in areas:
+        by_region[region_name_for_prefix(a["code"][:2])].append(a)
+    return [(region, sorted(by_region[region], key=lambda x: x["code"]))
+            for region in REGION_ORDER if by_region.get(region)]
+
+
+def eager_tiles(areas: list, on_select) -> list:
+    """変更前の build_area_tiles（全地域のボタンと lambda を最初に作る）"""
+    tiles = []
+    for region, items in group_areas(areas):
+        buttons = [
+            ft.TextButton(
+                text=f"{a['name']}  {a['code']}",
+                on_click=lambda e, c=a['code'], n=a['name']: on_select(c, n),
+                style=ft.ButtonStyle(color=ft.Colors.WHITE),
+            )
+            for a in items
+        ]
+        tiles.append(ft.ExpansionTile(title=ft.Text(region, color=ft.Colors.WHITE),
+                                      subtitle=ft.Text("タップで展開", color=ft.Colors.BLUE_GREY_200),
+                                      controls=buttons))
+    return tiles
+
+
+def lazy_tiles(areas: list, on_select) -> list:
+    return [RegionTile(region, items, on_select=on_select) for region, items in group_areas(areas)]
+
+
+def first_paint(make_tiles, areas: list) -> tuple:
+    """地域一覧 → 最初の更新の JSON まで。(秒, バイト数, コントロール数, page) を返す"""
+    t = time.perf_counter()
+    area_list_view = ft.ListView(expand=True, spacing=4, padding=8, controls=make_tiles(areas, lambda c, n: None))
+    page = FakePage(area_list_view)
+    elapsed = time.perf_counter() - t
+    return elapsed, page.first_bytes, len(page.index) - 1, page
+
+
+def main(argv: list):
+    n = int(argv[0]) if argv else 58
+    repeat = int(argv[1]) if len(argv) > 1 else 20
+    areas = synthetic_areas(n)
+    print(f"areas={n} regions={len(group_areas(areas))}")
+
+    for label, make_tiles in (("eager", eager_tiles), ("lazy", lazy_tiles)):
+        runs = [first_paint(make_tiles, areas) for _ in range(repeat)]
+        times = [r[0] for r in runs]
+        _, size, controls, page = runs[-1]
+        print(f"{label:6s} 初回描画 p50 {statistics.median(times) * 1000:8.2f} ms  "
+              f"送信 {size / 1024:8.1f} KiB  コントロール {controls:6d} 個")
+
+        if label == "lazy":
+            # 一番件数の多い地方を開いたときに送る量
+            tile = max(page.root.controls, key=lambda t: len(t.areas))
+            t = time.perf_counter()
+            tile.build_children()
+            size = page.update()
+            elapsed = time.perf_counter() - t
+            shape = "ListView" if isinstance(tile.controls[0], ft.ListView) else "そのまま"
+            print(f"{'':6s} 最大の地方を開く {elapsed * 1000:8.2f} ms  送信 {size / 1024:8.1f} KiB  "
+                  f"（{len(tile.areas)} 件, {shape}）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,115 @@
+# ---------------------------------------------
+# ベンチマーク共通: 合成の予報データ
+# ---------------------------------------------
+# どのベンチマークも「発表日時 report の翌日から7日分」の週間予報を作って使う。
+#   synthetic_forecast : 従来の dict の形（{"weekly": [...], "weekly_temps": [...]}）
+#   synthetic_record   : 同じ内容の Forecast
+#   synthetic_payload  : 気象庁の forecast/{code}.json と同じ形（[3日間予報, 週間予報]）で、週間予報の値だけ
+#   synthetic_office_payload : 同じ形で、天気文・風・波・降水確率・気温の予報区など実物と同じ項目を埋めたもの
+# rng を渡さなければ天気コードは codes[0]、気温は 10℃ / 20℃ の固定値になる。
+# rng を渡すと天気コードを codes から選び、気温も乱数にする（同じ種なら同じ並び）。
+
+import random
+from datetime import datetime, timedelta
+
+from forecast_record import Forecast
+
+OFFICE = "気象庁"
+
+
+def forecast_days(report: datetime, first_day: int = 1, n: int = 7) -> list:
+    """report の first_day 日後から n 日分の dateTime"""
+    return [(report + timedelta(days=first_day + i)).strftime("%Y-%m-%dT00:00:00+09:00") for i in range(n)]
+
+
+def synthetic_forecast(report: datetime, rng: random.Random = None, codes=("100",), first_day: int = 1) -> dict:
+    """
+    1地域・1発表分の予報（従来の dict の形）
+    first_day=0 のときは当日を含め、当日の気温は空にする（実際の発表と同じ）
+    """
+    days = forecast_days(report, first_day)
+    if rng is None:
+        weather_codes = [str(codes[0])] * len(days)
+        temps = [("10", "20")] * len(days)
+    else:
+        weather_codes = [str(rng.choice(codes)) for _ in days]
+        temps = []
+        for _ in days:
+            low = rng.randint(-5, 20)
+            temps.append((str(low), str(low + rng.randint(3, 12))))
+    if first_day == 0:
+        temps[0] = ("", "")
+    return {
+        "publishingOffice": OFFICE,
+        "reportDatetime": report.strftime("%Y-%m-%dT%H:%M:%S+09:00"),
+        "weekly": [{"dateTime": d, "weatherCode": c} for d, c in zip(days, weather_codes)],
+        "weekly_temps": [{"dateTime": d, "min": low, "max": high} for d, (low, high) in zip(days, temps)],
+    }
+
+
+def synthetic_record(report: datetime, rng: random.Random = None, codes=("100",), first_day: int = 1) -> Forecast:
+    """synthetic_forecast と同じ内容の Forecast"""
+    return Forecast.from_dict(synthetic_forecast(report, rng, codes, first_day))
+
+
+def synthetic_payload(report: datetime, rng: random.Random = None, codes=("101",)) -> list:
+    """synthetic_forecast と同じ内容を、気象庁 JSON の形（週間予報は payload[1]）にしたもの"""
+    data = synthetic_forecast(report, rng, codes)
+    days = [w["dateTime"] for w in data["weekly"]]
+    head = {"publishingOffice": data["publishingOffice"], "reportDatetime": data["reportDatetime"]}
+    return [dict(head, timeSeries=[]),
+            dict(head, timeSeries=[{"timeDefines": days, "areas": [{"weatherCodes": [w["weatherCode"] for w in data["weekly"]]}]},
+                                   {"timeDefines": days, "areas": [{"tempsMin": [t["min"] for t in data["weekly_temps"]],
+                                                                     "tempsMax": [t["max"] for t in data["weekly_temps"]]}]}])]
+
+
+WEATHERS = ("くもり　時々　晴れ", "晴れ　時々　くもり　所により　夜のはじめ頃　まで　雨",
+            "雨　昼過ぎ　から　くもり", "くもり　夕方　から　雨　所により　雷　を伴い　激しく　降る")
+WINDS = ("北の風", "北の風　後　南の風　海上　では　後　南の風　やや強く", "南西の風　やや強く")
+WAVES = ("０．５メートル", "１メートル　後　１．５メートル　うねり　を伴う")
+
+
+def _area(code: str, name: str) -> dict:
+    return {"name": name, "code": code}
+
+
+def synthetic_office_payload(report: datetime, rng: random.Random, codes=("100", "101", "200", "300"),
+                             n_areas: int = 3) -> list:
+    """
+    1オフィス分の予報 JSON（実物と同じくらいの大きさ・項目数）
+    週間予報の天気・気温は synthetic_forecast(report, rng, codes, first_day=0) と同じ作り方
+    """
+    head = {"publishingOffice": OFFICE + "（合成）", "reportDatetime": report.strftime("%Y-%m-%dT%H:%M:%S+09:00")}
+    areas = [_area(f"{130010 + i * 10}", f"地域{i}") for i in range(n_areas)]
+    hours = [(report + timedelta(hours=6 * i)).strftime("%Y-%m-%dT%H:00:00+09:00") for i in range(6)]
+    short_days = forecast_days(report, 0, 3)
+    short = dict(head, timeSeries=[
+        {"timeDefines": short_days,
+         "areas": [{"area": area, "weatherCodes": [str(rng.choice(codes)) for _ in short_days],
+                    "weathers": [rng.choice(WEATHERS) for _ in short_days],
+                    "winds": [rng.choice(WINDS) for _ in short_days],
+                    "waves": [rng.choice(WAVES) for _ in short_days]} for area in areas]},
+        {"timeDefines": hours,
+         "areas": [{"area": area, "pops": [str(rng.randrange(0, 101, 10)) for _ in hours]} for area in areas]},
+        {"timeDefines": hours[:4],
+         "areas": [{"area": _area(f"{44132 + i}", f"観測点{i}"), "temps": [str(rng.randint(-5, 35)) for _ in hours[:4]]}
+                   for i in range(n_areas)]},
+    ])
+
+    data = synthetic_forecast(report, rng, codes, first_day=0)
+    days = [w["dateTime"] for w in data["weekly"]]
+    spread = [(t["min"], t["max"]) for t in data["weekly_temps"]]
+    weekly = dict(head, timeSeries=[
+        {"timeDefines": days,
+         "areas": [{"area": areas[0], "weatherCodes": [w["weatherCode"] for w in data["weekly"]],
+                    "pops": [""] + [str(rng.randrange(0, 101, 10)) for _ in days[1:]],
+                    "reliabilities": ["", ""] + [rng.choice("ABC") for _ in days[2:]]}]},
+        {"timeDefines": days,
+         "areas": [{"area": _area("44132", "観測点0"),
+                    "tempsMin": [low for low, _ in spread], "tempsMinUpper": [low and str(int(low) + 2) for low, _ in spread],
+                    "tempsMinLower": [low and str(int(low) - 2) for low, _ in spread],
+                    "tempsMax": [high for _, high in spread], "tempsMaxUpper": [high and str(int(high) + 2) for _, high in spread],
+                    "tempsMaxLower": [high and str(int(high) - 2) for _, high in spread]}]},
+    ], tempAverage={"areas": [{"area": _area("44132", "観測点0"), "min": "10.2", "max": "18.5"}]},
+       precipAverage={"areas": [{"area": _area("44132", "観測点0"), "min": "8.4", "max": "32.1"}]})
+    return [short, weekly]
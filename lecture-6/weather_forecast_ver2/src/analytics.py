@@ -0,0 +1,224 @@
+# ---------------------------------------------
+# 予報のブレ（発表ごとの変化）の集計（NumPy）
+# ---------------------------------------------
+# 使い方:
+#   python src/analytics.py [DBのパス | columnar.py の出力ディレクトリ]
+#
+# 同じ予報対象日について発表が何回もある（report_datetime ごとに行が残る）ので、
+# 「前の発表からどれだけ変わったか」を地域 × 先行日数（予報対象日 − 発表日）ごとに集計する。
+#   ・最低 / 最高気温の変化量の平均（絶対値）と平均（符号つき）
+#   ・天気コードが変わった割合
+# 行ごとの Python ループは使わず、並べ替えた配列の隣どうしを比べて bincount でまとめる。
+# NumPy が必要（pip install numpy）。
+
+import os
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+import columnar
+import weather_data
+
+# 欠損値の目印（SQL 側で NULL をこの値にしてから NaN / -1 に置き換える）
+_MISSING = -9999
+
+# forecast_drift の戻り値の列
+DRIFT_COLUMNS = ("area_code", "lead_days", "pairs",
+                 "temp_min_abs_change", "temp_min_mean_change",
+                 "temp_max_abs_change", "temp_max_mean_change", "weather_change_rate")
+
+
+@dataclass
+class ForecastHistory:
+    """forecasts テーブルを (地域, 予報対象日, 発表時刻) の順に並べた列ごとの配列"""
+    area_codes: np.ndarray      # 地域コード（area_index の引き先）
+    area_index: np.ndarray      # int32
+    forecast_day: np.ndarray    # int32 YYYYMMDD
+    report_date: np.ndarray     # int32 YYYYMMDD
+    report_epoch: np.ndarray    # int64 UNIX 秒
+    temp_min: np.ndarray        # float32（欠損は NaN）
+    temp_max: np.ndarray        # float32（欠損は NaN）
+    weather_code: np.ndarray    # int16（欠損は -1）
+
+    def __len__(self):
+        return len(self.area_index)
+
+
+def yyyymmdd_to_days(values: np.ndarray) -> np.ndarray:
+    """YYYYMMDD の整数配列を 1970-01-01 からの日数にする"""
+    values = np.asarray(values, dtype=np.int64)
+    years = (values // 10000 - 1970).astype("timedelta64[Y]")
+    months = (values // 100 % 100 - 1).astype("timedelta64[M]")
+    days = (values % 100 - 1).astype("timedelta64[D]")
+    month_start = np.datetime64("1970-01", "M") + years.astype("timedelta64[M]") + months
+    return (month_start.astype("datetime64[D]") + days).astype(np.int64)
+
+
+def load_history(conn: sqlite3.Connection = None) -> ForecastHistory:
+    """forecasts テーブル全体を配列として読み込む"""
+    conn = conn or weather_data.get_connection()
+    dtype = [("area_code", "U16"), ("forecast_day", "i4"), ("report_date", "i4"), ("report_epoch", "i8"),
+             ("temp_min", "f4"), ("temp_max", "f4"), ("weather_code", "i2")]
+    cursor = conn.execute(
+        f"""
+        SELECT area_code, forecast_day, report_date, report_epoch,
+               IFNULL(temp_min, {_MISSING}), IFNULL(temp_max, {_MISSING}), IFNULL(weather_code, -1)
+        FROM forecasts
+        ORDER BY area_code, forecast_day, report_epoch
+        """
+    )
+    table = np.array(cursor.fetchall(), dtype=dtype)
+
+    area_codes, area_index = np.unique(table["area_code"], return_inverse=True)
+    temp_min = table["temp_min"]
+    temp_max = table["temp_max"]
+    temp_min[temp_min == _MISSING] = np.nan
+    temp_max[temp_max == _MISSING] = np.nan
+    return ForecastHistory(
+        area_codes=area_codes,
+        area_index=area_index.astype(np.int32),
+        forecast_day=table["forecast_day"],
+        report_date=table["report_date"],
+        report_epoch=table["report_epoch"],
+        temp_min=temp_min,
+        temp_max=temp_max,
+        weather_code=table["weather_code"],
+    )
+
+
+def history_from_columns(columns: dict, manifest: dict) -> ForecastHistory:
+    """columnar.open_columns で開いた列から ForecastHistory を作る（DB を読まない）"""
+    order = np.lexsort((columns["row_id"], columns["report_epoch"],
+                        columns["forecast_day"], columns["area_index"]))
+    area_index = columns["area_index"][order]
+    forecast_day = columns["forecast_day"][order]
+    report_epoch = columns["report_epoch"][order]
+    # 同じ発表を保存し直した行は row_id の大きい（後の）方だけを使う
+    keep = np.ones(len(order), dtype=bool)
+    keep[:-1] = ((area_index[1:] != area_index[:-1]) | (forecast_day[1:] != forecast_day[:-1])
+                 | (report_epoch[1:] != report_epoch[:-1]))
+    order = order[keep]
+    return ForecastHistory(
+        area_codes=np.array(manifest["area_codes"]),
+        area_index=area_index[keep],
+        forecast_day=forecast_day[keep],
+        report_date=columns["report_date"][order],
+        report_epoch=report_epoch[keep],
+        temp_min=columns["temp_min"][order],
+        temp_max=columns["temp_max"][order],
+        weather_code=columns["weather_code"][order],
+    )
+
+
+def _grouped_mean(keys: np.ndarray, values: np.ndarray, size: int):
+    """keys ごとの values の平均（NaN は数えない）と件数"""
+    valid = ~np.isnan(values)
+    counts = np.bincount(keys[valid], minlength=size)
+    sums = np.bincount(keys[valid], weights=values[valid], minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts, counts
+
+
+def forecast_drift(history: ForecastHistory) -> dict:
+    """
+    同じ地域・予報対象日の連続する発表どうしの変化を、地域 × 先行日数ごとに集計する。
+    戻り値は同じ長さの配列の dict（1要素が1つの (地域, 先行日数)、比較がない組は含めない）:
+      area_code, lead_days, pairs,
+      temp_min_abs_change, temp_min_mean_change, temp_max_abs_change, temp_max_mean_change,
+      weather_change_rate
+    先行日数は後の発表から見た値（翌日の予報なら 1）。
+    """
+    if len(history) < 2:
+        return {name: np.array([]) for name in DRIFT_COLUMNS}
+
+    # 隣の行が同じ (地域, 予報対象日) のものだけが比較の組になる
+    same = ((history.area_index[1:] == history.area_index[:-1])
+            & (history.forecast_day[1:] == history.forecast_day[:-1]))
+    later = np.flatnonzero(same) + 1
+    earlier = later - 1
+
+    lead = yyyymmdd_to_days(history.forecast_day[later]) - yyyymmdd_to_days(history.report_date[later])
+    lead = np.clip(lead, 0, None)
+    n_leads = int(lead.max()) + 1 if len(lead) else 1
+    n_groups = len(history.area_codes) * n_leads
+    keys = history.area_index[later].astype(np.int64) * n_leads + lead
+
+    d_min = (history.temp_min[later] - history.temp_min[earlier]).astype(np.float64)
+    d_max = (history.temp_max[later] - history.temp_max[earlier]).astype(np.float64)
+    code_known = (history.weather_code[later] >= 0) & (history.weather_code[earlier] >= 0)
+    code_changed = np.where(code_known, history.weather_code[later] != history.weather_code[earlier], np.nan)
+
+    pairs = np.bincount(keys, minlength=n_groups)
+    min_abs, _ = _grouped_mean(keys, np.abs(d_min), n_groups)
+    min_mean, _ = _grouped_mean(keys, d_min, n_groups)
+    max_abs, _ = _grouped_mean(keys, np.abs(d_max), n_groups)
+    max_mean, _ = _grouped_mean(keys, d_max, n_groups)
+    change_rate, _ = _grouped_mean(keys, code_changed, n_groups)
+
+    present = np.flatnonzero(pairs)
+    return {
+        "area_code": history.area_codes[present // n_leads],
+        "lead_days": present % n_leads,
+        "pairs": pairs[present],
+        "temp_min_abs_change": min_abs[present],
+        "temp_min_mean_change": min_mean[present],
+        "temp_max_abs_change": max_abs[present],
+        "temp_max_mean_change": max_mean[present],
+        "weather_change_rate": change_rate[present],
+    }
+
+
+def drift_by_lead(drift: dict) -> dict:
+    """地域ごとの集計を、組の数で重みづけして先行日数ごとにまとめ直す"""
+    lead = drift["lead_days"].astype(np.int64)
+    if not len(lead):
+        return {name: np.array([]) for name in DRIFT_COLUMNS if name != "area_code"}
+    size = int(lead.max()) + 1
+    pairs = np.bincount(lead, weights=drift["pairs"], minlength=size)
+    result = {"lead_days": np.arange(size), "pairs": pairs.astype(np.int64)}
+    for name in DRIFT_COLUMNS[3:]:
+        values = np.nan_to_num(drift[name]) * drift["pairs"]
+        weights = np.where(np.isnan(drift[name]), 0, drift["pairs"])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result[name] = np.bincount(lead, weights=values, minlength=size) / np.bincount(lead, weights=weights, minlength=size)
+    present = pairs > 0
+    return {name: values[present] for name, values in result.items()}
+
+
+def format_table(table: dict) -> list:
+    """集計結果を表示用の行にする"""
+    names = list(table)
+    lines = ["  ".join(f"{name:>20s}" for name in names)]
+    for i in range(len(table[names[0]])):
+        cells = []
+        for name in names:
+            value = table[name][i]
+            cells.append(f"{value:20.3f}" if isinstance(value, (float, np.floating)) else f"{value!s:>20s}")
+        lines.append("  ".join(cells))
+    return lines
+
+
+def main(argv: list):
+    t = time.perf_counter()
+    if argv and os.path.isdir(argv[0]):
+        history = history_from_columns(*columnar.open_columns(argv[0]))
+    else:
+        if argv:
+            weather_data.DB_PATH = argv[0]
+        history = load_history()
+    loaded = time.perf_counter() - t
+    t = time.perf_counter()
+    drift = forecast_drift(history)
+    by_lead = drift_by_lead(drift)
+    computed = time.perf_counter() - t
+
+    print(f"rows={len(history)} areas={len(history.area_codes)} load={loaded:.2f}s compute={computed:.2f}s")
+    print("\n".join(format_table(by_lead)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,125 @@
+# ---------------------------------------------
+# 週間予報カード
+# ---------------------------------------------
+# 地域や発表を切り替えるたびにカードを作り直すと、7枚分のコントロール（約20個ずつ）が
+# まるごと画面に送られる。WeekCard は日付の枠（何番目のカードか）ごとに使い回し、
+# 変わった文字やアイコンだけを書き換える。Flet は書き換えた値だけを送るので、
+# 送信量はおおむね変わった項目の数に比例する。
+
+import re as _re
+from datetime import datetime
+from functools import lru_cache
+
+import flet as ft
+
+from weather_data import TELOPS
+
+WEEKDAYS_JP = ["月","火","水","木","金","土","日"]
+
+def keyword_to_emoji(word: str) -> str:
+    if not word: return "⛅"
+    w = word
+    if "快晴" in w or "晴" in w: return "☀️"
+    if "曇" in w or "くもり" in w: return "☁️"
+    if "雷雨" in w: return "⚡️"
+    if "雨" in w or "霧雨" in w or "大雨" in w: return "☂️"
+    if "雪" in w or "みぞれ" in w or "風雪" in w or "暴風雪" in w: return "❄️"
+    if "霧" in w: return "🌫️"
+    return "☁️"
+
+# テロップの形 → アイコンの並べ方（上から順に試す）
+#   single       : 絵文字1つ
+#   top_right    : 大きい絵文字の右上に小さい絵文字（〇時々△）
+#   bottom_right : 大きい絵文字の右下に小さい絵文字（〇一時△）
+#   row          : 2つを横に並べる（〇後△）
+_TELOP_PATTERNS = [
+    (_re.compile(r"(.+?)で(.+?)を伴う"), "single", 2),
+    (_re.compile(r"(.+?)時々(.+)"), "top_right", None),
+    (_re.compile(r"(.+?)一時(.+)"), "bottom_right", None),
+    (_re.compile(r"(.+?)後(.+)"), "row", None),
+    (_re.compile(r"(.+?)か(.+)"), "single", 1),
+]
+
+@lru_cache(maxsize=256)
+def icon_spec_for_telop(telop: str) -> tuple:
+    """テロップから (並べ方, 主な絵文字, 添える絵文字 or None) を求める"""
+    if not telop:
+        return ("single", "⛅", None)
+    for pattern, layout, group in _TELOP_PATTERNS:
+        m = pattern.search(telop)
+        if not m:
+            continue
+        if group is not None:
+            return ("single", keyword_to_emoji(m.group(group)), None)
+        e_pri = keyword_to_emoji(m.group(1))
+        e_sec = keyword_to_emoji(m.group(2))
+        if e_pri == e_sec:
+            return ("single", e_pri, None)
+        return (layout, e_pri, e_sec)
+    return ("single", keyword_to_emoji(telop), None)
+
+# 天気コード → アイコンの形（TELOPS は決まった集合なので起動時に1回だけ求める）
+ICON_SPECS: dict[int, tuple] = {code: icon_spec_for_telop(telop) for code, telop in TELOPS.items()}
+
+def icon_spec(weather_code, telop: str = "") -> tuple:
+    """天気コードの表を引く（表にないコードはテロップから求める）"""
+    spec = ICON_SPECS.get(weather_code)
+    return spec if spec is not None else icon_spec_for_telop(telop)
+
+def icon_from_spec(spec: tuple) -> ft.Control:
+    layout, e_pri, e_sec = spec
+    if layout == "single":
+        return ft.Text(e_pri, size=28, text_align=ft.TextAlign.CENTER)
+    if layout == "row":
+        return ft.Row(controls=[ft.Text(e_pri, size=26), ft.Text(e_sec, size=26)],
+                      alignment=ft.MainAxisAlignment.CENTER, spacing=8)
+    big = ft.Container(content=ft.Text(e_pri, size=30), alignment=ft.alignment.center, expand=True)
+    small_align = ft.alignment.bottom_right if layout == "bottom_right" else ft.alignment.top_right
+    small = ft.Container(content=ft.Text(e_sec, size=18), alignment=small_align, padding=4, expand=True)
+    return ft.Stack(controls=[big, small], width=80, height=50)
+
+def compose_icon_from_telop(telop: str) -> ft.Control:
+    return icon_from_spec(icon_spec_for_telop(telop))
+
+def to_date_label_with_weekday(iso: str) -> str:
+    try:
+        dt = datetime.fromisoformat(iso.replace("Z", "+00:00"))
+        return dt.strftime(f"%Y-%m-%d（{WEEKDAYS_JP[dt.weekday()]}）")
+    except Exception:
+        return iso
+
+class WeekCard(ft.Container):
+    """日付の枠1つ分のカード（作り直さずに中身だけを書き換えて使い回す）"""
+
+    def __init__(self):
+        self.date_text = ft.Text("", weight=ft.FontWeight.BOLD)
+        self.icon = icon_spec(None)
+        self.icon_box = ft.Container(content=icon_from_spec(self.icon), alignment=ft.alignment.center)
+        self.telop_text = ft.Text("", text_align=ft.TextAlign.CENTER)
+        self.min_text = ft.Text("", color=ft.Colors.BLUE, weight=ft.FontWeight.BOLD)
+        self.max_text = ft.Text("", color=ft.Colors.RED, weight=ft.FontWeight.BOLD)
+        temp_row = ft.Row(controls=[self.min_text, ft.Text(" / "), self.max_text],
+                          alignment=ft.MainAxisAlignment.CENTER)
+        super().__init__(
+            bgcolor=ft.Colors.WHITE, border_radius=12, padding=12, margin=4,
+            shadow=ft.BoxShadow(blur_radius=6, spread_radius=0, color=ft.Colors.with_opacity(0.20, ft.Colors.BLACK)),
+            content=ft.Column(controls=[self.date_text, self.icon_box, self.telop_text, temp_row],
+                              horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=6),
+            width=220, height=180
+        )
+
+    def set(self, date_text: str, telop: str, min_temp: str = "", max_temp: str = "", weather_code=None) -> bool:
+        """値を書き換える。変わった項目があれば True（同じ値は書き換えないので送られない）"""
+        changed = False
+        for ctrl, value in ((self.date_text, date_text), (self.telop_text, telop),
+                            (self.min_text, min_temp), (self.max_text, max_temp)):
+            if ctrl.value != value:
+                ctrl.value = value
+                changed = True
+        spec = icon_spec(weather_code, telop)
+        if spec != self.icon:
+            # アイコンは形が変わったときだけ作り直す
+            self.icon = spec
+            self.icon_box.content = icon_from_spec(spec)
+            changed = True
+        return changed
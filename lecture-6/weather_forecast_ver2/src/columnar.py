@@ -0,0 +1,193 @@
+# ---------------------------------------------
+# forecasts テーブルの列ごとの書き出し（メモリマップで開けるバイナリ）
+# ---------------------------------------------
+# 使い方:
+#   python src/columnar.py <出力ディレクトリ> [DBのパス]
+#
+# 出力ディレクトリには列ごとの生のバイナリ（{列名}.bin）と manifest.json を置く。
+#   area_index   int32   manifest の area_codes の位置
+#   forecast_day int32   YYYYMMDD
+#   report_date  int32   YYYYMMDD
+#   report_epoch int64   UNIX 秒
+#   temp_min     float32 欠損は NaN
+#   temp_max     float32 欠損は NaN
+#   weather_code int16   欠損は -1
+#   row_id       int64   forecasts.id（どこまで書き出したかの目印）
+# 2回目以降は前回より後に入った行（id が大きい行）だけを各ファイルの末尾に追記する。
+# 同じ発表が内容を変えて保存し直された場合は新しい行として追記されるので、
+# 読む側は row_id の大きい方を使う（analytics.history_from_columns はそうしている）。
+# manifest の rows が確定した行数で、書き込み途中で止まった分は次の追記で切り詰める。
+# retention.py が古い行を消しても id による追記では消えないので、前回の書き出しのあとに
+# retention_runs が増えていたら（行を消す実行があったら）全件を書き出し直す。
+# NumPy が必要（pip install numpy）。
+
+import json
+import os
+import sqlite3
+import sys
+import time
+
+import numpy as np
+
+import weather_data
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+COLUMNS = {
+    "area_index": "int32",
+    "forecast_day": "int32",
+    "report_date": "int32",
+    "report_epoch": "int64",
+    "temp_min": "float32",
+    "temp_max": "float32",
+    "weather_code": "int16",
+    "row_id": "int64",
+}
+# 1回に DB から読む行数
+EXPORT_CHUNK_ROWS = 200_000
+# NULL の目印（SQL 側でこの値にしてから NaN / -1 に置き換える）
+_MISSING = -9999
+
+
+def _empty_manifest() -> dict:
+    return {"version": MANIFEST_VERSION, "rows": 0, "last_row_id": 0, "area_codes": [],
+            "columns": {name: {"dtype": dtype, "file": f"{name}.bin"} for name, dtype in COLUMNS.items()}}
+
+
+def read_manifest(directory: str) -> dict:
+    path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return _empty_manifest()
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _retention_runs(conn) -> int:
+    """retention.py が行を消した回数（一度も実行していなければ 0）"""
+    try:
+        return conn.execute("SELECT COUNT(*) FROM retention_runs").fetchone()[0]
+    except sqlite3.OperationalError:
+        return 0
+
+
+def _write_manifest(directory: str, manifest: dict):
+    # 書きかけの manifest を読まれないよう、別名で書いてから置き換える
+    path = os.path.join(directory, MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _chunk_to_columns(rows: list, area_positions: dict, area_codes: list) -> dict:
+    table = np.array(rows, dtype=[("area_code", "U16"), ("forecast_day", "i4"), ("report_date", "i4"),
+                                  ("report_epoch", "i8"), ("temp_min", "f4"), ("temp_max", "f4"),
+                                  ("weather_code", "i2"), ("row_id", "i8")])
+    # 地域コード → 位置（初めて出てきたコードは末尾に足す。既存の位置は変えない）
+    codes, inverse = np.unique(table["area_code"], return_inverse=True)
+    for code in codes:
+        if code not in area_positions:
+            area_positions[code] = len(area_codes)
+            area_codes.append(str(code))
+    lookup = np.array([area_positions[code] for code in codes], dtype=np.int32)
+
+    columns = {name: table[name] for name in COLUMNS if name != "area_index"}
+    columns["area_index"] = lookup[inverse]
+    for name in ("temp_min", "temp_max"):
+        columns[name][columns[name] == _MISSING] = np.nan
+    return columns
+
+
+def export_forecasts(directory: str, conn=None) -> dict:
+    """
+    前回の書き出しより後に入った行を列ファイルに追記する（初回と、retention で行が消えたあとは全件）。
+    戻り値: {"appended": 追記した行数, "rows": 合計行数, "rebuilt": 全件を書き出し直したか, "elapsed": 秒}
+    """
+    started = time.perf_counter()
+    os.makedirs(directory, exist_ok=True)
+    conn = conn or weather_data.get_connection()
+    manifest = read_manifest(directory)
+    # 読み始める前に数えておく（書き出し中に retention が走ったら次回に作り直す）
+    retention_runs = _retention_runs(conn)
+    rebuilt = manifest["rows"] > 0 and manifest.get("retention_runs", 0) != retention_runs
+    if rebuilt:
+        manifest = _empty_manifest()
+    rows = manifest["rows"]
+    area_codes = manifest["area_codes"]
+    area_positions = {code: i for i, code in enumerate(area_codes)}
+
+    files = {}
+    try:
+        for name, dtype in COLUMNS.items():
+            path = os.path.join(directory, manifest["columns"][name]["file"])
+            f = open(path, "r+b" if os.path.exists(path) else "w+b")
+            # manifest に入っていない（前回途中で止まった）分を捨てる
+            f.truncate(rows * np.dtype(dtype).itemsize)
+            f.seek(0, os.SEEK_END)
+            files[name] = f
+
+        cursor = conn.execute(
+            f"""
+            SELECT area_code, forecast_day, report_date, report_epoch,
+                   IFNULL(temp_min, {_MISSING}), IFNULL(temp_max, {_MISSING}), IFNULL(weather_code, -1), id
+            FROM forecasts WHERE id > ? ORDER BY id
+            """,
+            (manifest["last_row_id"],)
+        )
+        appended = 0
+        last_row_id = manifest["last_row_id"]
+        while True:
+            chunk = cursor.fetchmany(EXPORT_CHUNK_ROWS)
+            if not chunk:
+                break
+            columns = _chunk_to_columns(chunk, area_positions, area_codes)
+            for name, dtype in COLUMNS.items():
+                files[name].write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+            appended += len(chunk)
+            last_row_id = int(columns["row_id"][-1])
+
+        for f in files.values():
+            f.flush()
+            os.fsync(f.fileno())
+    finally:
+        for f in files.values():
+            f.close()
+
+    if appended or rebuilt:
+        manifest.update(rows=rows + appended, last_row_id=last_row_id, area_codes=area_codes,
+                        retention_runs=retention_runs, exported_at=time.time())
+        _write_manifest(directory, manifest)
+    return {"appended": appended, "rows": rows + appended, "rebuilt": rebuilt,
+            "elapsed": time.perf_counter() - started}
+
+
+def open_columns(directory: str) -> tuple:
+    """書き出した列を読み取り専用のメモリマップで開く。(列の dict, manifest) を返す"""
+    manifest = read_manifest(directory)
+    rows = manifest["rows"]
+    columns = {}
+    for name, spec in manifest["columns"].items():
+        if rows:
+            columns[name] = np.memmap(os.path.join(directory, spec["file"]), dtype=spec["dtype"],
+                                      mode="r", shape=(rows,))
+        else:
+            columns[name] = np.empty(0, dtype=spec["dtype"])
+    return columns, manifest
+
+
+def main(argv: list):
+    if not argv:
+        print("使い方: python src/columnar.py <出力ディレクトリ> [DBのパス]", file=sys.stderr)
+        return 2
+    if len(argv) > 1:
+        weather_data.DB_PATH = argv[1]
+    report = export_forecasts(argv[0])
+    print(f"appended={report['appended']} rows={report['rows']} rebuilt={report['rebuilt']} "
+          f"elapsed={report['elapsed']:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,57 @@
+# ---------------------------------------------
+# SQLite 接続の管理（スレッドごとに長寿命の接続を1本）
+# ---------------------------------------------
+# 関数ごとに connect / close していたのをやめ、スレッドごとに1本の接続を使い回す。
+# ・journal_mode=WAL: 読み込みと書き込みが互いに待たない（バックグラウンド更新中も描画できる）
+# ・synchronous=NORMAL: WAL ではこれで十分安全で、コミットごとの fsync が減る
+# ・cache_size: ページキャッシュを広げる
+# ・auto_vacuum=INCREMENTAL: 古い行を消したあと incremental_vacuum で容量を返せる（retention.py）
+# ・cached_statements: 同じ SQL 文のコンパイル結果を接続ごとに再利用する
+# sqlite3 の接続はスレッドをまたいで使えないので、threading.local で持ち分ける。
+
+import sqlite3
+import threading
+
+PRAGMAS = (
+    "PRAGMA auto_vacuum=INCREMENTAL",  # 新しい DB のみ有効（WAL 切り替えより前に設定する）
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-8000",      # 約 8MB
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+STATEMENT_CACHE_SIZE = 256
+
+
+class ConnectionManager:
+    def __init__(self, pragmas=PRAGMAS):
+        self.pragmas = pragmas
+        self._local = threading.local()
+
+    def _connections(self) -> dict:
+        conns = getattr(self._local, "conns", None)
+        if conns is None:
+            conns = self._local.conns = {}
+        return conns
+
+    def connection(self, path: str) -> sqlite3.Connection:
+        """このスレッド用の path への接続を返す（なければ開く）"""
+        conns = self._connections()
+        conn = conns.get(path)
+        if conn is None:
+            conn = sqlite3.connect(path, timeout=5.0, cached_statements=STATEMENT_CACHE_SIZE)
+            for pragma in self.pragmas:
+                conn.execute(pragma)
+            conns[path] = conn
+        return conn
+
+    def close(self, path: str = None):
+        """このスレッドの接続を閉じる（path 省略時はすべて）"""
+        conns = self._connections()
+        for p in ([path] if path else list(conns)):
+            conn = conns.pop(p, None)
+            if conn is not None:
+                conn.close()
+
+
+CONNECTIONS = ConnectionManager()
@@ -0,0 +1,70 @@
+# ---------------------------------------------
+# 予報の読み込みキャッシュ（LRU、書き込み時に該当エリアだけ無効化）
+# ---------------------------------------------
+# サイドバーで地域を行き来するたびに get_forecast_from_db が SQLite から
+# 同じ結果を組み立て直していたので、(area_code, report_date) ごとに結果を覚えておく。
+# ・上限 maxsize 件を超えたら、いちばん長く使われていないものから捨てる
+# ・save_forecasts_to_db が書き込んだエリアは、その発表日と「最新」のキーだけ消す
+# ・読み込み中に書き込みがあった場合は、古い結果を入れないように世代番号で弾く
+# キャッシュした Forecast は呼び出し側で書き換えないこと（同じものを何度も返す）。
+
+import threading
+from collections import OrderedDict
+
+FORECAST_CACHE_SIZE = 128
+
+
+class ForecastCache:
+    def __init__(self, maxsize: int = FORECAST_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """キャッシュにあれば (True, 値)、なければ (False, 世代番号) を返す"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key]
+            self.misses += 1
+            return False, self._generation
+
+    def put(self, key, value, generation: int):
+        """get で受け取った世代番号のあいだに無効化がなければ値を覚える"""
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, keys):
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+            }
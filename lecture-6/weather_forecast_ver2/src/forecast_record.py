@@ -0,0 +1,124 @@
+# ---------------------------------------------
+# 予報1件（1地域・1発表）を表すコンパクトな型
+# ---------------------------------------------
+# これまでは {"weekly": [{"dateTime": ..., "weatherCode": ...}], "weekly_temps": [...]} という
+# 入れ子の dict / list を取得・DB・UI の間で受け渡し、描画のたびに気温の対応表を作り直していた。
+# Forecast は __slots__ と array で持ち、天気コードと気温を予報対象日（days）の並びにそろえておく。
+#   weather_codes : array("h")  欠損は MISSING_CODE
+#   temps_min/max : array("f")  欠損は NaN
+# 取得（parse_forecast）・DB（get_forecast_from_db / get_forecast_history）・UI で同じ型を使う。
+# 従来の dict の形からは from_dict で作れる。
+# iter_days の値（int / float / None）は最初に呼ばれたときに一度だけ作って持っておく
+# （描画や比較のたびに配列から作り直さない。作ったあとの Forecast は書き換えないこと）。
+
+import hashlib
+from array import array
+
+MISSING_CODE = -1
+NAN = float("nan")
+
+
+def _code(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return MISSING_CODE
+
+
+def _temp(value) -> float:
+    if value is None or value == "":
+        return NAN
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return NAN
+
+
+def _codes(values) -> array:
+    try:
+        # ほとんどは "101" のような数字だけなので、まとめて変換してみる
+        return array("h", map(int, values))
+    except (TypeError, ValueError):
+        return array("h", map(_code, values))
+
+
+def _temps(values) -> array:
+    try:
+        # 空（None / ""）は NaN、0 は 0.0（偽になる値だけ見分ける）
+        return array("f", [float(v) if v else NAN if v is None or v == "" else 0.0 for v in values])
+    except (TypeError, ValueError):
+        return array("f", map(_temp, values))
+
+
+def _numbers(values: array) -> list:
+    """float32 で持っている気温を int / float / None のリストに戻す（NaN は自分自身と等しくない）"""
+    return [None if v != v else int(v) if v.is_integer() else round(v, 1) for v in values.tolist()]
+
+
+class Forecast:
+    __slots__ = ("publishing_office", "report_datetime", "days", "weather_codes", "temps_min", "temps_max",
+                 "_day_values")
+
+    def __init__(self, publishing_office=None, report_datetime=None, days=(),
+                 weather_codes=None, temps_min=None, temps_max=None):
+        self.publishing_office = publishing_office
+        self.report_datetime = report_datetime
+        self.days = tuple(days)
+        n = len(self.days)
+        self.weather_codes = weather_codes if weather_codes is not None else array("h", [MISSING_CODE]) * n
+        self.temps_min = temps_min if temps_min is not None else array("f", [NAN]) * n
+        self.temps_max = temps_max if temps_max is not None else array("f", [NAN]) * n
+        self._day_values = None
+
+    @classmethod
+    def build(cls, publishing_office, report_datetime, days, weather_codes, temps_min, temps_max):
+        """日ごとの値の並び（文字列や None を含んでよい）から作る"""
+        return cls(publishing_office, report_datetime, days,
+                   _codes(weather_codes), _temps(temps_min), _temps(temps_max))
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """従来の dict の形から作る（気温は dateTime で天気の日付に合わせる）"""
+        temps = {}
+        for t in data.get("weekly_temps", []):
+            temps.setdefault(t.get("dateTime"), (t.get("min"), t.get("max")))
+        weekly = data.get("weekly", [])
+        days = [w.get("dateTime", "") for w in weekly]
+        pairs = [temps.get(d, (None, None)) for d in days]
+        return cls.build(data.get("publishingOffice"), data.get("reportDatetime"), days,
+                         [w.get("weatherCode") for w in weekly],
+                         [p[0] for p in pairs], [p[1] for p in pairs])
+
+    def _values(self) -> tuple:
+        if self._day_values is None:
+            codes = [None if code == MISSING_CODE else code for code in self.weather_codes.tolist()]
+            self._day_values = tuple(zip(self.days, codes, _numbers(self.temps_min), _numbers(self.temps_max)))
+        return self._day_values
+
+    def iter_days(self):
+        """(dateTime, 天気コード or None, 最低気温 or None, 最高気温 or None) を日付順に返す"""
+        return iter(self._values())
+
+    def digest(self) -> str:
+        """内容のハッシュ（配列のバイト列をそのまま使うので、行のタプルを作らずに求められる）"""
+        h = hashlib.blake2b(digest_size=16)
+        for text in (self.publishing_office or "", self.report_datetime or "", "\x1f".join(self.days)):
+            h.update(text.encode("utf-8"))
+            h.update(b"\x1e")
+        h.update(self.weather_codes.tobytes())
+        h.update(self.temps_min.tobytes())
+        h.update(self.temps_max.tobytes())
+        return h.hexdigest()
+
+    def __len__(self):
+        return len(self.days)
+
+    def __eq__(self, other):
+        # 欠損の NaN どうしも等しいとみなすため、iter_days の値で比べる
+        if not isinstance(other, Forecast):
+            return NotImplemented
+        return ((self.publishing_office, self.report_datetime, self._values())
+                == (other.publishing_office, other.report_datetime, other._values()))
+
+    def __repr__(self):
+        return f"Forecast({self.report_datetime!r}, {len(self.days)} days)"
@@ -0,0 +1,123 @@
+# ---------------------------------------------
+# 保存しておいた予報 JSON の一括取り込み（オフライン）
+# ---------------------------------------------
+# 使い方:
+#   python src/ingest.py <ディレクトリ> [プロセス数]
+#
+# ディレクトリ以下（サブディレクトリも含む）の {地域コード}.json を探し、
+# fetch_forecast と同じ extract_forecast でプロセスプールを使って並列に解析する。
+# 解析結果は INGEST_BATCH 件ずつ save_forecasts_to_db で1トランザクションにまとめて書き込む。
+# 保存済みの発表と内容が同じなら書き込まないので、同じディレクトリを何度取り込んでも結果は変わらない。
+# retention.py で間引いたり集約したりした発表も内容ハッシュは残るので、取り込み直しても行は戻らない。
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from metrics import METRICS
+from weather_data import extract_forecast, init_database, save_forecasts_to_db
+
+# 1トランザクションで書き込む発表の数（1発表あたり最大7行）
+INGEST_BATCH = 1000
+# 1回にプロセスへ渡すファイル数
+CHUNK_SIZE = 32
+
+
+def find_archived_payloads(root: str) -> list:
+    """root 以下の {地域コード}.json を (地域コード, パス) のリストで返す"""
+    found = []
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            code, ext = os.path.splitext(filename)
+            if ext == ".json" and code.isdigit():
+                found.append((code, os.path.join(dirpath, filename)))
+    found.sort(key=lambda item: item[1])
+    return found
+
+
+def _parse_file(item):
+    """（子プロセス）1ファイルを解析して (地域コード, パス, 予報, エラー) を返す"""
+    code, path = item
+    try:
+        with open(path, "rb") as f:
+            return code, path, extract_forecast(f.read()), None
+    except Exception as e:
+        return code, path, None, f"{type(e).__name__}: {e}"
+
+
+def _forecast_writes() -> int:
+    """これまでに書き込んだ発表の数（取り込み中はほかに保存する処理がない前提で差を取る）"""
+    return METRICS.snapshot()["counters"].get("forecast_writes", 0)
+
+
+def ingest_directory(root: str, max_workers: int = None, batch_size: int = INGEST_BATCH, on_progress=None) -> dict:
+    """
+    root 以下の予報 JSON をすべて forecasts テーブルに取り込む。
+    戻り値: {"files": 件数, "ok": 件数, "written": 書き込んだ発表の数, "changed": [code, ...],
+            "failed": {パス: エラー文字列}, "elapsed": 秒}
+    on_progress(done, total, path, error) は1ファイル終わるごとに呼ばれる。
+    """
+    started = time.perf_counter()
+    writes_before = _forecast_writes()
+    init_database()
+    items = find_archived_payloads(root)
+    total = len(items)
+
+    ok = 0
+    changed = set()
+    failed = {}
+    batch = []
+
+    def flush():
+        changed.update(save_forecasts_to_db(batch))
+        batch.clear()
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for done, (code, path, forecast, error) in enumerate(pool.map(_parse_file, items, chunksize=CHUNK_SIZE), start=1):
+            if error is None and not forecast.report_datetime:
+                error = "reportDatetime がありません"
+            if error is None:
+                ok += 1
+                batch.append((code, forecast))
+                if len(batch) >= batch_size:
+                    flush()
+            else:
+                failed[path] = error
+            if on_progress:
+                on_progress(done, total, path, error)
+    if batch:
+        flush()
+
+    return {
+        "files": total,
+        "ok": ok,
+        "written": _forecast_writes() - writes_before,
+        "changed": sorted(changed),
+        "failed": failed,
+        "elapsed": time.perf_counter() - started,
+    }
+
+
+def main(argv: list):
+    if not argv:
+        print("使い方: python src/ingest.py <ディレクトリ> [プロセス数]", file=sys.stderr)
+        return 2
+    root = argv[0]
+    max_workers = int(argv[1]) if len(argv) > 1 else None
+
+    def on_progress(done, total, path, error):
+        if error:
+            print(f"\n失敗: {path}: {error}", file=sys.stderr)
+        if done == total or done % 100 == 0:
+            print(f"\r{done}/{total} ファイル", end="", file=sys.stderr, flush=True)
+
+    report = ingest_directory(root, max_workers=max_workers, on_progress=on_progress)
+    print(file=sys.stderr)
+    print(f"files={report['files']} ok={report['ok']} failed={len(report['failed'])} "
+          f"written={report['written']} changed_areas={len(report['changed'])} elapsed={report['elapsed']:.1f}s")
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
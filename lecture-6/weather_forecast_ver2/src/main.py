@@ -1,480 +1,111 @@
 # 使用fletバージョン：0.28.3
 
 import flet as ft
-import requests
-import time
-import re as _re
-import sqlite3
 import os
+import time
 from datetime import datetime, timedelta
 from collections import defaultdict
 
-# ---------------------------------------------
-# データベース設計と初期化
-# ---------------------------------------------
-CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
-
-DB_PATH = os.path.join(CURRENT_DIR, "weather_forecast.db")
-
-def init_database():
-    """データベースの初期化と必要なテーブルの作成"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # エリアテーブル
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS areas (
-        code TEXT PRIMARY KEY,
-        name TEXT NOT NULL,
-        region TEXT NOT NULL
-    )
-    ''')
-    
-    # 天気予報テーブル
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS forecasts (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        area_code TEXT NOT NULL,
-        forecast_date TEXT NOT NULL,
-        report_datetime TEXT NOT NULL,
-        weather_code TEXT,
-        telop TEXT,
-        temp_min TEXT,
-        temp_max TEXT,
-        publishing_office TEXT,
-        UNIQUE(area_code, forecast_date, report_datetime)
-    )
-    ''')
-    
-    conn.commit()
-    conn.close()
-
-# ---------------------------------------------
-# 気象庁 JSON
-# ---------------------------------------------
-AREA_JSON_URL = "https://www.jma.go.jp/bosai/common/const/area.json"
-FORECAST_BASE = "https://www.jma.go.jp/bosai/forecast/data/forecast/"  # {code}.json
-
-# ---------------------------------------------
-# リトライ（指数バックオフ）
-# ---------------------------------------------
-def get_json(url: str, tries: int = 3, timeout: int = 10):
-    last_err = None
-    for i in range(tries):
-        try:
-            r = requests.get(url, timeout=timeout)
-            if r.status_code in (429, 500, 502, 503, 504):
-                raise requests.HTTPError(f"HTTP {r.status_code} for {url}")
-            r.raise_for_status()
-            return r.json()
-        except Exception as e:
-            last_err = e
-            if i < tries - 1:
-                time.sleep(2 ** i)
-            else:
-                raise last_err
-
-# ---------------------------------------------
-# TELOPS（天気コード→日本語テロップ）
-# ---------------------------------------------
-TELOPS: dict[int, str] = {
-    100:"晴",101:"晴時々曇",102:"晴一時雨",103:"晴時々雨",104:"晴一時雪",105:"晴時々雪",
-    106:"晴一時雨か雪",107:"晴時々雨か雪",108:"晴一時雨か雷雨",
-    110:"晴後時々曇",111:"晴後曇",112:"晴後一時雨",113:"晴後時々雨",114:"晴後雨",
-    115:"晴後一時雪",116:"晴後時々雪",117:"晴後雪",118:"晴後雨か雪",119:"晴後雨か雷雨",
-    120:"晴朝夕一時雨",121:"晴朝の内一時雨",122:"晴夕方一時雨",
-    123:"晴山沿い雷雨",124:"晴山沿い雪",125:"晴午後は雷雨",
-    126:"晴昼頃から雨",127:"晴夕方から雨",128:"晴夜は雨",
-    130:"朝の内霧後晴",131:"晴明け方霧",132:"晴朝夕曇",
-    140:"晴時々雨で雷を伴う",160:"晴一時雪か雨",170:"晴時々雪か雨",181:"晴後雪か雨",
-    200:"曇",201:"曇時々晴",202:"曇一時雨",203:"曇時々雨",204:"曇一時雪",205:"曇時々雪",
-    206:"曇一時雨か雪",207:"曇時々雨か雪",208:"曇一時雨か雷雨",209:"霧",
-    210:"曇後時々晴",211:"曇後晴",212:"曇後一時雨",213:"曇後時々雨",214:"曇後雨",
-    215:"曇後一時雪",216:"曇後時々雪",217:"曇後雪",218:"曇後雨か雪",219:"曇後雨か雷雨",
-    220:"曇朝夕一時雨",221:"曇朝の内一時雨",222:"曇夕方一時雨",
-    223:"曇日中時々晴",224:"曇昼頃から雨",225:"曇夕方から雨",226:"曇夜は雨",
-    228:"曇昼頃から雪",229:"曇夕方から雪",230:"曇夜は雪",231:"曇海上海岸は霧か霧雨",
-    240:"曇時々雨で雷を伴う",250:"曇時々雪で雷を伴う",
-    260:"曇一時雪か雨",270:"曇時々雪か雨",281:"曇後雪か雨",
-    300:"雨",301:"雨時々晴",302:"雨時々止む",303:"雨時々雪",304:"雨か雪",
-    306:"大雨",308:"雨で暴風を伴う",309:"雨一時雪",
-    311:"雨後晴",313:"雨後曇",314:"雨後時々雪",315:"雨後雪",
-    316:"雨か雪後晴",317:"雨か雪後曇",
-    320:"朝の内雨後晴",321:"朝の内雨後曇",
-    322:"雨朝晩一時雪",323:"雨昼頃から晴",324:"雨夕方から晴",325:"雨夜は晴",
-    326:"雨夕方から雪",327:"雨夜は雪",
-    328:"雨一時強く降る",329:"雨一時みぞれ",
-    340:"雪か雨",350:"雨で雷を伴う",
-    361:"雪か雨後晴",371:"雪か雨後曇",
-    400:"雪",401:"雪時々晴",402:"雪時々止む",403:"雪時々雨",
-    405:"大雪",406:"風雪強い",407:"暴風雪",409:"雪一時雨",
-    411:"雪後晴",413:"雪後曇",414:"雪後雨",
-    420:"朝の内雪後晴",421:"朝の内雪後曇",
-    422:"雪昼頃から雨",423:"雪夕方から雨",
-    425:"雪一時強く降る",426:"雪後みぞれ",427:"雪一時みぞれ",
-    450:"雪で雷を伴う",
-    500:"快晴",
-}
-WEEKDAYS_JP = ["月","火","水","木","金","土","日"]
-
-def keyword_to_emoji(word: str) -> str:
-    if not word: return "⛅"
-    w = word
-    if "快晴" in w or "晴" in w: return "☀️"
-    if "曇" in w or "くもり" in w: return "☁️"
-    if "雷雨" in w: return "⚡️"
-    if "雨" in w or "霧雨" in w or "大雨" in w: return "☂️"
-    if "雪" in w or "みぞれ" in w or "風雪" in w or "暴風雪" in w: return "❄️"
-    if "霧" in w: return "🌫️"
-    return "☁️"
-
-def stack_center_with_corner(primary_word: str, secondary_word: str, corner: str = "top_right") -> ft.Control:
-    e_pri = keyword_to_emoji(primary_word)
-    e_sec = keyword_to_emoji(secondary_word)
-    if e_pri == e_sec:
-        return ft.Text(e_pri, size=28, text_align=ft.TextAlign.CENTER)
-    big = ft.Container(content=ft.Text(e_pri, size=30), alignment=ft.alignment.center, expand=True)
-    small_align = {"top_right": ft.alignment.top_right, "bottom_right": ft.alignment.bottom_right,
-                   "top_left": ft.alignment.top_left, "bottom_left": ft.alignment.bottom_left}.get(corner, ft.alignment.top_right)
-    small = ft.Container(content=ft.Text(e_sec, size=18), alignment=small_align, padding=4, expand=True)
-    return ft.Stack(controls=[big, small], width=80, height=50)
-
-def row_left_right(primary_word: str, secondary_word: str) -> ft.Control:
-    e_pri = keyword_to_emoji(primary_word)
-    e_sec = keyword_to_emoji(secondary_word)
-    if e_pri == e_sec:
-        return ft.Text(e_pri, size=28, text_align=ft.TextAlign.CENTER)
-    return ft.Row(controls=[ft.Text(e_pri, size=26), ft.Text(e_sec, size=26)],
-                  alignment=ft.MainAxisAlignment.CENTER, spacing=8)
-
-def compose_icon_from_telop(telop: str) -> ft.Control:
-    if not telop:
-        return ft.Text("⛅", size=28, text_align=ft.TextAlign.CENTER)
-    m伴う = _re.search(r"(.+?)で(.+?)を伴う", telop)
-    if m伴う:
-        return ft.Text(keyword_to_emoji(m伴う.group(2)), size=28, text_align=ft.TextAlign.CENTER)
-    m時々 = _re.search(r"(.+?)時々(.+)", telop)
-    if m時々:
-        return stack_center_with_corner(m時々.group(1), m時々.group(2), corner="top_right")
-    m一時 = _re.search(r"(.+?)一時(.+)", telop)
-    if m一時:
-        return stack_center_with_corner(m一時.group(1), m一時.group(2), corner="bottom_right")
-    m後 = _re.search(r"(.+?)後(.+)", telop)
-    if m後:
-        return row_left_right(m後.group(1), m後.group(2))
-    mか = _re.search(r"(.+?)か(.+)", telop)
-    if mか:
-        return ft.Text(keyword_to_emoji(mか.group(1)), size=28, text_align=ft.TextAlign.CENTER)
-    return ft.Text(keyword_to_emoji(telop), size=28, text_align=ft.TextAlign.CENTER)
-
-def to_date_label_with_weekday(iso: str) -> str:
-    try:
-        dt = datetime.fromisoformat(iso.replace("Z", "+00:00"))
-        return dt.strftime(f"%Y-%m-%d（{WEEKDAYS_JP[dt.weekday()]}）")
-    except Exception:
-        return iso
-
-# ---------------------------------------------
-# データベース操作関数
-# ---------------------------------------------
-def save_areas_to_db(areas: list):
-    """地域情報をデータベースに保存する"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    for area in areas:
-        prefix = area["code"][:2]
-        region = region_name_for_prefix(prefix)
-        cursor.execute(
-            "INSERT OR REPLACE INTO areas (code, name, region) VALUES (?, ?, ?)",
-            (area["code"], area["name"], region)
-        )
-    
-    conn.commit()
-    conn.close()
-
-def get_areas_from_db():
-    """データベースから地域情報を取得する"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT code, name, region FROM areas ORDER BY code")
-    areas = [{"code": row[0], "name": row[1], "region": row[2]} for row in cursor.fetchall()]
-    
-    conn.close()
-    return areas
-
-def save_forecast_to_db(area_code: str, forecast_data: dict):
-    """天気予報データをデータベースに保存する"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    publishing_office = forecast_data.get("publishingOffice", "")
-    report_datetime = forecast_data.get("reportDatetime", "")
-    
-    # 週間予報データの保存
-    for forecast in forecast_data.get("weekly", []):
-        date_time = forecast.get("dateTime", "")
-        weather_code = forecast.get("weatherCode", "")
-        
-        # テロップの取得
-        telop = ""
-        try:
-            n = int(weather_code)
-            telop = TELOPS.get(n, "")
-        except:
-            pass
-        
-        # 温度データの検索
-        temp_min = ""
-        temp_max = ""
-        for temp_data in forecast_data.get("weekly_temps", []):
-            if temp_data.get("dateTime") == date_time:
-                temp_min = temp_data.get("min", "")
-                temp_max = temp_data.get("max", "")
-                break
-        
-        cursor.execute(
-            """
-            INSERT OR REPLACE INTO forecasts 
-            (area_code, forecast_date, report_datetime, weather_code, telop, temp_min, temp_max, publishing_office)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (area_code, date_time, report_datetime, weather_code, telop, temp_min, temp_max, publishing_office)
-        )
-    
-    conn.commit()
-    conn.close()
-
-def get_forecast_from_db(area_code: str, report_date: str = None):
-    """
-    データベースから特定エリアの天気予報データを取得する
-    report_date が指定されていない場合は最新のデータを返す
-    """
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    result = {
-        "publishingOffice": None,
-        "reportDatetime": None,
-        "weekly": [],
-        "weekly_temps": []
-    }
-    
-    if report_date:
-        # 指定された日付の予報を取得
-        cursor.execute(
-            """
-            SELECT report_datetime, publishing_office FROM forecasts 
-            WHERE area_code = ? AND report_datetime LIKE ? 
-            ORDER BY report_datetime DESC LIMIT 1
-            """,
-            (area_code, f"{report_date}%")
-        )
-    else:
-        # 最新の予報を取得
-        cursor.execute(
-            """
-            SELECT report_datetime, publishing_office FROM forecasts 
-            WHERE area_code = ? 
-            ORDER BY report_datetime DESC LIMIT 1
-            """,
-            (area_code,)
-        )
-    
-    row = cursor.fetchone()
-    if row:
-        report_datetime, publishing_office = row
-        result["reportDatetime"] = report_datetime
-        result["publishingOffice"] = publishing_office
-        
-        # その日付の予報データを取得
-        cursor.execute(
-            """
-            SELECT forecast_date, weather_code, telop, temp_min, temp_max 
-            FROM forecasts 
-            WHERE area_code = ? AND report_datetime = ?
-            ORDER BY forecast_date
-            """,
-            (area_code, report_datetime)
-        )
-        
-        for row in cursor.fetchall():
-            forecast_date, weather_code, telop, temp_min, temp_max = row
-            result["weekly"].append({
-                "dateTime": forecast_date,
-                "weatherCode": weather_code,
-                "telop": telop
-            })
-            result["weekly_temps"].append({
-                "dateTime": forecast_date,
-                "min": temp_min,
-                "max": temp_max
-            })
-    
-    conn.close()
-    return result
-
-def get_forecast_dates_for_area(area_code: str):
-    """特定のエリアコードで利用可能な予報日付のリストを取得する"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute(
-        """
-        SELECT DISTINCT substr(report_datetime, 1, 10) as report_date
-        FROM forecasts 
-        WHERE area_code = ?
-        ORDER BY report_date DESC
-        """,
-        (area_code,)
-    )
-    
-    dates = [row[0] for row in cursor.fetchall()]
-    conn.close()
-    return dates
-
-# ---------------------------------------------
-# 取得
-# ---------------------------------------------
-def fetch_area_list():
-    """APIから地域リストを取得し、DBにも保存する"""
-    # まずDBから取得を試みる
-    db_areas = get_areas_from_db()
-    if db_areas:
-        return db_areas
-    
-    # DBにない場合はAPIから取得
-    data = get_json(AREA_JSON_URL)
-    offices = data.get("offices", {})
-    areas = [{"code": c, "name": info.get("name")} for c, info in offices.items()]
-    areas.sort(key=lambda x: x["code"])
-    
-    # DBに保存
-    save_areas_to_db(areas)
-    return areas
-
-def fetch_forecast(code: str):
-    """APIから天気予報を取得し、DBにも保存する"""
-    # APIからデータを取得
-    payload = get_json(f"{FORECAST_BASE}{code}.json")
-    result = {"publishingOffice": None, "reportDatetime": None, "weekly": [], "weekly_temps": []}
-    
-    if len(payload) > 0:
-        result["publishingOffice"] = payload[0].get("publishingOffice")
-        result["reportDatetime"] = payload[0].get("reportDatetime")
-    
-    if len(payload) > 1:
-        tsw = payload[1].get("timeSeries", [])
-        if len(tsw) > 0:
-            tdefs = tsw[0].get("timeDefines", [])
-            areas = tsw[0].get("areas", [])
-            if areas:
-                wcodes = areas[0].get("weatherCodes", [])
-                for i, dt in enumerate(tdefs):
-                    result["weekly"].append({"dateTime": dt, "weatherCode": wcodes[i] if i < len(wcodes) else ""})
-        
-        if len(tsw) > 1:
-            tdefs = tsw[1].get("timeDefines", [])
-            areas = tsw[1].get("areas", [])
-            if areas:
-                mins = areas[0].get("tempsMin", [])
-                maxs = areas[0].get("tempsMax", [])
-                for i, dt in enumerate(tdefs):
-                    result["weekly_temps"].append({
-                        "dateTime": dt,
-                        "min": mins[i] if i < len(mins) else None,
-                        "max": maxs[i] if i < len(maxs) else None
-                    })
-    
-    # DBに保存
-    save_forecast_to_db(code, result)
-    return result
-
-# ---------------------------------------------
-# ローディング
-# ---------------------------------------------
-def show_loading(page: ft.Page):
-    page.overlay.clear()
-    page.overlay.append(
-        ft.Container(
-            content=ft.Column(controls=[ft.ProgressRing(color=ft.Colors.WHITE)],
-                              alignment=ft.MainAxisAlignment.CENTER,
-                              horizontal_alignment=ft.CrossAxisAlignment.CENTER),
-            bgcolor=ft.Colors.with_opacity(0.18, ft.Colors.BLACK),
-            alignment=ft.alignment.center,
-            expand=True,
-        )
-    )
-    page.update()
-
-def hide_loading(page: ft.Page):
-    page.overlay.clear()
-    page.update()
+from weather_data import (
+    CURRENT_DIR, TELOPS, REGION_ORDER, init_database, region_name_for_prefix,
+    get_forecast_from_db, get_forecast_dates_for_area, get_forecast_history, fetch_area_list, fetch_forecast,
+)
+from cards import WEEKDAYS_JP, WeekCard, to_date_label_with_weekday
+from forecast_record import Forecast
+from metrics import METRICS
+from prefetch import prefetch_all_forecasts
+from refresher import BackgroundRefresher
+from retention import apply_retention_in_background
+from retry import ACTION_DEADLINE, CircuitOpenError
+from startup import StartupTimer
+from sidebar import RegionTile
+from ui_batch import UpdateBatcher
+from ui_worker import UiWorker
+
+# 計測値の保存先（WEATHER_METRICS_PATH で変更できる）
+METRICS_PATH = os.getenv("WEATHER_METRICS_PATH", os.path.join(CURRENT_DIR, "metrics.json"))
+# 起動ごとの起動時間の記録（WEATHER_STARTUP_LOG_PATH で変更できる）
+STARTUP_LOG_PATH = os.getenv("WEATHER_STARTUP_LOG_PATH", os.path.join(CURRENT_DIR, "startup_log.jsonl"))
+# 起動時間はこのモジュールを読み込んだ時点から数える
+LAUNCHED_AT = time.perf_counter()
 
 # ---------------------------------------------
 # 日付選択ダイアログ
 # ---------------------------------------------
-def show_date_picker_dialog(page: ft.Page, on_select):
+def show_date_picker_dialog(ui: UpdateBatcher, on_select):
     """日付選択ダイアログを表示する"""
     date_picker = ft.DatePicker(
         first_date=datetime.now() - timedelta(days=365),  # 1年前から
         last_date=datetime.now(),                        # 今日まで
         on_change=lambda e: on_select(e.date.strftime("%Y-%m-%d")),
     )
-    page.overlay.append(date_picker)
-    date_picker.open = True
-    page.update()
+    ui.open(date_picker)
 
 # ---------------------------------------------
-# UI
+# 診断パネル（計測値の表示と JSON 保存）
 # ---------------------------------------------
-def make_week_card(date_text: str, icon_control: ft.Control, telop: str, min_temp: str = "", max_temp: str = "") -> ft.Container:
-    temp_row = ft.Row(controls=[ft.Text(min_temp, color=ft.Colors.BLUE, weight=ft.FontWeight.BOLD),
-                                ft.Text(" / "),
-                                ft.Text(max_temp, color=ft.Colors.RED, weight=ft.FontWeight.BOLD)],
-                      alignment=ft.MainAxisAlignment.CENTER)
-    return ft.Container(
-        bgcolor=ft.Colors.WHITE, border_radius=12, padding=12, margin=4,
-        shadow=ft.BoxShadow(blur_radius=6, spread_radius=0, color=ft.Colors.with_opacity(0.20, ft.Colors.BLACK)),
-        content=ft.Column(controls=[ft.Text(date_text, weight=ft.FontWeight.BOLD),
-                                    ft.Container(content=icon_control, alignment=ft.alignment.center),
-                                    ft.Text(telop, text_align=ft.TextAlign.CENTER),
-                                    temp_row],
-                         horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=6),
-        width=220, height=180
+def format_metrics_lines(snap: dict) -> list:
+    lines = []
+    for stage, h in snap["stages"].items():
+        lines.append(f"{stage}: {h['count']}回  平均 {h['mean_ms']}ms  p50 ≦{h['p50_ms']}ms  "
+                     f"p95 ≦{h['p95_ms']}ms  最大 {h['max_ms']}ms")
+    for name, n in sorted(snap["counters"].items()):
+        lines.append(f"{name}: {n}")
+    if snap["db_hit_ratio"] is not None:
+        lines.append(f"DBヒット率: {snap['db_hit_ratio'] * 100:.1f}%")
+    http = snap.get("http", {})
+    if http:
+        lines.append(f"HTTP: {http['requests']}回（304: {http['not_modified']}回）  "
+                     f"受信 {http['bytes'] / 1024:.1f} KiB")
+    cache = snap.get("forecast_cache", {})
+    if cache:
+        ratio = f"{cache['hit_ratio'] * 100:.1f}%" if cache["hit_ratio"] is not None else "-"
+        lines.append(f"予報キャッシュ: ヒット {cache['hits']}回 / ミス {cache['misses']}回（{ratio}）  "
+                     f"{cache['size']}/{cache['maxsize']}件  無効化 {cache['invalidations']}件")
+    retention = snap.get("retention", {})
+    if retention.get("error"):
+        lines.append(f"古い予報の整理: 失敗（{retention['error']}）")
+    elif retention:
+        lines.append(f"古い予報の整理: 集約 {retention['rolled_up_rows']}行 / 間引き {retention['thinned_rows']}行  "
+                     f"回収 {retention['reclaimed_bytes'] / 1024:.1f} KiB")
+    for name, s in snap.get("ui_updates", {}).items():
+        lines.append(f"画面更新 {name}: {s['actions']}回  要求 {s['requested']} → 送信 {s['sent']}"
+                     f"（1回あたり {s['per_action']}）")
+    return lines or ["まだ計測値がありません"]
+
+def show_diagnostics_dialog(ui: UpdateBatcher):
+    """計測値を表示するダイアログ"""
+    body = ft.ListView(controls=[ft.Text(line, size=12, selectable=True)
+                                 for line in format_metrics_lines(METRICS.snapshot())],
+                       height=360, width=560, spacing=4)
+
+    @ui.action("metrics_saved")
+    def save_json(e):
+        path = METRICS.dump(METRICS_PATH)
+        body.controls.append(ft.Text(f"保存しました: {path}", size=12, color=ft.Colors.GREEN_800))
+        ui.update()
+
+    dlg = ft.AlertDialog(
+        title=ft.Text("診断"),
+        content=body,
+        actions=[ft.TextButton("JSONを保存", on_click=save_json),
+                 ft.TextButton("閉じる", on_click=lambda e: ui.close(dlg))],
     )
+    ui.open(dlg)
 
 # ---------------------------------------------
-# 地方グループ（見出しを「〇〇地方」にする）
+# 起動中の仮表示
 # ---------------------------------------------
-# 先頭2桁コード -> 地方名
-REGION_PREFIX_GROUPS = {
-    "北海道地方": {"01"},
-    "東北地方": {"02","03","04","05","06","07"},
-    "関東甲信地方": {"08","09","10","11","12","13","14","19","20"},
-    "北陸地方": {"16","17","18"},
-    "東海地方": {"21","22","23"},
-    "近畿地方": {"24","25","26","27","28","29","30"},
-    "中国地方": {"31","32","33","34","35"},
-    "四国地方": {"36","37","38","39"},
-    "九州地方": {"40","41","42","43","44","45","46"},
-    "沖縄地方": {"47"},
-}
-REGION_ORDER = [
-    "北海道地方","東北地方","関東甲信地方","北陸地方","東海地方",
-    "近畿地方","中国地方","四国地方","九州地方","沖縄地方"
-]
-def region_name_for_prefix(prefix: str) -> str:
-    for region, prefixes in REGION_PREFIX_GROUPS.items():
-        if prefix in prefixes:
-            return region
-    return f"その他（{prefix}xx）"
+def area_skeleton() -> list:
+    """地域一覧が届くまでの仮の表示（地方名だけを薄く並べる）"""
+    return [ft.ListTile(title=ft.Text(region, color=ft.Colors.BLUE_GREY_300), dense=True, disabled=True)
+            for region in REGION_ORDER]
 
 # ---------------------------------------------
 # メイン
 # ---------------------------------------------
 def main(page: ft.Page):
+    startup = StartupTimer(LAUNCHED_AT, STARTUP_LOG_PATH)
     page.title = "天気予報アプリ"
     page.theme_mode = ft.ThemeMode.LIGHT
     page.padding = 0
@@ -486,20 +117,30 @@ def main(page: ft.Page):
     page.update()
     page.bgcolor = ft.Colors.with_opacity(0.12, ft.Colors.BLUE_GREY)
 
-    # データベース初期化
-    init_database()
-
     # 現在選択中のエリアコードと名前
     current_area_code = None
     current_area_name = None
+    # DB・通信はワーカーで行い、結果だけを UI に戻す（同じ種類の古い読み込みは取り消される）
+    worker = UiWorker()
+    # 1回の操作の中で求められた画面更新は、操作の終わりに1回だけ送る
+    ui = UpdateBatcher(page)
+
+    @ui.action("diagnostics")
+    def open_diagnostics(e):
+        show_diagnostics_dialog(ui)
     
     appbar = ft.Container(
         bgcolor=ft.Colors.DEEP_PURPLE_800, padding=16,
-        content=ft.Row(controls=[ft.Text("天気予報", color=ft.Colors.WHITE, size=20, weight=ft.FontWeight.BOLD)], spacing=8)
+        content=ft.Row(controls=[ft.Text("天気予報", color=ft.Colors.WHITE, size=20, weight=ft.FontWeight.BOLD),
+                                 ft.Container(expand=True),
+                                 ft.IconButton(icon=ft.Icons.INSIGHTS, icon_color=ft.Colors.WHITE, tooltip="診断",
+                                               on_click=open_diagnostics)],
+                       spacing=8)
     )
     page.add(appbar)
 
-    area_list_view = ft.ListView(expand=True, spacing=4, padding=8, auto_scroll=False)
+    area_list_view = ft.ListView(expand=True, spacing=4, padding=8, auto_scroll=False,
+                                 controls=area_skeleton())
     sidebar = ft.Container(
         bgcolor=ft.Colors.BLUE_GREY_700, width=300, padding=12,
         content=ft.Column(controls=[ft.Text("地域を選択", color=ft.Colors.WHITE, size=16, weight=ft.FontWeight.BOLD),
@@ -508,8 +149,14 @@ def main(page: ft.Page):
                          spacing=8, expand=True)
     )
 
-    cards_grid = ft.GridView(runs_count=4, spacing=16, run_spacing=16, expand=True)
-    subtitle = ft.Text("", color=ft.Colors.BLUE_GREY_700, size=12)
+    # 予報が届くまでは空のカードを並べておく（届いたらそのカードを書き換える）
+    cards_grid = ft.GridView(runs_count=4, spacing=16, run_spacing=16, expand=True,
+                             controls=[WeekCard() for _ in range(7)])
+    subtitle = ft.Text("読み込み中…", color=ft.Colors.BLUE_GREY_700, size=12)
+    
+    # 読み込み中の表示（画面は覆わないので、その間もスクロールや地域の切り替えができる）
+    loading_bar = ft.ProgressBar(visible=True)
+    cancel_button = ft.TextButton(text="読み込みを中止", icon=ft.Icons.CLOSE, visible=False)
     
     # 日付選択ボタン
     date_button = ft.ElevatedButton(
@@ -533,27 +180,42 @@ def main(page: ft.Page):
         visible=False
     )
     
+    # 全地域一括更新ボタン
+    refresh_all_button = ft.ElevatedButton(
+        text="全地域を一括更新",
+        icon=ft.Icons.CLOUD_DOWNLOAD,
+        disabled=True,  # DB の準備ができてから押せるようにする
+    )
+    
     # コントロール行
     controls_row = ft.Row([
         date_button,
         current_date_text,
         refresh_button,
-        last_week_button
+        last_week_button,
+        refresh_all_button,
+        cancel_button
     ], alignment=ft.MainAxisAlignment.START, spacing=10)
     
+    # 見出し（地域を切り替えても作り直さず、文字だけを書き換える）
+    title_text = ft.Text("週間予報", size=18, weight=ft.FontWeight.BOLD)
+
     right_panel = ft.Container(
         expand=True, padding=16, bgcolor=ft.Colors.BLUE_GREY_100,
         content=ft.Column(controls=[
-            ft.Text("週間予報", size=18, weight=ft.FontWeight.BOLD),
+            title_text,
             subtitle,
             controls_row,
+            loading_bar,
             ft.Container(content=cards_grid, expand=True)
         ], spacing=10, expand=True)
     )
 
     root = ft.Row(controls=[sidebar, right_panel], expand=True)
     page.add(root)
+    startup.mark("first_paint")
 
+    @ui.action("select_date")
     def on_date_selected(selected_date):
         """カレンダーから日付が選択されたときのハンドラ"""
         if not current_area_code or not current_area_name:
@@ -570,54 +232,60 @@ def main(page: ft.Page):
             display_date = f"{selected_date}の予報"
         
         current_date_text.value = display_date
-        page.update()
+        ui.update()
     
+    def show_message(text: str):
+        ui.open(ft.SnackBar(ft.Text(text)))
+
+    def set_loading(loading: bool):
+        """予報の読み込み中表示を切り替える"""
+        loading_bar.visible = loading
+        cancel_button.visible = loading
+        ui.update()
+
     def show_last_week_forecasts(e):
         """過去1週間の予報履歴を表示するハンドラ"""
         if not current_area_code or not current_area_name:
             return
-            
-        show_loading(page)
-        
-        # 過去1週間の日付リスト
-        dates = [(datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7, 0, -1)]
-        
+
+        # 過去1週間（昨日まで）の各日の最終発表を1回のクエリで取得（ワーカーで）
+        today = datetime.now().date()
+        worker.submit("history", get_forecast_history,
+                      current_area_code, today - timedelta(days=7), today - timedelta(days=1),
+                      on_done=lambda history, name=current_area_name: show_history_dialog(history, name),
+                      on_error=lambda err: show_message(f"取得エラー: {err}"))
+
+    @ui.action("show_history")
+    def show_history_dialog(history, area_name):
         # 予報データを格納するリスト
         forecasts = []
-        
-        # 各日付についてDBから予報データを取得
-        for date in dates:
-            data = get_forecast_from_db(current_area_code, date)
-            if data["reportDatetime"]:
-                try:
-                    display_date = datetime.fromisoformat(date).strftime(f"%m/%d（{WEEKDAYS_JP[datetime.fromisoformat(date).weekday()]}）")
-                except:
-                    display_date = date
-                    
-                forecasts.append({
-                    "date": display_date,
-                    "data": data
-                })
-        
-        hide_loading(page)
-        
+        for data in history:
+            date = data.report_datetime[:10]
+            try:
+                display_date = datetime.fromisoformat(date).strftime(f"%m/%d（{WEEKDAYS_JP[datetime.fromisoformat(date).weekday()]}）")
+            except:
+                display_date = date
+
+            forecasts.append({
+                "date": display_date,
+                "data": data
+            })
+
         if not forecasts:
-            page.snack_bar = ft.SnackBar(ft.Text("過去1週間の予報データがありません"))
-            page.snack_bar.open = True
-            page.update()
+            show_message("過去1週間の予報データがありません")
             return
-            
+
         # 過去1週間の予報を表示するダイアログ
         dlg = ft.AlertDialog(
-            title=ft.Text(f"{current_area_name}の過去1週間の予報履歴"),
+            title=ft.Text(f"{area_name}の過去1週間の予報履歴"),
             content=ft.ListView(
                 controls=[
                     ft.ListTile(
                         title=ft.Text(f"{forecast['date']}"),
                         subtitle=ft.Text(
-                            f"発表: {datetime.fromisoformat(forecast['data']['reportDatetime'].replace('Z', '+00:00')).strftime('%Y-%m-%d %H:%M')}"
+                            f"発表: {datetime.fromisoformat(forecast['data'].report_datetime.replace('Z', '+00:00')).strftime('%Y-%m-%d %H:%M')}"
                         ),
-                        on_click=lambda e, date=forecast['data']['reportDatetime'][:10]: on_date_selected(date)
+                        on_click=lambda e, date=forecast['data'].report_datetime[:10]: on_date_selected(date)
                     )
                     for forecast in forecasts
                 ],
@@ -625,130 +293,176 @@ def main(page: ft.Page):
                 width=400
             ),
             actions=[
-                ft.TextButton("閉じる", on_click=lambda e: close_dialog())
+                ft.TextButton("閉じる", on_click=lambda e: ui.close(dlg))
             ]
         )
-        
-        def close_dialog():
-            dlg.open = False
-            page.update()
-        
-        page.dialog = dlg
-        dlg.open = True
-        page.update()
+        ui.open(dlg)
 
-    def render_week_from_db(code, name, report_date=None):
-        """DBから天気予報データを取得して表示する"""
-        nonlocal current_area_code, current_area_name
-        
-        if not code:
-            return
-        
-        show_loading(page)
-        current_area_code = code
-        current_area_name = name
-        
+    def fetch_with_fallback(code):
+        """（ワーカー）APIから取得する。失敗時はDBの保存済みデータと注意書きを返す"""
+        deadline = time.monotonic() + ACTION_DEADLINE
         try:
-            # DBからデータを取得
-            data = get_forecast_from_db(code, report_date)
-            
-            # データがない場合はAPIから取得
-            if not data["reportDatetime"]:
-                data = fetch_forecast(code)
+            return fetch_forecast(code, deadline=deadline), None
         except Exception as e:
-            hide_loading(page)
-            page.snack_bar = ft.SnackBar(ft.Text(f"取得エラー: {e}"))
-            page.snack_bar.open = True
-            page.update()
-            return
-        
-        # カードグリッドを更新
-        update_forecast_cards(data, name, code)
-        hide_loading(page)
-        
-        # 日付選択ボタンと過去1週間ボタンを更新
-        update_date_controls(code)
+            try:
+                data = get_forecast_from_db(code)
+            except Exception:
+                data = Forecast()
+            if not data.report_datetime:
+                raise
+            if isinstance(e, CircuitOpenError):
+                return data, "気象庁サーバーが応答しないため、保存済みの予報を表示しています"
+            return data, f"取得エラーのため保存済みの予報を表示しています: {e}"
+
+    def load_forecast_view(code, report_date=None, from_api=False):
+        """（ワーカー）表示する予報と、発表日の一覧をまとめて読み込む"""
+        notice = None
+        data = None if from_api else get_forecast_from_db(code, report_date)
+        # DBにデータがない場合はAPIから取得
+        if data is None or not data.report_datetime:
+            METRICS.incr("forecast_api_loads")
+            data, notice = fetch_with_fallback(code)
+        else:
+            METRICS.incr("forecast_db_hits")
+        return data, get_forecast_dates_for_area(code), notice
 
-    def render_week_from_api(code, name):
-        """APIから最新の天気予報データを取得して表示する"""
+    @ui.action("forecast_request")
+    def start_forecast_load(code, name, report_date=None, from_api=False):
+        """予報の読み込みをワーカーに出す（前の地域・日付の読み込みは取り消される）"""
         nonlocal current_area_code, current_area_name
-        
+
         if not code:
             return
-        
-        show_loading(page)
+
         current_area_code = code
         current_area_name = name
-        
-        try:
-            # APIから最新データを取得
-            data = fetch_forecast(code)
-        except Exception as e:
-            hide_loading(page)
-            page.snack_bar = ft.SnackBar(ft.Text(f"取得エラー: {e}"))
-            page.snack_bar.open = True
-            page.update()
-            return
-        
+        set_loading(True)
+        # show_forecast が例外を出したときも UiWorker が on_forecast_error を呼ぶので、読み込み中の表示は残らない
+        worker.submit("forecast", load_forecast_view, code, report_date, from_api,
+                      on_done=lambda result: show_forecast(result, name, code),
+                      on_error=on_forecast_error)
+
+    @ui.action("forecast_shown")
+    def show_forecast(result, name, code):
+        data, dates, notice = result
         # カードグリッドを更新
         update_forecast_cards(data, name, code)
-        hide_loading(page)
-        
         # 日付選択ボタンと過去1週間ボタンを更新
-        update_date_controls(code)
+        update_date_controls(dates)
+        set_loading(False)
+        if notice:
+            show_message(notice)
+        startup.mark("forecast")
+
+    @ui.action("forecast_error")
+    def on_forecast_error(e):
+        set_loading(False)
+        show_message(f"取得エラー: {e}")
+        startup.mark("forecast")
+
+    @ui.action("forecast_cancel")
+    def cancel_forecast_load(e):
+        """表示待ちの読み込みを取り消す（今の表示はそのまま）"""
+        worker.cancel("forecast")
+        set_loading(False)
 
+    def render_week_from_db(code, name, report_date=None):
+        """DBから天気予報データを取得して表示する"""
+        start_forecast_load(code, name, report_date)
+
+    def render_week_from_api(code, name):
+        """APIから最新の天気予報データを取得して表示する"""
+        start_forecast_load(code, name, from_api=True)
+
+    @ui.action("refresh_all")
+    def refresh_all_areas(e):
+        """全地域の予報を一括取得してDBに保存するハンドラ"""
+        if worker.busy("refresh_all"):
+            return
+        refresh_all_button.disabled = True
+        ui.update()
+
+        def on_progress(done, total, code, error):
+            worker.post(show_refresh_progress, done, total)
+
+        worker.submit("refresh_all", prefetch_all_forecasts, on_progress=on_progress,
+                      on_done=finish_refresh_all, on_error=finish_refresh_all_error)
+
+    @ui.action("refresh_progress")
+    def show_refresh_progress(done, total):
+        refresh_all_button.text = f"一括更新中 {done}/{total}"
+        ui.update()
+
+    def reset_refresh_all_button():
+        refresh_all_button.text = "全地域を一括更新"
+        refresh_all_button.disabled = False
+        ui.update()
+
+    @ui.action("refresh_all_done")
+    def finish_refresh_all(report):
+        reset_refresh_all_button()
+
+        ok = len(report["ok"])
+        ng = len(report["failed"])
+        changed = len(report["changed"])
+        msg = f"一括更新: 成功 {ok} 件（内容が変わった地域 {changed} 件）/ 失敗 {ng} 件（{report['elapsed']:.1f}秒）"
+        if ng:
+            msg += "  失敗: " + ", ".join(sorted(report["failed"]))
+        show_message(msg)
+
+        # 表示中の地域があれば最新の内容で描き直す
+        if current_area_code:
+            render_week_from_db(current_area_code, current_area_name)
+
+    @ui.action("refresh_all_error")
+    def finish_refresh_all_error(e):
+        reset_refresh_all_button()
+        show_message(f"一括更新エラー: {e}")
+
+    @METRICS.timed("render")
     def update_forecast_cards(data, name, code):
-        """天気予報カードを更新する"""
-        cards_grid.controls.clear()
-        
+        """天気予報カードを更新する（同じ位置のカードは使い回し、変わった値だけを送る）"""
         head_dt = ""
-        if data["reportDatetime"]:
+        if data.report_datetime:
             try:
-                head_dt = datetime.fromisoformat(data["reportDatetime"].replace("Z", "+00:00")).strftime("%Y-%m-%d %H:%M発表")
+                head_dt = datetime.fromisoformat(data.report_datetime.replace("Z", "+00:00")).strftime("%Y-%m-%d %H:%M発表")
             except Exception:
-                head_dt = data["reportDatetime"]
+                head_dt = data.report_datetime
         
-        right_panel.content.controls[0] = ft.Text(f"{name}（{code}）の週間予報", size=18, weight=ft.FontWeight.BOLD)
+        title_text.value = f"{name}（{code}）の週間予報"
         subtitle.value = head_dt
         
         # 表示中の日付を更新
-        if data["reportDatetime"]:
+        if data.report_datetime:
             try:
-                dt = datetime.fromisoformat(data["reportDatetime"][:10])
+                dt = datetime.fromisoformat(data.report_datetime[:10])
                 display_date = dt.strftime(f"%Y年%m月%d日（{WEEKDAYS_JP[dt.weekday()]}）の予報")
                 current_date_text.value = display_date
             except:
-                current_date_text.value = data["reportDatetime"][:10] + "の予報"
-        
-        # 温度データのマッピング
-        temp_map = {t["dateTime"]: (t["min"], t["max"]) for t in data["weekly_temps"]}
-        
-        for d in data["weekly"]:
-            date_label = to_date_label_with_weekday(d["dateTime"])
-            telop = d.get("telop", "")
-            
-            # telopがない場合は天気コードから取得
-            if not telop and "weatherCode" in d:
-                try:
-                    n = int(d["weatherCode"])
-                    telop = TELOPS.get(n, "")
-                except Exception:
-                    telop = ""
-            
-            icon_ctrl = compose_icon_from_telop(telop)
-            mn, mx = temp_map.get(d["dateTime"], (None, None))
-            min_txt = f"{mn}°C" if mn is not None and mn != "" else ""
-            max_txt = f"{mx}°C" if mx is not None and mx != "" else ""
-            
-            cards_grid.controls.append(make_week_card(date_label, icon_ctrl, telop, min_txt, max_txt))
-        
-        page.update()
-
-    def update_date_controls(area_code):
-        """日付選択の表示・非表示を切り替える"""
-        # 利用可能な日付を取得
-        dates = get_forecast_dates_for_area(area_code)
-        
+                current_date_text.value = data.report_datetime[:10] + "の予報"
+        
+        # 日数が変わったときだけカードを足す・減らす
+        cards = cards_grid.controls
+        days = len(data)
+        while len(cards) < days:
+            cards.append(WeekCard())
+            METRICS.incr("cards_created")
+        del cards[days:]
+
+        # 天気コードと気温は日付ごとにそろっている
+        for card, (date_time, weather_code, mn, mx) in zip(cards, data.iter_days()):
+            date_label = to_date_label_with_weekday(date_time)
+            telop = TELOPS.get(weather_code, "") if weather_code is not None else ""
+            min_txt = f"{mn}°C" if mn is not None else ""
+            max_txt = f"{mx}°C" if mx is not None else ""
+
+            if card.set(date_label, telop, min_txt, max_txt, weather_code):
+                METRICS.incr("cards_updated")
+        
+        ui.update()
+
+    def update_date_controls(dates):
+        """日付選択の表示・非表示を切り替える（dates は発表日の一覧）"""
         if dates:
             date_button.visible = True
             last_week_button.visible = True
@@ -756,24 +470,31 @@ def main(page: ft.Page):
             date_button.visible = False
             last_week_button.visible = False
             current_date_text.value = ""
-        
+
         # 更新ボタンを表示
         refresh_button.visible = True
-        page.update()
+        ui.update()
 
+    @ui.action("load_areas")
     def load_areas():
-        area_list_view.controls.clear()
-        show_loading(page)
-        
-        try:
-            # 地域一覧を取得（DBから→なければAPI）
-            areas = fetch_area_list()
-        except Exception as e:
-            hide_loading(page)
-            area_list_view.controls.append(ft.Text(f"地域一覧取得エラー: {e}", color=ft.Colors.RED_700))
-            page.update()
-            return
+        area_list_view.controls = area_skeleton()
+        ui.update()
 
+        # 地域一覧を取得（DBから→なければAPI）
+        worker.submit("areas", fetch_area_list, on_done=build_area_tiles, on_error=show_area_error)
+
+    @ui.action("areas_error")
+    def show_area_error(e):
+        area_list_view.controls.clear()
+        area_list_view.controls.append(ft.Text(f"地域一覧取得エラー: {e}", color=ft.Colors.RED_700))
+        set_loading(False)
+        subtitle.value = ""
+        # 初期表示の予報は出せないので、ここで起動完了とする
+        startup.mark("sidebar")
+        startup.mark("forecast")
+
+    @ui.action("areas_shown")
+    def build_area_tiles(areas):
         # --- 〇〇地方でまとめる ---
         by_region = defaultdict(list)
         for a in areas:
@@ -786,35 +507,55 @@ def main(page: ft.Page):
             items = sorted(by_region.get(region, []), key=lambda x: x["code"])
             if not items:
                 continue
-            buttons = [
-                ft.TextButton(
-                    text=f"{a['name']}  {a['code']}",
-                    on_click=lambda e, c=a['code'], n=a['name']: render_week_from_db(c, n),
-                    style=ft.ButtonStyle(color=ft.Colors.WHITE),
-                )
-                for a in items
-            ]
-            tiles.append(
-                ft.ExpansionTile(
-                    title=ft.Text(region, color=ft.Colors.WHITE),
-                    subtitle=ft.Text("タップで展開", color=ft.Colors.BLUE_GREY_200),
-                    controls=buttons
-                )
-            )
+            # 中の地域ボタンは地方を開いたときに作る
+            tiles.append(RegionTile(region, items, on_select=render_week_from_db, ui=ui))
 
+        area_list_view.controls.clear()
         area_list_view.controls.extend(tiles)
-        page.update()
-        hide_loading(page)
+        ui.update()
+        startup.mark("sidebar")
 
         # 初期表示は東京都（130000）
         render_week_from_db("130000", "東京都")
 
+    @ui.action("date_picker")
+    def open_date_picker(e):
+        show_date_picker_dialog(ui, on_date_selected)
+
     # イベントハンドラの設定
-    date_button.on_click = lambda e: show_date_picker_dialog(page, on_date_selected)
+    date_button.on_click = open_date_picker
     refresh_button.on_click = lambda e: render_week_from_api(current_area_code, current_area_name)
     last_week_button.on_click = show_last_week_forecasts
-
-    # アプリ起動
-    load_areas()
+    refresh_all_button.on_click = refresh_all_areas
+    cancel_button.on_click = cancel_forecast_load
+
+    @ui.action("background_refreshed")
+    def on_background_refreshed(report):
+        """裏の更新で表示中の地域の内容が変わったら描き直す"""
+        if current_area_code and current_area_code in report["changed"]:
+            render_week_from_db(current_area_code, current_area_name)
+
+    # 発表時刻に合わせて裏で DB を最新にしておく（DB の準備ができてから動かす）
+    # 結果は更新スレッドから UiWorker の配送スレッドに渡して、画面はそちらで書き換える
+    refresher = BackgroundRefresher(on_refreshed=lambda report: worker.post(on_background_refreshed, report))
+
+    @ui.action("database_ready")
+    def on_database_ready(_):
+        refresh_all_button.disabled = False
+        ui.update()
+        load_areas()
+        refresher.start()
+        # 古い発表の間引き・集約は起動後に裏で行う（描画はその間も DB を読める）
+        apply_retention_in_background()
+
+    # アプリ起動（骨組みは描いたので、DB の準備と地域一覧・初期表示はワーカーで行う）
+    worker.submit("startup", init_database, on_done=on_database_ready, on_error=show_area_error)
+    
+    def on_close(e):
+        refresher.stop()
+        worker.shutdown()
+        # 終了時の計測値を残しておく（前回との比較用）
+        METRICS.dump(METRICS_PATH)
+    page.on_close = on_close
 
 ft.app(target=main)
\ No newline at end of file
@@ -0,0 +1,141 @@
+# ---------------------------------------------
+# 計測（処理段階ごとの所要時間ヒストグラムとカウンタ）
+# ---------------------------------------------
+# ・METRICS.timer("network") のように with で囲んだ区間の時間をヒストグラムに記録
+# ・@METRICS.timed("db_read") で関数全体の時間を記録
+# ・METRICS.incr("retries") でカウンタを加算
+# ・snapshot() / to_json() / dump(path) で中身を取り出す（アプリの診断パネルでも表示）
+# ・reset() は計測値だけを消し、add_source で登録した統計はそのまま残す
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+# ヒストグラムの区切り（ミリ秒）。最後のバケツはそれより長いもの全部
+BUCKET_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+class Histogram:
+    def __init__(self, bounds=BUCKET_BOUNDS_MS):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, ms: float):
+        i = 0
+        while i < len(self.bounds) and ms > self.bounds[i]:
+            i += 1
+        self.buckets[i] += 1
+        self.count += 1
+        self.total += ms
+        self.min = ms if self.min is None else min(self.min, ms)
+        self.max = ms if self.max is None else max(self.max, ms)
+
+    def percentile(self, p: float):
+        """バケツの上限で近似したパーセンタイル（ミリ秒）"""
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 3) if self.count else None,
+            "min_ms": round(self.min, 3) if self.min is not None else None,
+            "max_ms": round(self.max, 3) if self.max is not None else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "buckets": {
+                (f"<={b}" if i < len(self.bounds) else f">{self.bounds[-1]}"): n
+                for i, (b, n) in enumerate(zip(list(self.bounds) + [None], self.buckets))
+            },
+        }
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.histograms: dict[str, Histogram] = {}
+        self.counters: dict[str, int] = {}
+        # 他のモジュールが持っている統計（HTTP の転送量など）を snapshot に含める
+        self.sources: dict = {}
+
+    def add_source(self, name: str, fn):
+        """snapshot() のたびに fn() の戻り値を name として含める"""
+        self.sources[name] = fn
+
+    def observe(self, stage: str, ms: float):
+        with self._lock:
+            hist = self.histograms.get(stage)
+            if hist is None:
+                hist = self.histograms[stage] = Histogram()
+            hist.observe(ms)
+
+    @contextmanager
+    def timer(self, stage: str):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, (time.perf_counter() - t) * 1000)
+
+    def timed(self, stage: str):
+        """関数全体の所要時間を stage として記録するデコレータ"""
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.timer(stage):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def incr(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def reset(self):
+        with self._lock:
+            self.started_at = time.time()
+            self.histograms.clear()
+            self.counters.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+            stages = {name: h.to_dict() for name, h in sorted(self.histograms.items())}
+        db_hits = counters.get("forecast_db_hits", 0)
+        api_loads = counters.get("forecast_api_loads", 0)
+        loads = db_hits + api_loads
+        snap = {
+            "started_at": self.started_at,
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "stages": stages,
+            "counters": counters,
+            "db_hit_ratio": round(db_hits / loads, 3) if loads else None,
+        }
+        for name, fn in self.sources.items():
+            snap[name] = fn()
+        return snap
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    def dump(self, path: str) -> str:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
+        return path
+
+
+METRICS = Metrics()
@@ -0,0 +1,51 @@
+# ---------------------------------------------
+# 全地域の予報を一括取得（同時接続数の上限つき）
+# ---------------------------------------------
+# ネットワーク取得だけをスレッドプールで並列に行い、
+# 取得できた分はまとめて1トランザクションで forecasts テーブルへ書き込む。
+# 全体の所要時間は「全リクエストの合計」ではなく「遅い数件」程度になる。
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from weather_data import fetch_area_list, download_forecast, save_forecasts_to_db
+
+PREFETCH_CONCURRENCY = 8
+
+
+def prefetch_all_forecasts(codes: list = None, max_workers: int = PREFETCH_CONCURRENCY, on_progress=None) -> dict:
+    """
+    全オフィス（codes 指定時はその地域のみ）の予報を並列に取得して保存する。
+    戻り値: {"ok": [code, ...], "changed": [code, ...], "failed": {code: エラー文字列}, "elapsed": 秒}
+    changed は取得できたうち、保存済みの発表から内容が変わって書き込んだ地域。
+    on_progress(done, total, code, error) は1件終わるごとに呼ばれる。
+    """
+    started = time.perf_counter()
+    if codes is None:
+        codes = [a["code"] for a in fetch_area_list()]
+
+    fetched = {}
+    failed = {}
+    total = len(codes)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = {pool.submit(download_forecast, code): code for code in codes}
+        for done, fut in enumerate(as_completed(futures), start=1):
+            code = futures[fut]
+            try:
+                fetched[code] = fut.result()
+                error = None
+            except Exception as e:
+                failed[code] = str(e)
+                error = failed[code]
+            if on_progress:
+                on_progress(done, total, code, error)
+
+    # 書き込みは1回でまとめて行う（内容が変わっていない地域は書き込まない）
+    changed = save_forecasts_to_db(fetched) if fetched else []
+
+    return {
+        "ok": sorted(fetched),
+        "changed": changed,
+        "failed": failed,
+        "elapsed": time.perf_counter() - started,
+    }
@@ -0,0 +1,116 @@
+# ---------------------------------------------
+# 発表時刻に合わせたバックグラウンド更新
+# ---------------------------------------------
+# 気象庁の府県予報は毎日 5時・11時・17時（日本時間）に発表される。
+# 直近の発表時刻より古い report_datetime しか DB にない地域だけを取り直し、
+# 次の発表時刻まで待つ。クリック時にはほぼ常に DB に最新の予報がある状態にする。
+
+import threading
+from datetime import datetime, timedelta, timezone
+
+from prefetch import prefetch_all_forecasts
+from weather_data import fetch_area_list, get_latest_report_datetimes
+
+JST = timezone(timedelta(hours=9))
+PUBLICATION_HOURS = (5, 11, 17)
+# 発表時刻からサーバーに反映されるまでの余裕
+PUBLICATION_GRACE = timedelta(minutes=10)
+# 発表時刻を過ぎても新しい予報が出ていなかったときの再確認間隔
+RETRY_INTERVAL = timedelta(minutes=10)
+
+
+def latest_expected_publication(now: datetime = None) -> datetime:
+    """now の時点で既に出ているはずの最新の発表時刻"""
+    now = (now or datetime.now(JST)).astimezone(JST) - PUBLICATION_GRACE
+    day = now.replace(minute=0, second=0, microsecond=0)
+    for hour in sorted(PUBLICATION_HOURS, reverse=True):
+        candidate = day.replace(hour=hour)
+        if candidate <= now:
+            return candidate
+    # 今日の最初の発表前なら前日の最後の発表
+    return (day - timedelta(days=1)).replace(hour=max(PUBLICATION_HOURS))
+
+
+def next_publication(now: datetime = None) -> datetime:
+    """次に新しい予報を取りに行ける時刻（発表時刻 + 余裕）"""
+    now = (now or datetime.now(JST)).astimezone(JST)
+    day = now.replace(minute=0, second=0, microsecond=0)
+    for offset in (0, 1):
+        for hour in sorted(PUBLICATION_HOURS):
+            candidate = (day + timedelta(days=offset)).replace(hour=hour) + PUBLICATION_GRACE
+            if candidate > now:
+                return candidate
+
+
+def _parse_report_datetime(value: str):
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=JST)
+
+
+def areas_needing_refresh(now: datetime = None, codes: list = None) -> list:
+    """直近の発表より古い（または DB にない）地域コードの一覧"""
+    expected = latest_expected_publication(now)
+    if codes is None:
+        codes = [a["code"] for a in fetch_area_list()]
+    latest = get_latest_report_datetimes()
+    stale = []
+    for code in codes:
+        reported = _parse_report_datetime(latest.get(code))
+        if reported is None or reported < expected:
+            stale.append(code)
+    return stale
+
+
+class BackgroundRefresher:
+    def __init__(self, on_refreshed=None, max_workers: int = 4):
+        """
+        on_refreshed(report) は更新を行うたびに呼ばれる
+        （report は prefetch_all_forecasts の戻り値）
+        """
+        self.on_refreshed = on_refreshed
+        self.max_workers = max_workers
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="forecast-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def run_once(self, now: datetime = None):
+        """古い地域だけを更新する。更新が不要なら None を返す"""
+        stale = areas_needing_refresh(now)
+        if not stale:
+            return None
+        report = prefetch_all_forecasts(stale, max_workers=self.max_workers)
+        if self.on_refreshed:
+            self.on_refreshed(report)
+        return report
+
+    def _seconds_until_next_check(self) -> float:
+        now = datetime.now(JST)
+        wake = next_publication(now)
+        # まだ古いままの地域があれば、次の発表を待たずに少し後で確かめる
+        try:
+            if areas_needing_refresh(now):
+                wake = min(wake, now + RETRY_INTERVAL)
+        except Exception:
+            wake = min(wake, now + RETRY_INTERVAL)
+        return max(1.0, (wake - now).total_seconds())
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                # DB やネットワークの一時的な失敗は次の確認で取り返す
+                pass
+            self._stop.wait(self._seconds_until_next_check())
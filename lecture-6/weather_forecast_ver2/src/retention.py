@@ -0,0 +1,237 @@
+# ---------------------------------------------
+# forecasts テーブルの保持期間と集約（ロールアップ）
+# ---------------------------------------------
+# 取得のたびに最大7行ずつ増えていくので、古い発表から段階的に間引く。
+#   ・keep_all_days 日以内の発表    : すべて残す
+#   ・それより古く keep_daily_days 日以内 : 各日の最後の発表だけ残す
+#   ・それより古い発表              : forecast_rollup に (地域, 予報対象日) ごとに集約して削除
+# 削除は地域ごとの短いトランザクションに分け、最後に incremental_vacuum で
+# 空きページを少しずつ返す。WAL なので実行中も描画側の読み込みは止まらない。
+# 全体を書き換える VACUUM は、以前からの DB（auto_vacuum=NONE）を INCREMENTAL に切り替えるときの
+# 最初の一度だけ行う（1年分で数秒かかり、その間ほかの書き込みは busy_timeout まで待つ。起動の描画は待たせない）。
+# 消した発表の内容ハッシュ（forecast_fingerprints）は残す。同じ発表をもう一度保存しようとしても
+# save_forecasts_to_db が書き込みを省くので、消した行が戻って二重に集約されることはない（ingest.py の取り込み直しなど）。
+# 行を消した回は retention_runs に1行残す（columnar.py はこれを見て書き出しを作り直す）。
+# 結果（回収できた容量など）は METRICS の retention に出す。
+
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from metrics import METRICS
+from weather_data import FORECAST_CACHE, get_connection
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_DDL = '''
+CREATE TABLE IF NOT EXISTS forecast_rollup (
+    area_code TEXT NOT NULL,
+    forecast_day INTEGER NOT NULL,
+    reports INTEGER NOT NULL,
+    last_report_epoch INTEGER NOT NULL,
+    weather_code INTEGER,
+    temp_min INTEGER,
+    temp_max INTEGER,
+    temp_min_low INTEGER,
+    temp_min_high INTEGER,
+    temp_max_low INTEGER,
+    temp_max_high INTEGER,
+    PRIMARY KEY (area_code, forecast_day)
+) WITHOUT ROWID
+'''
+
+# 行を消した実行の記録
+RUNS_DDL = '''
+CREATE TABLE IF NOT EXISTS retention_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ran_at INTEGER NOT NULL,
+    thinned_rows INTEGER NOT NULL,
+    rolled_up_rows INTEGER NOT NULL
+)
+'''
+
+# 1回の incremental_vacuum で返すページ数（1ページ 4KiB）
+VACUUM_STEP_PAGES = 256
+
+
+@dataclass
+class RetentionPolicy:
+    keep_all_days: int = 14
+    keep_daily_days: int = 180
+
+
+def _day_int(d: date) -> int:
+    return d.year * 10000 + d.month * 100 + d.day
+
+
+def _db_bytes(conn) -> int:
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    return page_size * page_count
+
+
+def _thin_to_daily(conn, area_code: str, cutoff: int) -> int:
+    """cutoff より前の発表を、各日の最後の発表だけにする"""
+    with conn:
+        cur = conn.execute(
+            """
+            DELETE FROM forecasts
+            WHERE area_code = ? AND report_date < ?
+              AND report_datetime < (
+                  SELECT MAX(f2.report_datetime) FROM forecasts AS f2
+                  WHERE f2.area_code = forecasts.area_code AND f2.report_date = forecasts.report_date
+              )
+            """,
+            (area_code, cutoff)
+        )
+    return cur.rowcount
+
+
+def _roll_up(conn, area_code: str, cutoff: int) -> int:
+    """cutoff より前の発表を forecast_rollup に集約して forecasts から消す"""
+    with conn:
+        conn.execute(
+            """
+            WITH old AS (
+                SELECT * FROM forecasts WHERE area_code = ? AND report_date < ?
+            ),
+            latest AS (
+                SELECT forecast_day, weather_code, temp_min, temp_max, report_epoch,
+                       ROW_NUMBER() OVER (PARTITION BY forecast_day ORDER BY report_epoch DESC) AS rn
+                FROM old
+            ),
+            agg AS (
+                SELECT forecast_day, COUNT(*) AS reports,
+                       MIN(temp_min) AS min_low, MAX(temp_min) AS min_high,
+                       MIN(temp_max) AS max_low, MAX(temp_max) AS max_high
+                FROM old GROUP BY forecast_day
+            )
+            INSERT INTO forecast_rollup
+            (area_code, forecast_day, reports, last_report_epoch, weather_code, temp_min, temp_max,
+             temp_min_low, temp_min_high, temp_max_low, temp_max_high)
+            SELECT ?, latest.forecast_day, agg.reports, latest.report_epoch, latest.weather_code,
+                   latest.temp_min, latest.temp_max, agg.min_low, agg.min_high, agg.max_low, agg.max_high
+            FROM latest JOIN agg USING (forecast_day)
+            WHERE latest.rn = 1
+            ON CONFLICT (area_code, forecast_day) DO UPDATE SET
+                reports = reports + excluded.reports,
+                weather_code = CASE WHEN excluded.last_report_epoch > last_report_epoch
+                                    THEN excluded.weather_code ELSE weather_code END,
+                temp_min = CASE WHEN excluded.last_report_epoch > last_report_epoch
+                                THEN excluded.temp_min ELSE temp_min END,
+                temp_max = CASE WHEN excluded.last_report_epoch > last_report_epoch
+                                THEN excluded.temp_max ELSE temp_max END,
+                last_report_epoch = MAX(last_report_epoch, excluded.last_report_epoch),
+                temp_min_low = MIN(COALESCE(temp_min_low, excluded.temp_min_low), COALESCE(excluded.temp_min_low, temp_min_low)),
+                temp_min_high = MAX(COALESCE(temp_min_high, excluded.temp_min_high), COALESCE(excluded.temp_min_high, temp_min_high)),
+                temp_max_low = MIN(COALESCE(temp_max_low, excluded.temp_max_low), COALESCE(excluded.temp_max_low, temp_max_low)),
+                temp_max_high = MAX(COALESCE(temp_max_high, excluded.temp_max_high), COALESCE(excluded.temp_max_high, temp_max_high))
+            """,
+            (area_code, cutoff, area_code)
+        )
+        cur = conn.execute("DELETE FROM forecasts WHERE area_code = ? AND report_date < ?", (area_code, cutoff))
+    return cur.rowcount
+
+
+def _enable_incremental_vacuum(conn) -> bool:
+    """auto_vacuum=NONE の DB を INCREMENTAL にする（切り替えたら True）"""
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+        return False
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+    return True
+
+
+def _compact(conn) -> bool:
+    """空きページを少しずつファイルから返す（incremental モードでない DB は何もせず False）"""
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        return False
+    while conn.execute("PRAGMA freelist_count").fetchone()[0] > 0:
+        # sqlite3 の execute は結果列のない文を1ステップしか進めず、1回で1ページしか返らない。
+        # executescript は文を最後まで実行するので、1回で VACUUM_STEP_PAGES ページ返る
+        conn.executescript(f"PRAGMA incremental_vacuum({VACUUM_STEP_PAGES});")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+    return True
+
+
+def apply_retention(policy: RetentionPolicy = None, today: date = None) -> dict:
+    """
+    保持ポリシーを適用して、削除行数と回収できた容量を返す
+    {"thinned_rows", "rolled_up_rows", "converted", "compacted", "bytes_before", "bytes_after", "reclaimed_bytes"}
+    """
+    policy = policy or RetentionPolicy()
+    today = today or date.today()
+    all_cutoff = _day_int(today - timedelta(days=policy.keep_all_days))
+    daily_cutoff = _day_int(today - timedelta(days=policy.keep_daily_days))
+
+    conn = get_connection()
+    conn.execute(ROLLUP_DDL)
+    conn.execute(RUNS_DDL)
+    conn.commit()
+    bytes_before = _db_bytes(conn)
+    # 以前からの DB は最初の一度だけ VACUUM で作り直す（以降の incremental_vacuum の前提）
+    converted = _enable_incremental_vacuum(conn)
+
+    codes = [row[0] for row in conn.execute("SELECT DISTINCT area_code FROM forecasts")]
+    rolled = thinned = 0
+    compacted = False
+    for code in codes:
+        rolled += _roll_up(conn, code, daily_cutoff)
+        thinned += _thin_to_daily(conn, code, all_cutoff)
+
+    if rolled or thinned:
+        with conn:
+            conn.execute(
+                "INSERT INTO retention_runs (ran_at, thinned_rows, rolled_up_rows) VALUES (strftime('%s', 'now'), ?, ?)",
+                (thinned, rolled)
+            )
+        compacted = _compact(conn)
+        # 指定日の発表が消えたり別の発表に置き換わったりするので、キャッシュは丸ごと捨てる
+        FORECAST_CACHE.clear()
+    bytes_after = _db_bytes(conn)
+
+    METRICS.incr("retention_thinned_rows", thinned)
+    METRICS.incr("retention_rolled_up_rows", rolled)
+    return {
+        "thinned_rows": thinned,
+        "rolled_up_rows": rolled,
+        "converted": converted,
+        "compacted": compacted,
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "reclaimed_bytes": bytes_before - bytes_after,
+    }
+
+
+# 最後に実行した結果（診断パネル用）
+_last_report: dict = {}
+
+
+def last_retention_report() -> dict:
+    return dict(_last_report)
+
+
+METRICS.add_source("retention", last_retention_report)
+
+
+def apply_retention_in_background(policy: RetentionPolicy = None, on_done=None) -> threading.Thread:
+    """apply_retention を別スレッドで実行し、結果を METRICS に残して on_done(report) を呼ぶ"""
+    def run():
+        try:
+            with METRICS.timer("retention"):
+                report = apply_retention(policy)
+        except Exception as e:
+            logger.exception("保持ポリシーの適用に失敗しました")
+            METRICS.incr("retention_failures")
+            _last_report.clear()
+            _last_report.update(error=f"{type(e).__name__}: {e}")
+            return
+        METRICS.incr("retention_reclaimed_bytes", report["reclaimed_bytes"])
+        _last_report.clear()
+        _last_report.update(report)
+        if on_done:
+            on_done(report)
+    t = threading.Thread(target=run, name="forecast-retention", daemon=True)
+    t.start()
+    return t
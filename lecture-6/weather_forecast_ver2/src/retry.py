@@ -0,0 +1,138 @@
+# ---------------------------------------------
+# リトライ（ジッター付きバックオフ + 期限 + ホスト単位のサーキットブレーカー）
+# ---------------------------------------------
+# ・待ち時間は 0〜base*2^i の一様乱数（フルジッター）
+# ・1回の操作ごとに deadline（time.monotonic() の絶対時刻）を持ち、
+#   次の待ちが期限を越えるならその場で諦める
+# ・同じホストで 429 / 5xx / 通信エラーが続いたらブレーカーを開き、
+#   一定時間はリクエストせずに CircuitOpenError を返す
+#   （呼び出し側は SQLite の保存済みデータに切り替える）
+# 待ちは呼び出したスレッドで行うので、UI からは UiWorker（ui_worker.py）の仕事として呼ぶこと。
+
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+from http_client import RETRYABLE_STATUS
+from metrics import METRICS
+
+# 1回のユーザー操作に許す通信時間（秒）
+ACTION_DEADLINE = 8.0
+
+
+class CircuitOpenError(Exception):
+    """ブレーカーが開いているためリクエストを送らなかった"""
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 3, reset_after: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """リクエストを送ってよいか（half_open では試しに1回通す）"""
+        with self._lock:
+            state = self._state()
+            if state == "half_open":
+                # 試行中に他のスレッドまで通さないよう、開いた時刻を更新しておく
+                self.opened_at = time.monotonic()
+                return True
+            return state == "closed"
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(url: str) -> CircuitBreaker:
+    host = urlsplit(url).netloc
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker()
+        return _breakers[host]
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 4.0) -> float:
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def _is_host_failure(e: Exception) -> bool:
+    """ブレーカーの失敗として数えるエラーか（429 / 5xx / 通信エラー）"""
+    if isinstance(e, requests.HTTPError):
+        resp = getattr(e, "response", None)
+        return resp is None or resp.status_code in RETRYABLE_STATUS
+    return isinstance(e, (requests.ConnectionError, requests.Timeout))
+
+
+def call_with_retry(fn, url: str, tries: int = 3, timeout: float = 10, deadline: float = None):
+    """
+    fn(timeout) をリトライ付きで呼ぶ。
+    deadline を過ぎそうなら待たずに最後のエラーを投げる。
+    """
+    breaker = breaker_for(url)
+    last_err = None
+    for i in range(tries):
+        if not breaker.allow():
+            METRICS.incr("circuit_open_rejections")
+            raise CircuitOpenError(f"{urlsplit(url).netloc} への接続を一時停止中です")
+
+        attempt_timeout = timeout
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            attempt_timeout = min(timeout, remaining)
+
+        try:
+            with METRICS.timer("network"):
+                result = fn(attempt_timeout)
+            breaker.record_success()
+            return result
+        except Exception as e:
+            last_err = e
+            if not _is_host_failure(e):
+                # 404 や JSON の壊れなどはリトライしても直らない（ホスト自体は応答している）
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            METRICS.incr("request_failures")
+
+        if i < tries - 1:
+            delay = backoff_delay(i)
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                break
+            METRICS.incr("retries")
+            time.sleep(delay)
+
+    if last_err is None:
+        last_err = TimeoutError(f"{url} の取得が期限内に終わりませんでした")
+    raise last_err
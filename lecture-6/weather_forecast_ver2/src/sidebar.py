@@ -0,0 +1,71 @@
+# ---------------------------------------------
+# 地域一覧のサイドバー（地方ごとの ExpansionTile）
+# ---------------------------------------------
+# 以前は全地域のボタン（とクリック用の lambda）を起動時に作って ExpansionTile に入れていたため、
+# 最初の page.update() で送る量が地域の数に比例していた。
+# RegionTile は見出しだけを先に送り、初めて開いたときに中のボタンを作る。
+# 地域が VIRTUALIZE_OVER 件より多い地方は、高さを決めた ListView に入れて
+# 見えている行だけを描画させる（None にすると常にそのまま並べる）。
+# ui（UpdateBatcher）を渡すと、初めて開いたときの更新も ui.action の中で送る。
+
+import flet as ft
+
+from metrics import METRICS
+
+VIRTUALIZE_OVER = 30
+ITEM_EXTENT = 40
+VISIBLE_ROWS = 10
+
+
+class RegionTile(ft.ExpansionTile):
+    """地方1つ分の見出し（中の地域ボタンは初めて開いたときに作る）"""
+
+    def __init__(self, region: str, areas: list, on_select, virtualize_over: int = VIRTUALIZE_OVER, ui=None):
+        super().__init__(
+            title=ft.Text(region, color=ft.Colors.WHITE),
+            subtitle=ft.Text("タップで展開", color=ft.Colors.BLUE_GREY_200),
+            controls=[],
+            on_change=self._on_change,
+        )
+        self.areas = areas
+        self.on_select = on_select
+        self.virtualize_over = virtualize_over
+        self.ui = ui
+        self.children_built = False
+
+    def _on_change(self, e):
+        if e.data != "true" or self.children_built:
+            return
+        if self.ui is None:
+            self.build_children()
+            self.update()
+            return
+        with self.ui.action("region_expanded"):
+            self.build_children()
+            self.ui.update()
+
+    def build_children(self):
+        """地域ボタンを作る（2回目以降は何もしない）"""
+        if self.children_built:
+            return
+        # lambda を1件ずつ作らず、押されたボタンの data から地域を取り出す
+        buttons = [
+            ft.TextButton(
+                text=f"{a['name']}  {a['code']}",
+                data=a,
+                on_click=self._on_click,
+                style=ft.ButtonStyle(color=ft.Colors.WHITE),
+            )
+            for a in self.areas
+        ]
+        if self.virtualize_over is not None and len(buttons) > self.virtualize_over:
+            self.controls = [ft.ListView(controls=buttons, item_extent=ITEM_EXTENT,
+                                         height=ITEM_EXTENT * VISIBLE_ROWS)]
+        else:
+            self.controls = buttons
+        self.children_built = True
+        METRICS.incr("sidebar_regions_built")
+
+    def _on_click(self, e):
+        area = e.control.data
+        self.on_select(area["code"], area["name"])
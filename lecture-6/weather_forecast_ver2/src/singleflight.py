@@ -0,0 +1,47 @@
+# ---------------------------------------------
+# シングルフライト（同じキーの同時実行を1回にまとめる）
+# ---------------------------------------------
+# 同じ地域コードの取得が同時に何本も走ったとき、最初の1本だけが実際に処理し、
+# 残りはその完了を待って同じ結果（または同じ例外）を受け取る。
+
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
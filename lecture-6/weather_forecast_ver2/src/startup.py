@@ -0,0 +1,69 @@
+# ---------------------------------------------
+# 起動時間の記録（最初の描画まで / 操作できるようになるまで）
+# ---------------------------------------------
+# 起動は段階的に行う。
+#   1. 画面の骨組み（仮の地域一覧と空のカード）を描く      → first_paint
+#   2. ワーカーで DB を開き、地域一覧を読み込む            → sidebar
+#   3. 初期表示の地域（東京都）の予報を出す                → forecast
+# 2 と 3 がそろった時点を interactive とする（失敗してエラーを出した場合も含む）。
+# 各段階の経過時間は METRICS に startup_{段階} として入れ、
+# 起動1回ごとに1行の JSON を STARTUP_LOG_PATH に追記する（前回までとの比較用）。
+# ログは直近 STARTUP_LOG_MAX_LINES 回分だけ残し、それより古い行は追記のときに捨てる。
+
+import json
+import os
+import threading
+import time
+
+from metrics import METRICS
+
+REQUIRED_STAGES = ("sidebar", "forecast")
+STARTUP_LOG_MAX_LINES = 200
+
+
+class StartupTimer:
+    def __init__(self, started_at: float, log_path: str = None, required=REQUIRED_STAGES,
+                 max_lines: int = STARTUP_LOG_MAX_LINES):
+        self.started_at = started_at
+        self.log_path = log_path
+        self.max_lines = max_lines
+        self.required = tuple(required)
+        self.marks: dict[str, float] = {}
+        self.finished = False
+        self._lock = threading.Lock()
+
+    def mark(self, stage: str):
+        """段階に達したことを記録する（同じ段階の2回目以降は無視する）"""
+        with self._lock:
+            if stage in self.marks:
+                return
+            ms = (time.perf_counter() - self.started_at) * 1000
+            self.marks[stage] = round(ms, 1)
+            done = not self.finished and all(s in self.marks for s in self.required)
+            if done:
+                self.finished = True
+                self.marks["interactive"] = round(ms, 1)
+        METRICS.observe(f"startup_{stage}", ms)
+        if done:
+            METRICS.observe("startup_interactive", ms)
+            self._append_log()
+
+    def _append_log(self):
+        if not self.log_path:
+            return
+        line = json.dumps({"at": time.time(), **self.marks}, ensure_ascii=False) + "\n"
+        tmp = self.log_path + ".tmp"
+        try:
+            try:
+                with open(self.log_path, "r", encoding="utf-8") as f:
+                    lines = f.readlines()
+            except FileNotFoundError:
+                lines = []
+            # 起動1回につき1度だけなので、直近の行を残して書き直す
+            lines = lines[-(self.max_lines - 1):] if self.max_lines > 1 else []
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.writelines(lines + [line])
+            os.replace(tmp, self.log_path)
+        except OSError:
+            # 記録できなくてもアプリの動作には関係しない
+            pass
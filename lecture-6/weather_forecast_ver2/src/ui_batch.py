@@ -0,0 +1,94 @@
+# ---------------------------------------------
+# 画面更新のまとめ送り
+# ---------------------------------------------
+# 1回の操作（地域のクリック、読み込み完了など）の中で set_loading・update_forecast_cards・
+# update_date_controls・show_message がそれぞれ page.update() を呼ぶと、
+# 差分の計算と送信が操作1回につき何度も走る。
+# UpdateBatcher.action() の中では update() は「更新が必要」という印を付けるだけにして、
+# 一番外側の action() を抜けるときに page.update() を1回だけ呼ぶ。
+# action() の外で呼ばれた update() はそのまま送る。
+# ダイアログの開閉は open() / close()、サイドバーの地方の展開は RegionTile に渡した ui から、同じ経路で送る。
+# 操作の名前ごとに「要求された更新の数」と「実際に送った数」を数え、METRICS の ui_updates に出す。
+
+import threading
+from contextlib import contextmanager
+
+from metrics import METRICS
+
+# action() の外で呼ばれた更新をまとめる名前
+UNBATCHED = "(操作外)"
+
+
+class UpdateBatcher:
+    def __init__(self, page):
+        self.page = page
+        # まとめるのは同じスレッドの中だけ（イベントとワーカーの通知は別スレッドで走る）
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict] = {}
+        METRICS.add_source("ui_updates", self.stats)
+
+    def _state(self):
+        state = self._local
+        if not hasattr(state, "depth"):
+            state.depth = 0
+            state.requested = 0
+        return state
+
+    def update(self):
+        """画面の更新を求める（action() の中なら抜けるときにまとめて送る）"""
+        state = self._state()
+        if state.depth:
+            state.requested += 1
+            return
+        self.page.update()
+        self._record(UNBATCHED, requested=1, sent=1)
+
+    def open(self, control):
+        """page.open() の代わり（オーバーレイへの追加と表示を1回の更新で送る）"""
+        control.open = True
+        if control not in self.page.overlay:
+            self.page.overlay.append(control)
+        self.update()
+
+    def close(self, control):
+        """page.close() の代わり"""
+        control.open = False
+        self.update()
+
+    @contextmanager
+    def action(self, name: str):
+        """1回の操作。デコレータとしても使える"""
+        state = self._state()
+        state.depth += 1
+        try:
+            yield
+        finally:
+            state.depth -= 1
+            if state.depth == 0:
+                requested, state.requested = state.requested, 0
+                sent = 0
+                try:
+                    if requested:
+                        self.page.update()
+                        sent = 1
+                finally:
+                    self._record(name, requested, sent)
+
+    def _record(self, name: str, requested: int, sent: int):
+        with self._lock:
+            entry = self._stats.setdefault(name, {"actions": 0, "requested": 0, "sent": 0})
+            entry["actions"] += 1
+            entry["requested"] += requested
+            entry["sent"] += sent
+        METRICS.incr("ui_page_updates", sent)
+        if requested > sent:
+            METRICS.incr("ui_updates_coalesced", requested - sent)
+
+    def stats(self) -> dict:
+        """操作の名前ごとの {actions, requested, sent, per_action}（per_action は送った更新 / 操作）"""
+        with self._lock:
+            return {
+                name: dict(entry, per_action=round(entry["sent"] / entry["actions"], 2))
+                for name, entry in sorted(self._stats.items())
+            }
@@ -0,0 +1,135 @@
+# ---------------------------------------------
+# UI 用ワーカー（DB・通信は別スレッド、結果はキュー経由で UI に戻す）
+# ---------------------------------------------
+# イベントハンドラの中で SQLite や HTTP を待つと、その間ほかの操作が効かなくなる。
+# ・submit(channel, fn, ...) で fn をスレッドプールで実行する
+# ・終わった結果は結果キューに積まれ、配送スレッドが1本で順番に on_done / on_error を呼ぶ
+#   （コントロールの書き換えが同時に走らない）
+# ・同じ channel に新しい仕事を出すと前の仕事は取り消される。まだ始まっていなければ
+#   実行せず、実行中なら結果を捨てる（地域を切り替えたときに古い予報で上書きしない）
+# ・post(callback, ...) でワーカー側から途中経過を UI に渡せる
+# ・コールバックが例外を出したらトレースバックをログに残す。on_done が失敗したときは
+#   同じ仕事の on_error を続けて呼ぶ（読み込み中の表示などを必ず戻せるように）
+
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import METRICS
+
+UI_WORKERS = 4
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    def __init__(self, channel: str, on_done=None, on_error=None):
+        self.channel = channel
+        self.on_done = on_done
+        self.on_error = on_error
+        self.future = None
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+
+class UiWorker:
+    def __init__(self, max_workers: int = UI_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ui-worker")
+        self._results = queue.Queue()
+        self._lock = threading.Lock()
+        self._current: dict = {}
+        self._dispatcher = threading.Thread(target=self._dispatch, name="ui-dispatch", daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, channel: str, fn, *args, on_done=None, on_error=None, **kwargs) -> Job:
+        """fn(*args, **kwargs) を裏で実行する。同じ channel の前の仕事は取り消す"""
+        job = Job(channel, on_done, on_error)
+        with self._lock:
+            previous = self._current.get(channel)
+            self._current[channel] = job
+        if previous is not None:
+            previous.cancel()
+            METRICS.incr("ui_jobs_superseded")
+        job.future = self._pool.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def cancel(self, channel: str) -> bool:
+        """channel の仕事を取り消す。取り消すものがあれば True"""
+        with self._lock:
+            job = self._current.pop(channel, None)
+        if job is None:
+            return False
+        job.cancel()
+        METRICS.incr("ui_jobs_cancelled")
+        return True
+
+    def busy(self, channel: str) -> bool:
+        with self._lock:
+            return channel in self._current
+
+    def post(self, callback, *args):
+        """callback(*args) を配送スレッドで呼ぶ（ワーカーから途中経過を渡す用）"""
+        self._results.put((None, callback, args))
+
+    def shutdown(self):
+        with self._lock:
+            jobs = list(self._current.values())
+            self._current.clear()
+        for job in jobs:
+            job.cancel()
+        self._results.put(None)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: Job, fn, args, kwargs):
+        if job.cancelled:
+            return
+        try:
+            with METRICS.timer("ui_job"):
+                result = fn(*args, **kwargs)
+        except Exception as e:
+            self._results.put((job, job.on_error, (e,)))
+        else:
+            self._results.put((job, job.on_done, (result,)))
+
+    def _dispatch(self):
+        while True:
+            item = self._results.get()
+            if item is None:
+                return
+            job, callback, args = item
+            if job is not None:
+                with self._lock:
+                    if self._current.get(job.channel) is job:
+                        del self._current[job.channel]
+                if job.cancelled:
+                    METRICS.incr("ui_results_dropped")
+                    continue
+            if callback is None:
+                continue
+            try:
+                callback(*args)
+            except Exception as e:
+                METRICS.incr("ui_callback_errors")
+                logger.exception("UI コールバック %s が失敗しました", _name(callback))
+                if job is not None and callback is job.on_done and job.on_error is not None:
+                    self._call_on_error(job, e)
+
+    def _call_on_error(self, job: Job, error: Exception):
+        try:
+            job.on_error(error)
+        except Exception:
+            METRICS.incr("ui_callback_errors")
+            logger.exception("UI コールバック %s が失敗しました", _name(job.on_error))
+
+
+def _name(callback) -> str:
+    return getattr(callback, "__qualname__", None) or repr(callback)
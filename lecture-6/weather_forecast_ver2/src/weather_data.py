@@ -0,0 +1,596 @@
+# ---------------------------------------------
+# データ層（DB・気象庁 API・コード表）
+# ---------------------------------------------
+# UI（main.py）から切り離して、一括取得などのバックグラウンド処理からも
+# 同じ関数を使えるようにしている。
+
+import json
+import os
+from datetime import datetime
+
+from db import CONNECTIONS
+from forecast_cache import ForecastCache
+from forecast_record import Forecast
+from http_client import HttpClient
+from metrics import METRICS
+from retry import call_with_retry
+from singleflight import SingleFlight
+
+# ---------------------------------------------
+# データベース設計と初期化
+# ---------------------------------------------
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DB_PATH = os.path.join(CURRENT_DIR, "weather_forecast.db")
+
+def get_connection():
+    """このスレッド用の DB 接続（使い回すので close しない）"""
+    return CONNECTIONS.connection(DB_PATH)
+
+# get_forecast_from_db の結果のキャッシュ（(area_code, report_date) ごと）
+FORECAST_CACHE = ForecastCache()
+METRICS.add_source("forecast_cache", FORECAST_CACHE.stats)
+
+# スキーマのバージョン（PRAGMA user_version に記録する）
+#   1: 日付・気温をすべて TEXT で持つ最初の形（user_version は 0 のまま）
+#   2: 日付を整数（YYYYMMDD / UNIX 秒）、気温・天気コードを数値で持ち、複合インデックスを張る
+SCHEMA_VERSION = 2
+
+FORECASTS_DDL = '''
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    area_code TEXT NOT NULL,
+    forecast_date TEXT NOT NULL,
+    report_datetime TEXT NOT NULL,
+    forecast_day INTEGER NOT NULL,
+    report_date INTEGER NOT NULL,
+    report_epoch INTEGER NOT NULL,
+    weather_code INTEGER,
+    telop TEXT,
+    temp_min INTEGER,
+    temp_max INTEGER,
+    publishing_office TEXT,
+    UNIQUE(area_code, forecast_date, report_datetime)
+)
+'''
+FORECASTS_INDEX_DDL = '''
+CREATE INDEX IF NOT EXISTS idx_forecasts_area_report
+ON forecasts (area_code, report_date, report_datetime)
+'''
+# 保存済みの発表の内容ハッシュ（同じ発表を取り直したときに書き込みを省く）
+FINGERPRINTS_DDL = '''
+CREATE TABLE IF NOT EXISTS forecast_fingerprints (
+    area_code TEXT NOT NULL,
+    report_datetime TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    PRIMARY KEY (area_code, report_datetime)
+) WITHOUT ROWID
+'''
+
+def init_database():
+    """データベースの初期化と必要なテーブルの作成（古い形式なら移行する）"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    # エリアテーブル
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS areas (
+        code TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        region TEXT NOT NULL
+    )
+    ''')
+    conn.commit()
+    
+    version = cursor.execute("PRAGMA user_version").fetchone()[0]
+    has_forecasts = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'forecasts'"
+    ).fetchone()
+    
+    if has_forecasts and version < 2:
+        migrate_forecasts_to_v2(conn)
+    
+    # 天気予報テーブル
+    cursor.execute(FORECASTS_DDL.format(table="forecasts"))
+    cursor.execute(FORECASTS_INDEX_DDL)
+    cursor.execute(FINGERPRINTS_DDL)
+    cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.commit()
+    
+    # 以前からの DB（auto_vacuum=NONE）の切り替えは時間がかかるので、ここでは行わない
+    # （retention.apply_retention がバックグラウンドで一度だけ行う）
+    
+    # DB を作り直したり切り替えたりしたときに前の内容を返さないようにする
+    FORECAST_CACHE.clear()
+
+def migrate_forecasts_to_v2(conn):
+    """TEXT だけの forecasts テーブルを型付きの新しい形にその場で移行する"""
+    conn.commit()
+    try:
+        conn.execute("BEGIN")
+        conn.execute(FORECASTS_DDL.format(table="forecasts_v2"))
+        # SQLite の日付関数は "2025-01-01T11:00:00+09:00" の形をそのまま解釈できる
+        conn.execute('''
+        INSERT OR IGNORE INTO forecasts_v2
+        (area_code, forecast_date, report_datetime, forecast_day, report_date, report_epoch,
+         weather_code, telop, temp_min, temp_max, publishing_office)
+        SELECT area_code, forecast_date, report_datetime,
+               CAST(replace(substr(forecast_date, 1, 10), '-', '') AS INTEGER),
+               CAST(replace(substr(report_datetime, 1, 10), '-', '') AS INTEGER),
+               CAST(strftime('%s', report_datetime) AS INTEGER),
+               CAST(NULLIF(trim(weather_code), '') AS INTEGER),
+               telop,
+               CAST(NULLIF(trim(temp_min), '') AS NUMERIC),
+               CAST(NULLIF(trim(temp_max), '') AS NUMERIC),
+               publishing_office
+        FROM forecasts
+        WHERE report_datetime != '' AND forecast_date != ''
+        ORDER BY id
+        ''')
+        conn.execute("DROP TABLE forecasts")
+        conn.execute("ALTER TABLE forecasts_v2 RENAME TO forecasts")
+        conn.execute(FORECASTS_INDEX_DDL)
+        conn.execute("PRAGMA user_version = 2")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+# ---------------------------------------------
+# 気象庁 JSON
+# ---------------------------------------------
+AREA_JSON_URL = "https://www.jma.go.jp/bosai/common/const/area.json"
+FORECAST_BASE = "https://www.jma.go.jp/bosai/forecast/data/forecast/"  # {code}.json
+
+# 接続プールと ETag / Last-Modified を共有するクライアント
+HTTP = HttpClient()
+METRICS.add_source("http", lambda: dict(HTTP.stats))
+
+# ---------------------------------------------
+# リトライ（ジッター付きバックオフ・期限・サーキットブレーカー）
+# ---------------------------------------------
+def get_json(url: str, tries: int = 3, timeout: int = 10, deadline: float = None):
+    return call_with_retry(lambda t: HTTP.get_json(url, timeout=t), url,
+                           tries=tries, timeout=timeout, deadline=deadline)
+
+def get_bytes(url: str, tries: int = 3, timeout: int = 10, deadline: float = None):
+    return call_with_retry(lambda t: HTTP.get_bytes(url, timeout=t), url,
+                           tries=tries, timeout=timeout, deadline=deadline)
+
+# ---------------------------------------------
+# TELOPS（天気コード→日本語テロップ）
+# ---------------------------------------------
+TELOPS: dict[int, str] = {
+    100:"晴",101:"晴時々曇",102:"晴一時雨",103:"晴時々雨",104:"晴一時雪",105:"晴時々雪",
+    106:"晴一時雨か雪",107:"晴時々雨か雪",108:"晴一時雨か雷雨",
+    110:"晴後時々曇",111:"晴後曇",112:"晴後一時雨",113:"晴後時々雨",114:"晴後雨",
+    115:"晴後一時雪",116:"晴後時々雪",117:"晴後雪",118:"晴後雨か雪",119:"晴後雨か雷雨",
+    120:"晴朝夕一時雨",121:"晴朝の内一時雨",122:"晴夕方一時雨",
+    123:"晴山沿い雷雨",124:"晴山沿い雪",125:"晴午後は雷雨",
+    126:"晴昼頃から雨",127:"晴夕方から雨",128:"晴夜は雨",
+    130:"朝の内霧後晴",131:"晴明け方霧",132:"晴朝夕曇",
+    140:"晴時々雨で雷を伴う",160:"晴一時雪か雨",170:"晴時々雪か雨",181:"晴後雪か雨",
+    200:"曇",201:"曇時々晴",202:"曇一時雨",203:"曇時々雨",204:"曇一時雪",205:"曇時々雪",
+    206:"曇一時雨か雪",207:"曇時々雨か雪",208:"曇一時雨か雷雨",209:"霧",
+    210:"曇後時々晴",211:"曇後晴",212:"曇後一時雨",213:"曇後時々雨",214:"曇後雨",
+    215:"曇後一時雪",216:"曇後時々雪",217:"曇後雪",218:"曇後雨か雪",219:"曇後雨か雷雨",
+    220:"曇朝夕一時雨",221:"曇朝の内一時雨",222:"曇夕方一時雨",
+    223:"曇日中時々晴",224:"曇昼頃から雨",225:"曇夕方から雨",226:"曇夜は雨",
+    228:"曇昼頃から雪",229:"曇夕方から雪",230:"曇夜は雪",231:"曇海上海岸は霧か霧雨",
+    240:"曇時々雨で雷を伴う",250:"曇時々雪で雷を伴う",
+    260:"曇一時雪か雨",270:"曇時々雪か雨",281:"曇後雪か雨",
+    300:"雨",301:"雨時々晴",302:"雨時々止む",303:"雨時々雪",304:"雨か雪",
+    306:"大雨",308:"雨で暴風を伴う",309:"雨一時雪",
+    311:"雨後晴",313:"雨後曇",314:"雨後時々雪",315:"雨後雪",
+    316:"雨か雪後晴",317:"雨か雪後曇",
+    320:"朝の内雨後晴",321:"朝の内雨後曇",
+    322:"雨朝晩一時雪",323:"雨昼頃から晴",324:"雨夕方から晴",325:"雨夜は晴",
+    326:"雨夕方から雪",327:"雨夜は雪",
+    328:"雨一時強く降る",329:"雨一時みぞれ",
+    340:"雪か雨",350:"雨で雷を伴う",
+    361:"雪か雨後晴",371:"雪か雨後曇",
+    400:"雪",401:"雪時々晴",402:"雪時々止む",403:"雪時々雨",
+    405:"大雪",406:"風雪強い",407:"暴風雪",409:"雪一時雨",
+    411:"雪後晴",413:"雪後曇",414:"雪後雨",
+    420:"朝の内雪後晴",421:"朝の内雪後曇",
+    422:"雪昼頃から雨",423:"雪夕方から雨",
+    425:"雪一時強く降る",426:"雪後みぞれ",427:"雪一時みぞれ",
+    450:"雪で雷を伴う",
+    500:"快晴",
+}
+
+# ---------------------------------------------
+# データベース操作関数
+# ---------------------------------------------
+@METRICS.timed("db_write")
+def save_areas_to_db(areas: list):
+    """地域情報をデータベースに保存する"""
+    conn = get_connection()
+    # with conn: 途中で失敗したらロールバックする（接続を使い回すので書きかけを残さない）
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO areas (code, name, region) VALUES (?, ?, ?)",
+            [(area["code"], area["name"], region_name_for_prefix(area["code"][:2])) for area in areas]
+        )
+
+@METRICS.timed("db_read")
+def get_areas_from_db():
+    """データベースから地域情報を取得する"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    cursor.execute("SELECT code, name, region FROM areas ORDER BY code")
+    areas = [{"code": row[0], "name": row[1], "region": row[2]} for row in cursor.fetchall()]
+    
+    return areas
+
+_UPSERT_FORECAST_SQL = """
+    INSERT OR REPLACE INTO forecasts 
+    (area_code, forecast_date, report_datetime, forecast_day, report_date, report_epoch,
+     weather_code, telop, temp_min, temp_max, publishing_office)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+def date_to_int(iso: str):
+    """2025-01-01... → 20250101（解釈できなければ None）"""
+    try:
+        return int(iso[:10].replace("-", ""))
+    except (TypeError, ValueError):
+        return None
+
+def datetime_to_epoch(iso: str):
+    try:
+        return int(datetime.fromisoformat(iso.replace("Z", "+00:00")).timestamp())
+    except (AttributeError, ValueError):
+        return None
+
+def forecast_rows(area_code: str, forecast) -> list:
+    """1エリア分の予報（Forecast か従来の dict）を forecasts テーブルの行（タプル）のリストにする"""
+    if isinstance(forecast, dict):
+        forecast = Forecast.from_dict(forecast)
+    publishing_office = forecast.publishing_office or ""
+    report_datetime = forecast.report_datetime or ""
+    
+    report_date = date_to_int(report_datetime)
+    report_epoch = datetime_to_epoch(report_datetime)
+    if report_date is None or report_epoch is None:
+        # 発表日時のない予報は検索できないので保存しない
+        return []
+    
+    rows = []
+    for date_time, weather_code, temp_min, temp_max in forecast.iter_days():
+        forecast_day = date_to_int(date_time)
+        if forecast_day is None:
+            continue
+        # iter_days の天気コードは int か None なので、表をそのまま引ける
+        rows.append((area_code, date_time, report_datetime, forecast_day, report_date, report_epoch,
+                     weather_code, TELOPS.get(weather_code, ""), temp_min, temp_max, publishing_office))
+    return rows
+
+def save_forecast_to_db(area_code: str, forecast):
+    """天気予報データをデータベースに保存する"""
+    save_forecasts_to_db({area_code: forecast})
+
+# 1回の問い合わせに並べる (area_code, report_datetime) の数（パラメータはこの2倍。SQLite の既定の上限 999 未満）
+_FINGERPRINT_LOOKUP_CHUNK = 250
+
+def _stored_digests(conn, keys) -> dict:
+    """(area_code, report_datetime) のキーについて、保存済みの {キー: digest} をまとめて読む"""
+    keys = list(keys)
+    stored = {}
+    for i in range(0, len(keys), _FINGERPRINT_LOOKUP_CHUNK):
+        chunk = keys[i:i + _FINGERPRINT_LOOKUP_CHUNK]
+        # キーの表と主キーで結合する（1件ずつ主キーを引くので、履歴が増えても表全体は読まない）
+        cursor = conn.execute(
+            "SELECT f.area_code, f.report_datetime, f.digest "
+            f"FROM (VALUES {', '.join(['(?, ?)'] * len(chunk))}) AS k "
+            "JOIN forecast_fingerprints AS f ON f.area_code = k.column1 AND f.report_datetime = k.column2",
+            [value for key in chunk for value in key]
+        )
+        stored.update(((area_code, report_datetime), digest) for area_code, report_datetime, digest in cursor)
+    return stored
+
+@METRICS.timed("db_write")
+def save_forecasts_to_db(forecasts):
+    """
+    複数エリアの予報を1トランザクション・1回の executemany で保存する
+    forecasts は {area_code: Forecast} か (area_code, Forecast) の並び（Forecast の代わりに従来の dict も可）
+    保存済みの発表と内容が同じなら書き込まない。戻り値は実際に書き込んだエリアコードのリスト
+    """
+    items = forecasts.items() if isinstance(forecasts, dict) else forecasts
+    # (エリア, 発表日時) ごとに予報とハッシュを用意する（同じ発表が重ねて渡されたら後のものを使う）
+    # ハッシュは Forecast の配列から直接求め、行（タプル）は書き込む発表の分だけ作る
+    reports = {}
+    for area_code, forecast in items:
+        if isinstance(forecast, dict):
+            forecast = Forecast.from_dict(forecast)
+        reports[(area_code, forecast.report_datetime or "")] = forecast
+    if not reports:
+        return []
+    
+    conn = get_connection()
+    stored = _stored_digests(conn, reports)
+    changed = {}
+    skipped = 0
+    for key, forecast in reports.items():
+        digest = forecast.digest()
+        if stored.get(key) == digest:
+            skipped += 1
+            continue
+        rows = forecast_rows(key[0], forecast)
+        if rows:
+            changed[key] = (rows, digest)
+    
+    METRICS.incr("forecast_writes_skipped", skipped)
+    if not changed:
+        return []
+    with conn:
+        conn.executemany(_UPSERT_FORECAST_SQL, [row for rows, _ in changed.values() for row in rows])
+        conn.executemany(
+            "INSERT OR REPLACE INTO forecast_fingerprints (area_code, report_datetime, digest) VALUES (?, ?, ?)",
+            [(area_code, report_datetime, digest) for (area_code, report_datetime), (_, digest) in changed.items()]
+        )
+    METRICS.incr("forecast_writes", len(changed))
+    # 書き込んだ発表日と「最新」のキャッシュだけ捨てる
+    FORECAST_CACHE.invalidate(
+        key for (area_code, _), (rows, _) in changed.items() for key in ((area_code, None), (area_code, rows[0][4]))
+    )
+    return sorted({area_code for area_code, _ in changed})
+
+def get_forecast_from_db(area_code: str, report_date: str = None):
+    """
+    データベースから特定エリアの天気予報データを取得する
+    report_date が指定されていない場合は最新のデータを返す
+    一度読んだ結果はキャッシュから返す（戻り値の Forecast は書き換えないこと）
+    """
+    report_day = date_to_int(report_date) if report_date else None
+    if report_date and report_day is None:
+        # 日付として読めない指定はキャッシュしない（「最新」のキーと混ざらないように）
+        return read_forecast_from_db(area_code, report_date)
+    key = (area_code, report_day)
+    found, value = FORECAST_CACHE.get(key)
+    if found:
+        return value
+    result = read_forecast_from_db(area_code, report_date)
+    FORECAST_CACHE.put(key, result, value)
+    return result
+
+@METRICS.timed("db_read")
+def read_forecast_from_db(area_code: str, report_date: str = None) -> Forecast:
+    """get_forecast_from_db の本体（キャッシュを通さずに DB から組み立てる）"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    if report_date:
+        # 指定された日付の予報を取得
+        cursor.execute(
+            """
+            SELECT report_date, report_datetime, publishing_office FROM forecasts 
+            WHERE area_code = ? AND report_date = ? 
+            ORDER BY report_datetime DESC LIMIT 1
+            """,
+            (area_code, date_to_int(report_date))
+        )
+    else:
+        # 最新の予報を取得
+        cursor.execute(
+            """
+            SELECT report_date, report_datetime, publishing_office FROM forecasts 
+            WHERE area_code = ? 
+            ORDER BY report_date DESC, report_datetime DESC LIMIT 1
+            """,
+            (area_code,)
+        )
+    
+    row = cursor.fetchone()
+    if not row:
+        return Forecast()
+    report_day, report_datetime, publishing_office = row
+    
+    # その日付の予報データを取得
+    cursor.execute(
+        """
+        SELECT forecast_date, weather_code, temp_min, temp_max 
+        FROM forecasts 
+        WHERE area_code = ? AND report_date = ? AND report_datetime = ?
+        ORDER BY forecast_day
+        """,
+        (area_code, report_day, report_datetime)
+    )
+    return _forecast_from_rows(publishing_office, report_datetime, cursor.fetchall())
+
+def _forecast_from_rows(publishing_office, report_datetime, rows) -> Forecast:
+    """(forecast_date, weather_code, temp_min, temp_max) の行から Forecast を作る"""
+    days, codes, mins, maxs = zip(*rows) if rows else ((), (), (), ())
+    return Forecast.build(publishing_office, report_datetime, days, codes, mins, maxs)
+
+@METRICS.timed("db_read")
+def get_forecast_history(area_code: str, start, end) -> list:
+    """
+    start〜end（両端を含む日付。"YYYY-MM-DD" か date）の各日について、
+    その日の最後の発表とその予報をまとめて取得する。
+    戻り値は発表日の古い順の Forecast のリスト（発表日は report_datetime の先頭10文字）。
+    """
+    start_day = date_to_int(str(start))
+    end_day = date_to_int(str(end))
+    conn = get_connection()
+    
+    # 日ごとの最新の発表を求めてから、その発表の行だけを結合する（どちらもインデックスで引ける）
+    rows = conn.execute(
+        """
+        WITH latest AS (
+            SELECT report_date, MAX(report_datetime) AS report_datetime
+            FROM forecasts
+            WHERE area_code = ? AND report_date BETWEEN ? AND ?
+            GROUP BY report_date
+        )
+        SELECT f.report_datetime, f.publishing_office,
+               f.forecast_date, f.weather_code, f.temp_min, f.temp_max
+        FROM latest
+        JOIN forecasts AS f
+          ON f.area_code = ? AND f.report_date = latest.report_date
+         AND f.report_datetime = latest.report_datetime
+        ORDER BY f.report_date, f.forecast_day
+        """,
+        (area_code, start_day, end_day, area_code)
+    ).fetchall()
+    
+    history = []
+    days = []
+    for i, (report_datetime, publishing_office, *day) in enumerate(rows):
+        days.append(day)
+        # 次の行が別の発表なら、ここまでを1件にする
+        if i + 1 == len(rows) or rows[i + 1][0] != report_datetime:
+            history.append(_forecast_from_rows(publishing_office, report_datetime, days))
+            days = []
+    return history
+
+def int_to_date(value: int) -> str:
+    """20250101 → 2025-01-01（文字列）"""
+    s = f"{value:08d}"
+    return f"{s[:4]}-{s[4:6]}-{s[6:]}"
+
+@METRICS.timed("db_read")
+def get_forecast_dates_for_area(area_code: str):
+    """特定のエリアコードで利用可能な予報日付のリストを取得する"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    cursor.execute(
+        """
+        SELECT DISTINCT report_date
+        FROM forecasts 
+        WHERE area_code = ?
+        ORDER BY report_date DESC
+        """,
+        (area_code,)
+    )
+    
+    dates = [int_to_date(row[0]) for row in cursor.fetchall()]
+    return dates
+
+@METRICS.timed("db_read")
+def get_latest_report_datetimes():
+    """エリアコードごとの最新の発表日時 {area_code: report_datetime} を取得する"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    cursor.execute("SELECT area_code, MAX(report_datetime) FROM forecasts GROUP BY area_code")
+    latest = dict(cursor.fetchall())
+    
+    return latest
+
+# ---------------------------------------------
+# 取得
+# ---------------------------------------------
+def fetch_area_list():
+    """APIから地域リストを取得し、DBにも保存する"""
+    # まずDBから取得を試みる
+    db_areas = get_areas_from_db()
+    if db_areas:
+        return db_areas
+    
+    # DBにない場合はAPIから取得
+    data = get_json(AREA_JSON_URL)
+    offices = data.get("offices", {})
+    areas = [{"code": c, "name": info.get("name")} for c, info in offices.items()]
+    areas.sort(key=lambda x: x["code"])
+    
+    # DBに保存
+    save_areas_to_db(areas)
+    return areas
+
+def parse_forecast(payload) -> Forecast:
+    """気象庁の予報 JSON から週間予報の部分を取り出す"""
+    publishing_office = report_datetime = None
+    days, codes, mins, maxs = [], [], [], []
+    
+    if len(payload) > 0:
+        publishing_office = payload[0].get("publishingOffice")
+        report_datetime = payload[0].get("reportDatetime")
+    
+    if len(payload) > 1:
+        tsw = payload[1].get("timeSeries", [])
+        if len(tsw) > 0:
+            areas = tsw[0].get("areas", [])
+            if areas:
+                days = tsw[0].get("timeDefines", [])
+                codes = areas[0].get("weatherCodes", [])
+        
+        if len(tsw) > 1:
+            tdefs = tsw[1].get("timeDefines", [])
+            areas = tsw[1].get("areas", [])
+            if areas:
+                # 気温は天気と同じ日付の並びにそろえる
+                t_mins = areas[0].get("tempsMin", [])
+                t_maxs = areas[0].get("tempsMax", [])
+                if tdefs == days and len(t_mins) == len(t_maxs) == len(days):
+                    # ふつうは同じ並びなので、対応表を作らずにそのまま使う
+                    mins, maxs = t_mins, t_maxs
+                else:
+                    temps = {}
+                    for i, dt in enumerate(tdefs):
+                        temps.setdefault(dt, (t_mins[i] if i < len(t_mins) else None,
+                                              t_maxs[i] if i < len(t_maxs) else None))
+                    mins = [temps.get(dt, (None, None))[0] for dt in days]
+                    maxs = [temps.get(dt, (None, None))[1] for dt in days]
+    
+    n = len(days)
+    return Forecast.build(publishing_office, report_datetime, days,
+                          list(codes[:n]) + [None] * (n - len(codes)),
+                          mins or [None] * n, maxs or [None] * n)
+
+# 予報 JSON の一部（週間予報）だけを正規表現で切り出してデコードする方法も試したが、
+# 全体を読む場合より 2 割ほど（1件あたり数十マイクロ秒）速いだけで、読み飛ばした部分が壊れていても気付けないのでやめた
+# （bench/bench_extract.py に比較用として残してある）。
+@METRICS.timed("parse")
+def extract_forecast(raw):
+    """予報 JSON の生データ（bytes / str）から必要な項目だけを取り出す（壊れた JSON は ValueError）"""
+    return parse_forecast(json.loads(raw))
+
+# 同じ地域の取得・保存が同時に走ったら1回にまとめる
+_DOWNLOADS = SingleFlight()
+_FETCHES = SingleFlight()
+
+def _download_forecast(code: str, deadline: float = None):
+    return extract_forecast(get_bytes(f"{FORECAST_BASE}{code}.json", deadline=deadline))
+
+def download_forecast(code: str, deadline: float = None):
+    """APIから天気予報を取得する（DBには保存しない）"""
+    return _DOWNLOADS.do(code, _download_forecast, code, deadline)
+
+def _fetch_forecast(code: str, deadline: float = None):
+    result = download_forecast(code, deadline=deadline)
+    save_forecast_to_db(code, result)
+    return result
+
+def fetch_forecast(code: str, deadline: float = None):
+    """APIから天気予報を取得し、DBにも保存する"""
+    return _FETCHES.do(code, _fetch_forecast, code, deadline)
+
+# ---------------------------------------------
+# 地方グループ（見出しを「〇〇地方」にする）
+# ---------------------------------------------
+# 先頭2桁コード -> 地方名
+REGION_PREFIX_GROUPS = {
+    "北海道地方": {"01"},
+    "東北地方": {"02","03","04","05","06","07"},
+    "関東甲信地方": {"08","09","10","11","12","13","14","19","20"},
+    "北陸地方": {"16","17","18"},
+    "東海地方": {"21","22","23"},
+    "近畿地方": {"24","25","26","27","28","29","30"},
+    "中国地方": {"31","32","33","34","35"},
+    "四国地方": {"36","37","38","39"},
+    "九州地方": {"40","41","42","43","44","45","46"},
+    "沖縄地方": {"47"},
+}
+REGION_ORDER = [
+    "北海道地方","東北地方","関東甲信地方","北陸地方","東海地方",
+    "近畿地方","中国地方","四国地方","九州地方","沖縄地方"
+]
+# 先頭2桁 -> 地方名 の逆引き表
+REGION_BY_PREFIX = {prefix: region for region, prefixes in REGION_PREFIX_GROUPS.items() for prefix in prefixes}
+
+def region_name_for_prefix(prefix: str) -> str:
+    region = REGION_BY_PREFIX.get(prefix)
+    return region if region else f"その他（{prefix}xx）"
@@ -0,0 +1,80 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# アプリは src/ をカレントにして動かす前提なので、テストからも src/ のモジュールを直接 import する
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import weather_data
+from http_client import HttpClient
+
+BODY = b'{"value": 1}'
+ETAG = '"v1"'
+LAST_MODIFIED = "Wed, 01 Jan 2025 00:00:00 GMT"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """HttpClient を確かめるためのスタブ（パスごとに決まった応答を返す）"""
+    protocol_version = "HTTP/1.1"  # keep-alive で接続を使い回せるようにする
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append({"path": self.path, "headers": dict(self.headers), "client": self.client_address})
+        if self.path == "/validated":
+            if self.headers.get("If-None-Match") == ETAG:
+                self._send(304, b"")
+            else:
+                self._send(200, BODY, {"ETag": ETAG, "Last-Modified": LAST_MODIFIED})
+        elif self.path == "/always-304":
+            self._send(304, b"")
+        elif self.path == "/unavailable":
+            self._send(503, b"busy")
+        else:
+            self._send(200, BODY)
+
+    def _send(self, status: int, body: bytes, headers: dict = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """ローカルのスタブ HTTP サーバー（server.url(path) で URL を作る）"""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    httpd.requests = []
+    httpd.url = lambda path: f"http://127.0.0.1:{httpd.server_address[1]}{path}"
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def client():
+    c = HttpClient(timeout=5)
+    yield c
+    c.close()
+
+
+@pytest.fixture
+def db(tmp_path):
+    """空の DB を開いて weather_data をそちらに向ける"""
+    saved = weather_data.DB_PATH
+    weather_data.DB_PATH = str(tmp_path / "weather_forecast.db")
+    weather_data.init_database()
+    yield weather_data.get_connection()
+    weather_data.CONNECTIONS.close()  # テストの中で開いた別の DB も閉じる
+    weather_data.DB_PATH = saved
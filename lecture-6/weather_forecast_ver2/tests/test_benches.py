@@ -0,0 +1,34 @@
+# ---------------------------------------------
+# ベンチマークが動くことの確認（小さい引数で1回ずつ走らせる）
+# ---------------------------------------------
+# スキーマや関数の引数を変えたときにベンチマークだけ壊れたままにならないよう、
+# bench/ のスクリプトを別プロセスで最後まで実行できるかを見る（速さは見ない）。
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bench")
+
+BENCHES = [
+    ("bench_analytics.py", ["3", "10", "2"]),
+    ("bench_cards.py", ["5"]),
+    ("bench_db.py", ["3", "3"]),
+    ("bench_extract.py", ["--synthetic", "3"]),
+    ("bench_icons.py", ["200"]),
+    ("bench_ingest.py", ["3", "3"]),
+    ("bench_record.py", ["3", "1"]),
+    ("bench_schema.py", ["3", "10", "1"]),
+    ("bench_sidebar.py", ["58", "1"]),
+]
+
+
+@pytest.mark.parametrize("script,args", BENCHES, ids=[name for name, _ in BENCHES])
+def test_bench_runs(script, args, tmp_path):
+    result = subprocess.run(
+        [sys.executable, os.path.join(BENCH_DIR, script), *args],
+        cwd=tmp_path, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
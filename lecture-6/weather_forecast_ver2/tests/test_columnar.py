@@ -0,0 +1,96 @@
+# columnar の列ファイル書き出し（追記・途中で止まった分の切り詰め・retention 後の作り直し）
+
+import os
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+import columnar
+import retention
+import weather_data
+from forecast_record import Forecast
+
+
+def save_reports(start: datetime, n_reports: int, codes=("130000", "270000")):
+    for r in range(n_reports):
+        report = start + timedelta(hours=12 * r)
+        days = [(report + timedelta(days=i + 1)).strftime("%Y-%m-%dT00:00:00+09:00") for i in range(7)]
+        weather_data.save_forecasts_to_db({code: Forecast.build(
+            "気象庁", report.strftime("%Y-%m-%dT%H:%M:%S+09:00"), days,
+            ["101"] * 7, [""] + ["10"] * 6, [""] + [str(20 + r % 5)] * 6) for code in codes})
+
+
+def db_rows(conn) -> list:
+    return conn.execute(
+        "SELECT id, area_code, forecast_day, report_epoch, temp_max FROM forecasts ORDER BY id"
+    ).fetchall()
+
+
+def exported_rows(directory: str) -> list:
+    columns, manifest = columnar.open_columns(directory)
+    codes = manifest["area_codes"]
+    return [(int(row_id), codes[area], int(day), int(epoch), None if np.isnan(temp) else int(temp))
+            for row_id, area, day, epoch, temp in zip(columns["row_id"], columns["area_index"],
+                                                      columns["forecast_day"], columns["report_epoch"],
+                                                      columns["temp_max"])]
+
+
+@pytest.fixture
+def out(tmp_path):
+    return str(tmp_path / "columns")
+
+
+def test_export_resumes_from_manifest(db, out):
+    save_reports(datetime(2026, 1, 1, 5), 3)
+    first = columnar.export_forecasts(out)
+    assert (first["appended"], first["rows"], first["rebuilt"]) == (42, 42, False)
+    assert exported_rows(out) == db_rows(db)
+
+    # 何も増えていなければ何も書かない
+    assert columnar.export_forecasts(out)["appended"] == 0
+
+    save_reports(datetime(2026, 1, 3, 5), 2)
+    second = columnar.export_forecasts(out)
+    assert (second["appended"], second["rows"]) == (28, 70)
+    assert columnar.read_manifest(out)["last_row_id"] == db_rows(db)[-1][0]
+    assert exported_rows(out) == db_rows(db)
+
+
+def test_uncommitted_tail_is_truncated(db, out):
+    save_reports(datetime(2026, 1, 1, 5), 2)
+    columnar.export_forecasts(out)
+    manifest = columnar.read_manifest(out)
+    # manifest を書く前に止まった追記（各ファイルの末尾に半端なバイトが残る）
+    for spec in manifest["columns"].values():
+        with open(os.path.join(out, spec["file"]), "ab") as f:
+            f.write(b"\xff" * 13)
+
+    # manifest の rows までしか読まない
+    assert exported_rows(out) == db_rows(db)
+
+    save_reports(datetime(2026, 1, 2, 5), 1)
+    report = columnar.export_forecasts(out)
+    assert (report["appended"], report["rows"]) == (14, 42)
+    for name, spec in manifest["columns"].items():
+        size = os.path.getsize(os.path.join(out, spec["file"]))
+        assert size == 42 * np.dtype(spec["dtype"]).itemsize, name
+    assert exported_rows(out) == db_rows(db)
+
+
+def test_export_is_rebuilt_after_retention(db, out):
+    save_reports(datetime(2026, 1, 1, 5), 40)
+    columnar.export_forecasts(out)
+
+    pruned = retention.apply_retention(retention.RetentionPolicy(keep_all_days=7, keep_daily_days=14),
+                                       date(2026, 1, 25))
+    assert pruned["rolled_up_rows"] and pruned["thinned_rows"]
+    report = columnar.export_forecasts(out)
+    assert report["rebuilt"] is True
+    assert report["rows"] == len(db_rows(db))
+    assert exported_rows(out) == db_rows(db)
+
+    # retention が行を消していなければ作り直さない
+    assert retention.apply_retention(retention.RetentionPolicy(keep_all_days=7, keep_daily_days=14),
+                                     date(2026, 1, 25))["rolled_up_rows"] == 0
+    assert columnar.export_forecasts(out)["rebuilt"] is False
@@ -0,0 +1,63 @@
+# extract_forecast: 保存済みの予報 JSON と壊れた JSON の扱い
+
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bench"))
+
+from fixtures import synthetic_office_payload
+from weather_data import extract_forecast, parse_forecast
+
+
+def office_payloads(n: int = 12) -> list:
+    rng = random.Random(0)
+    start = datetime(2026, 1, 1, 11)
+    return [synthetic_office_payload(start + timedelta(days=i), rng, n_areas=1 + i % 4) for i in range(n)]
+
+
+@pytest.mark.parametrize("dump", [
+    lambda p: json.dumps(p, ensure_ascii=False).encode("utf-8"),  # 気象庁と同じ（bytes・非 ASCII はそのまま）
+    lambda p: json.dumps(p),                                       # str・\\u エスケープ
+    lambda p: json.dumps(p, ensure_ascii=False, indent=2),         # 改行・字下げあり
+], ids=["bytes", "escaped", "indented"])
+def test_same_result_as_full_parse(dump):
+    for payload in office_payloads():
+        raw = dump(payload)
+        result = extract_forecast(raw)
+        assert result == parse_forecast(json.loads(raw))
+        assert result.report_datetime == payload[1]["reportDatetime"]
+        assert len(result) == 7
+
+
+def test_missing_weekly_forecast():
+    payload = office_payloads(1)[0][:1]
+    result = extract_forecast(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+    assert result == parse_forecast(payload)
+    assert len(result) == 0 and result.report_datetime == payload[0]["reportDatetime"]
+
+
+def malformed() -> dict:
+    raw = json.dumps(office_payloads(1)[0], ensure_ascii=False)
+    weekly_at = raw.index('{"publishingOffice"', 2)  # 2つ目の要素（週間予報）
+    return {
+        "truncated": raw[:-10],
+        "trailing_garbage": raw + "x",
+        "broken_short_term": raw[:weekly_at - 40] + "}" + raw[weekly_at - 2:],
+        "broken_weekly": raw[:weekly_at] + raw[weekly_at:].replace('"timeSeries":', '"timeSeries"', 1),
+        "empty": "",
+    }
+
+
+@pytest.mark.parametrize("name", list(malformed()))
+def test_malformed_json_raises_like_full_parse(name):
+    raw = malformed()[name]
+    with pytest.raises(ValueError) as full:
+        json.loads(raw)
+    with pytest.raises(ValueError) as extracted:
+        extract_forecast(raw)
+    assert type(extracted.value) is type(full.value)
@@ -0,0 +1,68 @@
+# ForecastCache: LRU の追い出し順と、世代番号による無効化
+
+from forecast_cache import ForecastCache
+
+
+def test_put_after_invalidate_is_dropped():
+    cache = ForecastCache()
+    found, generation = cache.get(("130000", None))
+    assert not found
+    # 読み込んでいるあいだに同じエリアへの書き込みがあった
+    cache.invalidate([("130000", None)])
+    cache.put(("130000", None), "古い結果", generation)
+    assert cache.get(("130000", None)) == (False, generation + 1)
+
+    # 無効化のあとで取り直した世代番号なら入る
+    _, generation = cache.get(("130000", None))
+    cache.put(("130000", None), "新しい結果", generation)
+    assert cache.get(("130000", None)) == (True, "新しい結果")
+
+
+def test_put_after_clear_is_dropped():
+    cache = ForecastCache()
+    _, generation = cache.get(("270000", 20260101))
+    cache.clear()
+    cache.put(("270000", 20260101), "古い結果", generation)
+    assert cache.get(("270000", 20260101))[0] is False
+    assert cache.stats()["size"] == 0
+
+
+def fill(cache: ForecastCache, keys) -> None:
+    for key in keys:
+        _, generation = cache.get(key)
+        cache.put(key, f"value-{key}", generation)
+
+
+def test_lru_evicts_least_recently_used_at_maxsize():
+    cache = ForecastCache(maxsize=3)
+    fill(cache, ["a", "b", "c"])
+    assert list(cache._entries) == ["a", "b", "c"]
+
+    # a を読んだので、いちばん使われていないのは b
+    assert cache.get("a") == (True, "value-a")
+    fill(cache, ["d"])
+    assert list(cache._entries) == ["c", "a", "d"]
+    assert cache.get("b")[0] is False
+
+    # 入れ直したキーも新しく使ったことになる
+    _, generation = cache.get("c")
+    cache.put("c", "value-c2", generation)
+    fill(cache, ["e"])
+    assert list(cache._entries) == ["d", "c", "e"]
+    assert cache.stats()["size"] == cache.maxsize == 3
+
+
+def test_invalidate_drops_only_given_keys_and_bumps_generation():
+    cache = ForecastCache()
+    fill(cache, [("130000", None), ("130000", 20260101), ("270000", None)])
+    _, before = cache.get(("016000", None))
+
+    cache.invalidate([("130000", None), ("130000", 20260101), ("999999", None)])
+    assert cache.get(("130000", None)) == (False, before + 1)
+    assert cache.get(("130000", 20260101))[0] is False
+    assert cache.get(("270000", None)) == (True, "value-('270000', None)")
+    assert cache.stats()["invalidations"] == 2
+
+    cache.clear()
+    assert cache.get(("270000", None)) == (False, before + 2)
+    assert cache.stats()["invalidations"] == 3
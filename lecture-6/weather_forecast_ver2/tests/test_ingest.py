@@ -0,0 +1,53 @@
+# ingest の一括取り込みを一時ディレクトリの DB で確かめる
+
+import json
+from datetime import date, datetime, timedelta
+
+import ingest
+import retention
+
+
+def payload(report: datetime) -> list:
+    """気象庁 forecast/{code}.json と同じ形（週間予報は2つ目）"""
+    days = [(report + timedelta(days=i + 1)).strftime("%Y-%m-%dT00:00:00+09:00") for i in range(7)]
+    head = {"publishingOffice": "気象庁", "reportDatetime": report.strftime("%Y-%m-%dT%H:%M:%S+09:00")}
+    return [dict(head, timeSeries=[]),
+            dict(head, timeSeries=[{"timeDefines": days, "areas": [{"weatherCodes": ["101"] * 7}]},
+                                   {"timeDefines": days, "areas": [{"tempsMin": [""] + ["10"] * 6,
+                                                                     "tempsMax": [""] + ["20"] * 6}]}])]
+
+
+def test_ingesting_twice_writes_nothing_the_second_time(db, tmp_path):
+    root = tmp_path / "archive"
+    start = datetime(2026, 1, 1, 5)
+    for day in range(40):
+        for hour in (0, 12):
+            report = start + timedelta(days=day, hours=hour)
+            folder = root / report.strftime("%Y%m%d%H")
+            folder.mkdir(parents=True)
+            for code in ("130000", "270000"):
+                (folder / f"{code}.json").write_text(json.dumps(payload(report)), encoding="utf-8")
+    (root / "broken").mkdir()
+    (root / "broken" / "016000.json").write_text("[", encoding="utf-8")
+
+    first = ingest.ingest_directory(str(root), max_workers=2, batch_size=50)
+    assert (first["files"], first["ok"], first["written"]) == (161, 160, 160)
+    assert first["changed"] == ["130000", "270000"]
+    assert list(first["failed"]) == [str(root / "broken" / "016000.json")]
+    rows = db.execute("SELECT COUNT(*) FROM forecasts").fetchone()[0]
+
+    second = ingest.ingest_directory(str(root), max_workers=2, batch_size=50)
+    assert (second["written"], second["changed"]) == (0, [])
+    assert db.execute("SELECT COUNT(*) FROM forecasts").fetchone()[0] == rows
+
+    # 保持ポリシーで間引いたあとに取り込み直しても、消した発表は戻らない
+    policy = retention.RetentionPolicy(keep_all_days=14, keep_daily_days=30)
+    retention.apply_retention(policy, date(2026, 2, 10))
+    pruned = (db.execute("SELECT COUNT(*) FROM forecasts").fetchone()[0],
+              db.execute("SELECT SUM(reports) FROM forecast_rollup").fetchone()[0])
+    assert pruned[0] < rows and pruned[1] > 0
+    third = ingest.ingest_directory(str(root), max_workers=2, batch_size=50)
+    assert (third["written"], third["changed"]) == (0, [])
+    assert retention.apply_retention(policy, date(2026, 2, 10))["rolled_up_rows"] == 0
+    assert (db.execute("SELECT COUNT(*) FROM forecasts").fetchone()[0],
+            db.execute("SELECT SUM(reports) FROM forecast_rollup").fetchone()[0]) == pruned
@@ -0,0 +1,54 @@
+# refresher: 発表時刻（5・11・17時）と反映待ちの余裕をまたいだときの判定
+
+from datetime import datetime, timedelta
+
+import weather_data
+from forecast_record import Forecast
+from refresher import JST, PUBLICATION_GRACE, areas_needing_refresh, latest_expected_publication, next_publication
+
+
+def at(day: int, hour: int, minute: int = 0) -> datetime:
+    return datetime(2026, 1, day, hour, minute, tzinfo=JST)
+
+
+def save_report(code: str, report: datetime):
+    days = [(report + timedelta(days=i + 1)).strftime("%Y-%m-%dT00:00:00+09:00") for i in range(7)]
+    weather_data.save_forecasts_to_db({code: Forecast.build(
+        "気象庁", report.strftime("%Y-%m-%dT%H:%M:%S+09:00"), days, ["101"] * 7, ["10"] * 7, ["20"] * 7)})
+
+
+def test_latest_expected_publication_waits_for_grace():
+    assert PUBLICATION_GRACE == timedelta(minutes=10)
+    assert latest_expected_publication(at(10, 11, 9)) == at(10, 5)
+    assert latest_expected_publication(at(10, 11, 10)) == at(10, 11)
+    assert latest_expected_publication(at(10, 17, 30)) == at(10, 17)
+    # 当日の最初の発表が反映される前は、前日の最後の発表
+    assert latest_expected_publication(at(10, 5, 9)) == at(9, 17)
+    assert latest_expected_publication(at(10, 0, 30)) == at(9, 17)
+    # 日本時間以外で渡しても同じ
+    assert latest_expected_publication(at(10, 11, 10).astimezone(datetime.now().astimezone().tzinfo)) == at(10, 11)
+
+
+def test_next_publication_rolls_over_to_next_day():
+    assert next_publication(at(10, 11, 9)) == at(10, 11, 10)
+    assert next_publication(at(10, 11, 10)) == at(10, 17, 10)
+    assert next_publication(at(10, 17, 10)) == at(11, 5, 10)
+
+
+def test_areas_needing_refresh_across_publication_boundary(db):
+    save_report("130000", at(10, 5))
+    save_report("270000", at(10, 11))
+    codes = ["130000", "270000", "016000"]  # 016000 は DB にない
+
+    # 11時の発表が反映される前: 5時の発表があれば新しい
+    assert areas_needing_refresh(at(10, 11, 9), codes) == ["016000"]
+    # 11時10分を過ぎたら、5時の発表しかない地域は古い
+    assert areas_needing_refresh(at(10, 11, 10), codes) == ["130000", "016000"]
+    # 翌日の5時10分前までは前日17時の発表が最新なので、11時の発表も古い
+    assert areas_needing_refresh(at(11, 5, 0), codes) == ["130000", "270000", "016000"]
+
+    save_report("130000", at(10, 17))
+    save_report("270000", at(10, 17))
+    save_report("016000", at(10, 17))
+    assert areas_needing_refresh(at(11, 5, 9), codes) == []
+    assert areas_needing_refresh(at(11, 5, 10), codes) == codes
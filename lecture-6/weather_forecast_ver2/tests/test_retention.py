@@ -0,0 +1,61 @@
+# retention の保持ポリシーを一時ディレクトリの DB で確かめる
+
+from datetime import date, datetime, timedelta
+
+import retention
+import weather_data
+from forecast_record import Forecast
+
+TODAY = date(2026, 7, 1)
+POLICY = retention.RetentionPolicy(keep_all_days=14, keep_daily_days=180)
+
+
+def forecast(report: datetime, temp_max: int) -> Forecast:
+    days = [(report + timedelta(days=i + 1)).strftime("%Y-%m-%dT00:00:00+09:00") for i in range(7)]
+    return Forecast.build("気象庁", report.strftime("%Y-%m-%dT%H:%M:%S+09:00"), days,
+                          ["101"] * 7, ["10"] * 7, [str(temp_max)] * 7)
+
+
+def history() -> list:
+    """200日前から今日まで、1日2回の発表（集約・間引き・そのまま残す の3区分にまたがる）"""
+    start = datetime(TODAY.year, TODAY.month, TODAY.day) - timedelta(days=200)
+    batches = []
+    for day in range(201):
+        for hour in (5, 17):
+            report = start + timedelta(days=day, hours=hour)
+            batches.append({code: forecast(report, 20 + day % 5) for code in ("130000", "270000")})
+    return batches
+
+
+def state(conn) -> tuple:
+    return (
+        conn.execute("SELECT COUNT(*) FROM forecasts").fetchone()[0],
+        conn.execute("SELECT * FROM forecast_rollup ORDER BY area_code, forecast_day").fetchall(),
+    )
+
+
+def test_retention_twice_and_reingest_keep_counts_stable(db):
+    batches = history()
+    for batch in batches:
+        weather_data.save_forecasts_to_db(batch)
+    total = db.execute("SELECT COUNT(*) FROM forecasts").fetchone()[0]
+
+    first = retention.apply_retention(POLICY, TODAY)
+    assert first["rolled_up_rows"] > 0 and first["thinned_rows"] > 0
+    assert first["compacted"] is True
+    assert first["rolled_up_rows"] + first["thinned_rows"] < total
+    after_first = state(db)
+    # 集約した発表の数は、集約で消した行の数と同じ
+    assert sum(row[2] for row in after_first[1]) == first["rolled_up_rows"]
+
+    # もう一度実行しても何も変わらない
+    second = retention.apply_retention(POLICY, TODAY)
+    assert (second["rolled_up_rows"], second["thinned_rows"], second["compacted"]) == (0, 0, False)
+    assert state(db) == after_first
+
+    # 同じ発表を取り込み直しても、消した行は戻らず二重に集約されない
+    for batch in batches:
+        assert weather_data.save_forecasts_to_db(batch) == []
+    third = retention.apply_retention(POLICY, TODAY)
+    assert (third["rolled_up_rows"], third["thinned_rows"]) == (0, 0)
+    assert state(db) == after_first
@@ -0,0 +1,149 @@
+# retry のブレーカーとバックオフを偽の時計で確かめる（実際には待たない）
+
+import pytest
+import requests
+
+import retry
+
+
+class FakeClock:
+    """retry.time の代わり（sleep すると時刻が進むだけ）"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(retry, "time", fake)
+    return fake
+
+
+class Failing:
+    """呼ばれるたびに exc を投げ、呼ばれた時刻と timeout を残す"""
+
+    def __init__(self, clock, exc):
+        self.clock = clock
+        self.exc = exc
+        self.calls = []
+
+    def __call__(self, timeout):
+        self.calls.append((self.clock.now, timeout))
+        raise self.exc
+
+
+def http_error(status: int) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status}", response=response)
+
+
+def test_breaker_states(clock):
+    breaker = retry.CircuitBreaker(failure_threshold=2, reset_after=30)
+    assert breaker.state == "closed" and breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    clock.now += 29.9
+    assert breaker.state == "open"
+    clock.now += 0.1
+    assert breaker.state == "half_open"
+    # half_open では1回だけ通し、試している間はほかを通さない
+    assert breaker.allow()
+    assert breaker.state == "open" and not breaker.allow()
+
+    # 試しの1回が失敗したら、また reset_after だけ開いたまま
+    breaker.record_failure()
+    clock.now += 29
+    assert breaker.state == "open"
+    clock.now += 1
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.failures == 0
+
+
+def test_open_breaker_rejects_without_calling(clock, monkeypatch):
+    url = "https://open.example/forecast.json"
+    monkeypatch.setitem(retry._breakers, "open.example", retry.CircuitBreaker(failure_threshold=3))
+    fn = Failing(clock, requests.ConnectionError("down"))
+
+    with pytest.raises(requests.ConnectionError):
+        retry.call_with_retry(fn, url, tries=3)
+    assert len(fn.calls) == 3
+    with pytest.raises(retry.CircuitOpenError):
+        retry.call_with_retry(fn, url, tries=3)
+    assert len(fn.calls) == 3
+
+
+def test_client_errors_are_not_retried_or_counted(clock, monkeypatch):
+    url = "https://notfound.example/forecast.json"
+    breaker = retry.CircuitBreaker(failure_threshold=1)
+    monkeypatch.setitem(retry._breakers, "notfound.example", breaker)
+    fn = Failing(clock, http_error(404))
+
+    with pytest.raises(requests.HTTPError):
+        retry.call_with_retry(fn, url, tries=3)
+    assert len(fn.calls) == 1 and clock.sleeps == []
+    assert breaker.state == "closed"
+
+
+def test_full_jitter_backoff(clock, monkeypatch):
+    bounds = []
+    monkeypatch.setattr(retry.random, "uniform", lambda low, high: bounds.append((low, high)) or high / 2)
+    url = "https://jitter.example/forecast.json"
+    monkeypatch.setitem(retry._breakers, "jitter.example", retry.CircuitBreaker(failure_threshold=100))
+    fn = Failing(clock, http_error(503))
+
+    with pytest.raises(requests.HTTPError):
+        retry.call_with_retry(fn, url, tries=6)
+    # 0〜base*2^i（上限 cap=4秒）の一様乱数で待つ。最後の試行のあとは待たない
+    assert bounds == [(0, 0.5), (0, 1.0), (0, 2.0), (0, 4.0), (0, 4.0)]
+    assert clock.sleeps == [0.25, 0.5, 1.0, 2.0, 2.0]
+    assert len(fn.calls) == 6
+
+
+def test_backoff_delay_stays_within_bounds():
+    for attempt in range(8):
+        high = min(4.0, 0.5 * 2 ** attempt)
+        assert all(0 <= retry.backoff_delay(attempt) <= high for _ in range(200))
+
+
+def test_action_deadline_cuts_off_retries(clock, monkeypatch):
+    # 待ち時間はいつも上限いっぱい: 0.5, 1, 2, 4 秒…
+    monkeypatch.setattr(retry.random, "uniform", lambda low, high: high)
+    url = "https://slow.example/forecast.json"
+    monkeypatch.setitem(retry._breakers, "slow.example", retry.CircuitBreaker(failure_threshold=100))
+    fn = Failing(clock, requests.Timeout("slow"))
+    start = clock.now
+    deadline = start + retry.ACTION_DEADLINE
+
+    with pytest.raises(requests.Timeout):
+        retry.call_with_retry(fn, url, tries=10, timeout=10, deadline=deadline)
+    # 0, 0.5, 1.5, 3.5, 7.5 秒に試し、次の待ち（4秒）で期限の 8 秒を越えるので待たずに諦める
+    assert [t - start for t, _ in fn.calls] == [0, 0.5, 1.5, 3.5, 7.5]
+    # 各試行の timeout は期限までの残り時間で切り詰める
+    assert [timeout for _, timeout in fn.calls] == [8.0, 7.5, 6.5, 4.5, 0.5]
+    assert clock.now - start == 7.5
+    assert clock.now < deadline
+
+
+def test_deadline_already_passed(clock, monkeypatch):
+    url = "https://late.example/forecast.json"
+    monkeypatch.setitem(retry._breakers, "late.example", retry.CircuitBreaker())
+    fn = Failing(clock, requests.ConnectionError("never called"))
+
+    with pytest.raises(TimeoutError):
+        retry.call_with_retry(fn, url, deadline=clock.now)
+    assert fn.calls == []
@@ -0,0 +1,93 @@
+# SingleFlight: 同じキーの同時呼び出しが1回の処理を共有すること
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from singleflight import SingleFlight
+
+CALLERS = 8
+
+
+def run_concurrently(flight: SingleFlight, key, fn) -> list:
+    """CALLERS 本のスレッドから同時に flight.do(key, fn) を呼び、結果（か例外）を返す"""
+    def call():
+        try:
+            return flight.do(key, fn)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(CALLERS) as pool:
+        futures = [pool.submit(call) for _ in range(CALLERS)]
+        return [f.result(5) for f in futures]
+
+
+class CountingLock:
+    """SingleFlight._lock の代わり（何回取られたかを数える）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.entered = 0
+        self.changed = threading.Condition()
+
+    def __enter__(self):
+        self._lock.acquire()
+        with self.changed:
+            self.entered += 1
+            self.changed.notify_all()
+
+    def __exit__(self, *exc):
+        self._lock.release()
+
+
+class SlowFetch:
+    """ほかの呼び出しが全員キーを確かめ終わるまで返さない（呼ばれた回数を数える）"""
+
+    def __init__(self, lock: CountingLock, result=None, error=None):
+        self.lock = lock
+        self.calls = 0
+        self.result = result
+        self.error = error
+
+    def __call__(self):
+        self.calls += 1
+        # 先頭の1回 + 待つ側の CALLERS - 1 回
+        with self.lock.changed:
+            assert self.lock.changed.wait_for(lambda: self.lock.entered >= CALLERS, 5)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+def counting_flight() -> tuple:
+    flight = SingleFlight()
+    flight._lock = CountingLock()
+    return flight, flight._lock
+
+
+def test_concurrent_callers_share_one_fetch():
+    flight, lock = counting_flight()
+    fetch = SlowFetch(lock, result={"code": "130000"})
+    results = run_concurrently(flight, "130000", fetch)
+
+    assert fetch.calls == 1
+    assert all(r is fetch.result for r in results)
+    # 終わったらキーは消え、次の呼び出しはまた処理する
+    assert flight.do("130000", lambda: "again") == "again"
+
+
+def test_concurrent_callers_share_the_error():
+    flight, lock = counting_flight()
+    fetch = SlowFetch(lock, error=ConnectionError("down"))
+    results = run_concurrently(flight, "130000", fetch)
+
+    assert fetch.calls == 1
+    assert all(r is fetch.error for r in results)
+
+
+def test_different_keys_do_not_share():
+    flight = SingleFlight()
+    assert [flight.do(key, lambda k=key: k * 2) for key in (1, 2, 3)] == [2, 4, 6]
+    with pytest.raises(ValueError):
+        flight.do("bad", int, "x")
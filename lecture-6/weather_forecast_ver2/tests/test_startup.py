@@ -0,0 +1,25 @@
+# StartupTimer: 起動時間のログは直近の分だけ残す
+
+import json
+import time
+
+from startup import StartupTimer
+
+
+def run_startup(path, max_lines):
+    timer = StartupTimer(time.perf_counter(), str(path), max_lines=max_lines)
+    timer.mark("sidebar")
+    timer.mark("forecast")
+
+
+def test_log_keeps_only_recent_lines(tmp_path):
+    path = tmp_path / "startup_log.jsonl"
+    for _ in range(5):
+        run_startup(path, max_lines=3)
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 3
+    assert all({"sidebar", "forecast", "interactive"} <= json.loads(line).keys() for line in lines)
+
+
+def test_unwritable_log_is_ignored(tmp_path):
+    run_startup(tmp_path / "missing" / "startup_log.jsonl", max_lines=3)
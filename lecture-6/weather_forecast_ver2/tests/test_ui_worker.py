@@ -0,0 +1,49 @@
+# UiWorker: コールバックの失敗を握りつぶさない
+
+import logging
+import threading
+
+import pytest
+
+from ui_worker import UiWorker
+
+
+@pytest.fixture
+def worker():
+    w = UiWorker(max_workers=2)
+    yield w
+    w.shutdown()
+
+
+def test_failed_on_done_is_logged_and_reaches_on_error(worker, caplog):
+    errors = []
+    finished = threading.Event()
+
+    def on_done(result):
+        raise ValueError(f"描画に失敗: {result}")
+
+    def on_error(e):
+        errors.append(e)
+        finished.set()
+
+    with caplog.at_level(logging.ERROR, logger="ui_worker"):
+        worker.submit("forecast", lambda: 1, on_done=on_done, on_error=on_error)
+        assert finished.wait(5)
+    assert isinstance(errors[0], ValueError)
+    assert "on_done" in caplog.text and "描画に失敗: 1" in caplog.text
+
+
+def test_failed_on_error_is_logged(worker, caplog):
+    def boom():
+        raise RuntimeError("通信エラー")
+
+    def on_error(e):
+        raise KeyError("表示に失敗")
+
+    with caplog.at_level(logging.ERROR, logger="ui_worker"):
+        job = worker.submit("forecast", boom, on_error=on_error)
+        job.future.result(5)
+        done = threading.Event()
+        worker.post(done.set)  # 結果は積まれた順に配送されるので、これが呼ばれたら on_error も終わっている
+        assert done.wait(5)
+    assert "表示に失敗" in caplog.text
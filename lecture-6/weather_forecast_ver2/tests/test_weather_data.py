@@ -0,0 +1,156 @@
+# weather_data の保存処理を一時ディレクトリの DB で確かめる
+
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import retention
+import weather_data
+from forecast_record import Forecast
+
+
+def forecast(report: datetime, temp_max: int = 20) -> Forecast:
+    days = [(report + timedelta(days=i + 1)).strftime("%Y-%m-%dT00:00:00+09:00") for i in range(7)]
+    return Forecast.build("気象庁", report.strftime("%Y-%m-%dT%H:%M:%S+09:00"), days,
+                          ["101"] * 7, [""] + ["10"] * 6, [""] + [str(temp_max)] * 6)
+
+
+def test_fingerprint_lookup_uses_primary_key(db):
+    keys = [("130000", "2026-01-01T11:00:00+09:00"), ("270000", "2026-01-01T11:00:00+09:00")]
+    sql = []
+    db.set_trace_callback(sql.append)
+    try:
+        weather_data._stored_digests(db, keys)
+    finally:
+        db.set_trace_callback(None)
+    plan = " ".join(row[3] for row in db.execute("EXPLAIN QUERY PLAN " + sql[0]))
+    assert "SEARCH f USING PRIMARY KEY" in plan
+    assert "SCAN forecast_fingerprints" not in plan and "SCAN f" not in plan
+
+
+def stored_rows(conn) -> list:
+    return conn.execute(
+        "SELECT area_code, forecast_date, report_datetime, forecast_day, report_date, report_epoch, "
+        "weather_code, telop, temp_min, temp_max, publishing_office FROM forecasts "
+        "ORDER BY area_code, report_datetime, forecast_day"
+    ).fetchall()
+
+
+def test_batched_save_matches_per_area_saves(db, tmp_path):
+    start = datetime(2026, 1, 1, 5)
+    codes = ("130000", "270000", "016000")
+    batches = [{code: forecast(start + timedelta(hours=6 * r), temp_max=20 + r) for code in codes} for r in range(3)]
+    for batch in batches:
+        weather_data.save_forecasts_to_db(batch)
+    batched = stored_rows(db)
+
+    weather_data.DB_PATH = str(tmp_path / "per_area.db")
+    weather_data.init_database()
+    for batch in batches:
+        for code, data in batch.items():
+            weather_data.save_forecast_to_db(code, data)
+    per_area = stored_rows(weather_data.get_connection())
+
+    assert batched == per_area
+    assert len(batched) == 3 * 3 * 7
+    # 空の気温は NULL、数値の列は数値で入る
+    assert batched[0][8:10] == (None, None)
+    assert batched[1][6:10] == (101, "晴時々曇", 10, 20)
+
+
+def counters() -> dict:
+    snap = weather_data.METRICS.snapshot()["counters"]
+    return {name: snap.get(name, 0) for name in ("forecast_writes", "forecast_writes_skipped")}
+
+
+def test_unchanged_reports_are_skipped_per_area(db):
+    report = datetime(2026, 1, 1, 11)
+    before = counters()
+    assert weather_data.save_forecasts_to_db({"130000": forecast(report)}) == ["130000"]
+    # 同じ内容をもう一度: 書かない
+    assert weather_data.save_forecasts_to_db({"130000": forecast(report)}) == []
+    # 同じ発表日時・同じ内容でも、別の地域はまだ保存していないので書く
+    assert weather_data.save_forecasts_to_db({"130000": forecast(report), "270000": forecast(report)}) == ["270000"]
+    # 内容が変わった発表は書き直す
+    assert weather_data.save_forecasts_to_db({"130000": forecast(report, temp_max=25),
+                                              "270000": forecast(report)}) == ["130000"]
+    after = counters()
+    assert after["forecast_writes"] - before["forecast_writes"] == 3
+    assert after["forecast_writes_skipped"] - before["forecast_writes_skipped"] == 3
+    assert db.execute("SELECT COUNT(*) FROM forecasts").fetchone()[0] == 2 * 7
+    assert db.execute("SELECT MAX(temp_max) FROM forecasts WHERE area_code = '130000'").fetchone()[0] == 25
+
+
+# 移行前の形（すべて TEXT）
+LEGACY_DDL = """
+CREATE TABLE forecasts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    area_code TEXT NOT NULL,
+    forecast_date TEXT NOT NULL,
+    report_datetime TEXT NOT NULL,
+    weather_code TEXT,
+    telop TEXT,
+    temp_min TEXT,
+    temp_max TEXT,
+    publishing_office TEXT,
+    UNIQUE(area_code, forecast_date, report_datetime)
+)
+"""
+
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    """以前の形式（TEXT だけ・auto_vacuum=NONE）の DB を作って weather_data をそちらに向ける"""
+    path = str(tmp_path / "legacy.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute(LEGACY_DDL)
+        conn.executemany(
+            "INSERT INTO forecasts (area_code, forecast_date, report_datetime, weather_code, telop, "
+            "temp_min, temp_max, publishing_office) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [("130000", "2026-01-02T00:00:00+09:00", "2026-01-01T11:00:00+09:00", "101", "晴時々曇", "", "", "気象庁"),
+             ("130000", "2026-01-03T00:00:00+09:00", "2026-01-01T11:00:00+09:00", "200", "曇", "3", "12.5", "気象庁"),
+             ("270000", "2026-01-03T00:00:00+09:00", "2026-01-01T17:00:00+09:00", " ", "", " ", "9", "気象庁")],
+        )
+    conn.close()
+    saved = weather_data.DB_PATH
+    weather_data.DB_PATH = path
+    yield path
+    weather_data.CONNECTIONS.close()
+    weather_data.DB_PATH = saved
+
+
+def test_legacy_schema_is_migrated(legacy_db):
+    weather_data.init_database()
+    conn = weather_data.get_connection()
+    rows = conn.execute(
+        "SELECT area_code, forecast_day, report_date, report_epoch, weather_code, temp_min, temp_max "
+        "FROM forecasts ORDER BY area_code, forecast_day"
+    ).fetchall()
+    epoch = int(datetime(2026, 1, 1, 11, tzinfo=timezone(timedelta(hours=9))).timestamp())
+    assert rows == [
+        ("130000", 20260102, 20260101, epoch, 101, None, None),   # 空の気温は NULL
+        ("130000", 20260103, 20260101, epoch, 200, 3, 12.5),
+        ("270000", 20260103, 20260101, epoch + 6 * 3600, None, None, 9),
+    ]
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 2
+
+    # もう一度初期化しても何も変わらない
+    weather_data.init_database()
+    assert conn.execute(
+        "SELECT area_code, forecast_day, report_date, report_epoch, weather_code, temp_min, temp_max "
+        "FROM forecasts ORDER BY area_code, forecast_day"
+    ).fetchall() == rows
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 2
+
+
+def test_auto_vacuum_is_switched_by_retention_not_startup(legacy_db):
+    weather_data.init_database()
+    conn = weather_data.get_connection()
+    # 起動時の初期化では VACUUM しない
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+
+    report = retention.apply_retention(today=datetime(2026, 1, 5).date())
+    assert report["converted"] is True
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    assert retention.apply_retention(today=datetime(2026, 1, 5).date())["converted"] is False